@@ -1,18 +1,107 @@
 # src/build_coupang_upload_index.py
 
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Optional, Tuple
+import hashlib
 import json
+import os
+import re
 
 from cellon.config import COUPANG_UPLOAD_FORM_DIR, COUPANG_UPLOAD_INDEX_JSON
+from cellon.sellertool_excel import TEMPLATE_META_VERSION, scan_template_meta
 
 
-# src/build_coupang_upload_index.py
+def _file_sha1(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
 
-from pathlib import Path
-import json
-import re
 
-from cellon.config import COUPANG_UPLOAD_FORM_DIR, COUPANG_UPLOAD_INDEX_JSON
+def _load_previous_index() -> dict:
+    """이전 인덱스의 템플릿 항목 {relative_path: 항목}. 없거나 깨졌으면 빈 dict."""
+    try:
+        with COUPANG_UPLOAD_INDEX_JSON.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+        return {t["relative_path"]: t for t in data.get("templates", []) if t.get("relative_path")}
+    except (OSError, ValueError, AttributeError, KeyError, TypeError):
+        return {}
+
+
+def _has_scan_result(prev: dict) -> bool:
+    """이전 항목에 지금 버전의 스캔 결과(메타 또는 실패 기록)가 있는지."""
+    meta = prev.get("meta")
+    if meta:
+        return meta.get("version") == TEMPLATE_META_VERSION
+    error = prev.get("scan_error")
+    return isinstance(error, dict) and error.get("version") == TEMPLATE_META_VERSION
+
+
+def _reuse_previous(path: Path, entry: dict, prev: Optional[dict]) -> bool:
+    """
+    이전 인덱스의 스캔 결과를 그대로 써도 되면 entry 에 옮기고 True (entry 의 size/mtime_ns/sha1 도 채움).
+    - size/mtime 이 같으면 해시 계산 없이 재사용
+    - size/mtime 이 달라도 내용 해시(sha1)가 같으면 재사용 (복사/터치만 된 경우)
+    - 스캔 실패 기록(scan_error)도 같은 기준으로 재사용 → 파일이 바뀔 때까지 다시 스캔하지 않음
+    """
+    st = path.stat()
+    entry["size"] = st.st_size
+    entry["mtime_ns"] = st.st_mtime_ns
+    entry["sha1"] = (prev or {}).get("sha1")
+
+    if not prev or not _has_scan_result(prev):
+        entry["sha1"] = _file_sha1(path)
+        return False
+
+    if not (prev.get("size") == st.st_size and prev.get("mtime_ns") == st.st_mtime_ns):
+        entry["sha1"] = _file_sha1(path)
+        if entry["sha1"] != prev.get("sha1"):
+            return False
+
+    entry["meta"] = prev.get("meta")
+    if prev.get("scan_error"):
+        entry["scan_error"] = prev["scan_error"]
+    return True
+
+
+def _scan_template(path_str: str) -> Tuple[Optional[dict], Optional[str]]:
+    """프로세스 풀 워커: 템플릿 1개 메타 스캔 → (메타, 실패 메시지). 실패해도 인덱스 생성은 계속."""
+    try:
+        return scan_template_meta(Path(path_str)), None
+    except Exception as e:
+        print(f"[WARN] 템플릿 메타 스캔 실패 (파일이 바뀔 때까지 메타 없이 등록): {path_str} / {e}")
+        return None, str(e)
+
+
+def _scan_many(
+    paths: List[Path],
+    on_done: Callable[[Path, Tuple[Optional[dict], Optional[str]]], None],
+) -> None:
+    """
+    변경된 템플릿들을 프로세스 풀에서 병렬 스캔.
+    파일이 1개뿐이거나 풀을 못 쓰는 환경이면 순차 처리.
+    """
+    if len(paths) <= 1:
+        for p in paths:
+            on_done(p, _scan_template(str(p)))
+        return
+
+    remaining = list(paths)
+    try:
+        max_workers = max(1, min(len(paths), os.cpu_count() or 1))
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(_scan_template, str(p)): p for p in paths}
+            for fut in as_completed(futures):
+                p = futures[fut]
+                on_done(p, fut.result())
+                remaining.remove(p)
+    except (BrokenProcessPool, OSError) as e:
+        print(f"[build_coupang_upload_index] 프로세스 풀 사용 불가 → 순차 스캔으로 전환: {e}")
+        for p in remaining:
+            on_done(p, _scan_template(str(p)))
 
 
 def build_coupang_upload_index() -> Path:
@@ -22,14 +111,20 @@ def build_coupang_upload_index() -> Path:
 
     - 템플릿 파일은 rglob()로 재귀 탐색한다 (A 방식)
     - 생성된 인덱스 JSON을 템플릿 선택 단계에서 우선 사용한다 (B 방식)
+    - 템플릿마다 read-only 로 한 번 읽은 메타(template source 끝 행, category_id → source 행,
+      헤더 열 위치)를 같이 저장 → write 때 template source 영역을 다시 스캔하지 않는다
+    - 메타는 size/mtime(→ 다르면 sha1) 이 바뀐 템플릿만 다시 스캔 (병렬)
+      스캔에 실패한 템플릿은 실패 기록(scan_error)을 남기고, 파일이 바뀔 때까지 다시 스캔하지 않는다
     """
     root = COUPANG_UPLOAD_FORM_DIR
 
     if not root.exists():
         raise FileNotFoundError(f"쿠팡 업로드 폼 루트 폴더가 없습니다: {root}")
 
+    previous = _load_previous_index()
     templates = []
     key_to_paths: dict[str, list[str]] = {}
+    to_scan: dict[Path, dict] = {}
 
     for path in root.rglob("sellertool_upload_*.xlsm"):
         stem = path.stem.replace("sellertool_upload_", "", 1)
@@ -40,10 +135,14 @@ def build_coupang_upload_index() -> Path:
         key = stem  # -> "주방용품>취사도구"
         rel_path = str(path.relative_to(root))  # -> 실제 파일명 포함(접두어 포함) 유지
 
-        templates.append({
+        entry = {
             "key": key,
             "relative_path": rel_path,
-        })
+            "meta": None,
+        }
+        if not _reuse_previous(path, entry, previous.get(rel_path)):
+            to_scan[path] = entry
+        templates.append(entry)
 
         key_to_paths.setdefault(key, []).append(rel_path)
 
@@ -57,6 +156,17 @@ def build_coupang_upload_index() -> Path:
         for k, v in list(duplicates.items())[:20]:
             print(f"  - key='{k}' -> {v}")
 
+    if to_scan:
+        print(f"[INFO] 템플릿 메타 스캔: {len(to_scan)}개 (재사용 {len(templates) - len(to_scan)}개)")
+
+        def _on_done(p: Path, result: Tuple[Optional[dict], Optional[str]]) -> None:
+            meta, error = result
+            to_scan[p]["meta"] = meta
+            if error is not None:
+                to_scan[p]["scan_error"] = {"version": TEMPLATE_META_VERSION, "message": error}
+
+        _scan_many(list(to_scan), _on_done)
+
     COUPANG_UPLOAD_INDEX_JSON.parent.mkdir(parents=True, exist_ok=True)
 
     data = {
@@ -64,8 +174,10 @@ def build_coupang_upload_index() -> Path:
         "templates": templates,
     }
 
-    with COUPANG_UPLOAD_INDEX_JSON.open("w", encoding="utf-8") as f:
+    tmp = COUPANG_UPLOAD_INDEX_JSON.with_suffix(".json.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, COUPANG_UPLOAD_INDEX_JSON)
 
     print(f"[OK] 쿠팡 템플릿 인덱스 {len(templates)}개 생성")
     print(f"     JSON 경로: {COUPANG_UPLOAD_INDEX_JSON}")
@@ -5,114 +5,227 @@ from __future__ import annotations  # 타입 힌트를 앞으로 미룹니다.
 from dataclasses import dataclass  # 간단한 데이터 구조를 씁니다.
 import json
 import re   # 토큰화를 위해 정규식을 씁니다.
+import sqlite3
+import threading
 import time
+import weakref
 from pathlib import Path
-from typing import Optional, Dict, Any, List, Tuple, Set
+from typing import Optional, Dict, Any, List, Tuple, Set, Callable, Iterable, Sequence
 
-import requests
+import numpy as np
 import pandas as pd
 
 # ← 여기 새로 추가
-from ..config import LOCAL_LLM_BASE_URL, LOCAL_LLM_MODEL
-
-
-from .category_loader import load_category_master, MASTER_CACHE_FILE
+from ..config import (
+    LOCAL_LLM_BASE_URL,
+    LOCAL_LLM_MODEL,
+    LOCAL_LLM_STREAM,
+    LOCAL_LLM_STRUCTURED_OUTPUT,
+    LLM_HIERARCHICAL,
+    LLM_STAGE1_TOKEN_BUDGET,
+    LLM_BATCH_SIZE,
+    LLM_BATCH_ITEM_TOKEN_BUDGET,
+)
+from ..core.category_trie import CategoryTrie, TrieNode, get_category_trie
+from .ollama_client import LLMError, get_ollama_client
+from .ollama_async import get_async_ollama_client
+from .llm_cache import get_llm_cache, llm_cache_key
+
+
+from .category_loader import load_category_master, MASTER_ID_COLUMNS
+from .prompt_builder import CANDIDATE_TREE_GUIDE, CandidateBlock, build_candidate_block, estimate_tokens
+from .llm_warmup import DEFAULT_OUTPUT_TOKENS, recommended_llm_deadline
 
 # ===== Ollama 설정 =====
 OLLAMA_BASE_URL = LOCAL_LLM_BASE_URL
 OLLAMA_MODEL = LOCAL_LLM_MODEL
 
-# ===== 1) 카테고리 마스터 로드 헬퍼 =====
-_category_df: Optional[pd.DataFrame] = None
-
+# 스트리밍 진행 콜백: (지금까지 받은 글자 수, 지금까지의 응답 텍스트)
+LLMProgressCallback = Callable[[int, str], None]
 
+# ===== 1) 카테고리 마스터 로드 헬퍼 =====
 def get_category_master() -> pd.DataFrame:
-    """pkl 또는 엑셀에서 카테고리 마스터를 로드하고, 메모리에 캐싱."""
-    global _category_df
-    if _category_df is not None:
-        return _category_df
-
+    """
+    LLM 후보용 카테고리 마스터 (category_id / category_path 만).
+    캐싱은 category_loader 가 하므로 매처와 같은 DF 를 공유한다.
+    """
     def _log_cb(p: int, m: str):
         print(f"[cat_master] {p}% | {m}")
 
-    df = load_category_master(progress_cb=_log_cb)
-    print(f"카테고리 마스터 로드 완료: {len(df)}개")
-    _category_df = df
-    return df
+    return load_category_master(progress_cb=_log_cb, columns=MASTER_ID_COLUMNS)
 
 
 # ===== 2) Ollama LLM 호출 래퍼 =====
-class LLMError(RuntimeError):
-    pass
+def _has_category_id(obj: Dict[str, Any]) -> bool:
+    return "category_id" in obj
 
 
 def call_ollama_chat(system_prompt: str, user_prompt: str,
-                     timeout: float = 600.0) -> str:
+                     timeout: Optional[float] = None,
+                     *,
+                     stream: Optional[bool] = None,
+                     progress_cb: Optional[LLMProgressCallback] = None,
+                     response_format: Any = None,
+                     stop_when: Callable[[Dict[str, Any]], bool] = _has_category_id) -> str:
     """
     Ollama /api/chat 호출 래퍼.
     - system_prompt, user_prompt 를 넣고,
     - 최종 assistant 텍스트(content)만 반환.
+    - 모듈 공용 OllamaClient(keep-alive 세션 + 재시도 설정)를 사용
+    - timeout: 이번 호출의 데드라인(초). None 이면 워밍업 때 잰 속도로 계산한 값
+      (측정 전이면 config 의 LOCAL_LLM_DEADLINE_SEC)
+    - stream: None 이면 config 의 LOCAL_LLM_STREAM.
+      스트리밍이면 stop_when(기본: category_id 를 가진) JSON 객체가 완성되는 순간 연결을 끊고 그 객체만 반환
+    - progress_cb: 스트리밍 중 (받은 글자 수, 지금까지 텍스트) 콜백
+    - response_format: Ollama "format" (build_choice_schema() 결과 등). None 이면 자유 텍스트
+    - 실제 호출은 AsyncOllamaClient 를 거친다: 동시 요청 수 LOCAL_LLM_NUM_PARALLEL 제한,
+      다른 스레드에서 같은 프롬프트가 처리 중이면 그 결과를 같이 받음
     """
-    url = f"{OLLAMA_BASE_URL}/api/chat"
-    payload = {
-        "model": OLLAMA_MODEL,
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt},
-        ],
-        "stream": False,
-    }
+    use_stream = LOCAL_LLM_STREAM if stream is None else stream
+    timeout = _resolve_deadline(system_prompt, user_prompt, timeout)
+    _log_llm_request(system_prompt, user_prompt, timeout, use_stream)
+
+    # 동시성 제한 + 같은 프롬프트 합치기는 비동기 계층에서 처리
+    return get_async_ollama_client().chat_sync(
+        system_prompt,
+        user_prompt,
+        deadline=timeout,
+        response_format=response_format,
+        stream=use_stream,
+        stop_when=stop_when if use_stream else None,
+        on_progress=progress_cb,
+    )
+
+
+async def call_ollama_chat_async(system_prompt: str, user_prompt: str,
+                                 timeout: Optional[float] = None,
+                                 *,
+                                 stream: Optional[bool] = None,
+                                 progress_cb: Optional[LLMProgressCallback] = None,
+                                 response_format: Any = None,
+                                 stop_when: Callable[[Dict[str, Any]], bool] = _has_category_id) -> str:
+    """call_ollama_chat 의 asyncio 버전 (여러 상품을 asyncio.gather 로 동시에 돌릴 때)."""
+    use_stream = LOCAL_LLM_STREAM if stream is None else stream
+    timeout = _resolve_deadline(system_prompt, user_prompt, timeout)
+    _log_llm_request(system_prompt, user_prompt, timeout, use_stream)
+    return await get_async_ollama_client().chat(
+        system_prompt,
+        user_prompt,
+        deadline=timeout,
+        response_format=response_format,
+        stream=use_stream,
+        stop_when=stop_when if use_stream else None,
+        on_progress=progress_cb,
+    )
+
+
+def _resolve_deadline(system_prompt: str, user_prompt: str, timeout: Optional[float]) -> Optional[float]:
+    """timeout 이 없으면 워밍업 측정 속도 기준 추천 데드라인 (측정 전이면 None → 클라이언트 기본값)."""
+    if timeout is not None:
+        return timeout
+    return recommended_llm_deadline(estimate_tokens(system_prompt) + estimate_tokens(user_prompt))
+
+
+def _log_llm_request(system_prompt: str, user_prompt: str,
+                     timeout: Optional[float], use_stream: bool) -> None:
     # --- 추가: llm 호출 전 진단 로그 ---
     try:
+        client = get_ollama_client()
         sys_len = len(system_prompt or "")
         user_len = len(user_prompt or "")
-        print(f"[LLM][req] url={url} model={OLLAMA_MODEL} timeout={timeout}")
+        deadline = timeout if timeout is not None else client.default_deadline
+        print(
+            f"[LLM][req] url={client.url('/api/chat')} model={client.model} "
+            f"deadline={deadline} stream={use_stream}"
+        )
         print(f"[LLM][req] prompt_len system={sys_len} user={user_len}")
     except Exception:
         pass
-    
-    # -------------------------
-    # requests timeout은 (connect_timeout, read_timeout) 튜플을 쓰는 게 더 안전합니다.
-    # - connect_timeout: 서버 접속 자체가 안 될 때 오래 멈추는 것 방지
-    # - read_timeout: 응답이 늦어지는 경우 무한 대기 방지
-    connect_timeout = min(10.0, float(timeout))        # 접속은 빠르게 실패시키기
-    read_timeout = max(10.0, float(timeout))           # 전체 체감 타임아웃(기본 60s)
-    req_timeout = (connect_timeout, read_timeout)
-
-    last_err: Optional[Exception] = None
-    max_attempts = 2  # 1회 재시도 (최소 침습)
-    for attempt in range(1, max_attempts + 1):
-        try:
-            resp = requests.post(url, json=payload, timeout=req_timeout)
-            resp.raise_for_status()
-            break
-        except requests.exceptions.Timeout as e:
-            last_err = e
-            if attempt >= max_attempts:
-                raise LLMError(
-                    f"LLM 호출 타임아웃 (connect={connect_timeout}s, read={read_timeout}s)"
-                ) from e
-            # 짧은 백오프 후 재시도
-            time.sleep(0.6)
-        except requests.RequestException as e:
-            last_err = e
-           # 네트워크/HTTP 계열은 1회 재시도 후 실패 처리
-            if attempt >= max_attempts:
-               raise LLMError(f"LLM HTTP 호출 실패: {e}") from e
-            time.sleep(0.6)
+
+
+def build_choice_schema(candidate_ids: Iterable[Any]) -> Optional[Dict[str, Any]]:
+    """
+    후보 선택 응답용 JSON schema (Ollama 구조화 출력).
+    - category_id 는 후보 id 중 하나 또는 null(판단 불가) 만 디코딩 가능
+    - 키 순서를 category_id 먼저로 고정 → 스트리밍 조기 종료가 빨라짐
+    LOCAL_LLM_STRUCTURED_OUTPUT 이 꺼져 있으면 None (기존 자유 텍스트 + 파싱).
+    """
+    if not LOCAL_LLM_STRUCTURED_OUTPUT:
+        return None
+    ids = list(dict.fromkeys(str(c) for c in candidate_ids))
+    return {
+        "type": "object",
+        "properties": {
+            "category_id": {"enum": ids + [None]},
+            "category_path": {"type": ["string", "null"]},
+            "reason": {"type": "string"},
+        },
+        "required": ["category_id", "category_path", "reason"],
+    }
+
+
+def _extract_json_object(raw: str) -> Dict[str, Any]:
+    """
+    LLM 응답에서 JSON 객체 추출.
+    (혹시 앞뒤에 잡담이 붙어 있어도 첫 '{' ~ 마지막 '}' 구간만 파싱)
+    """
+    start = raw.find("{")
+    end = raw.rfind("}")
+    if start == -1 or end == -1 or end <= start:
+        raise ValueError(f"JSON 블록을 찾지 못했습니다: {raw[:200]}")
+    return json.loads(raw[start : end + 1])
+
+
+def call_ollama_chat_cached(system_prompt: str, user_prompt: str,
+                            timeout: Optional[float] = None,
+                            *,
+                            progress_cb: Optional[LLMProgressCallback] = None,
+                            response_format: Any = None,
+                            stop_when: Callable[[Dict[str, Any]], bool] = _has_category_id
+                            ) -> Tuple[str, Dict[str, Any]]:
+    """
+    call_ollama_chat + 응답 캐시 (llm_cache).
+    - 반환: (응답 원문, 캐시 정보 dict)
+      캐시 정보: {"llm_cache_hit": bool, "llm_elapsed_sec": 이번 호출 소요, "llm_saved_sec": 히트로 아낀 초}
+    - JSON 객체가 파싱되는 응답만 저장 (파싱 실패 응답을 캐시해서 계속 실패하지 않도록)
+    - response_format(schema) 도 키에 포함
+    """
+    cache = get_llm_cache()
+    model = get_ollama_client().model
+    key = llm_cache_key(model, system_prompt, user_prompt, extra=response_format)
 
     try:
-        data = resp.json()
-    except Exception as e:
-        raise LLMError(f"LLM 응답 JSON 파싱 실패: {e} | raw={resp.text[:200]}") from e
+        cached = cache.get(key)
+    except sqlite3.Error as e:
+        print(f"[LLM][cache] 조회 실패 (무시): {e}")
+        cached = None
+    if cached is not None:
+        raw, saved = cached
+        print(f"[LLM][cache] 히트 → 모델 호출 생략 (아낀 시간 {saved:.2f}초, 누적 {cache.stats()})")
+        return raw, {"llm_cache_hit": True, "llm_elapsed_sec": 0.0, "llm_saved_sec": saved}
+
+    start_ts = time.monotonic()
+    raw = call_ollama_chat(
+        system_prompt,
+        user_prompt,
+        timeout=timeout,
+        progress_cb=progress_cb,
+        response_format=response_format,
+        stop_when=stop_when,
+    )
+    elapsed = time.monotonic() - start_ts
 
-    # Ollama /api/chat 응답 형식: { message: { role, content, ... }, ... }
-    msg = data.get("message") or {}
-    content = (msg.get("content") or "").strip()
-    if not content:
-        raise LLMError(f"LLM 응답이 비어 있습니다: {data}")
+    try:
+        _extract_json_object(raw)
+    except ValueError:
+        pass
+    else:
+        try:
+            cache.put(key, model, raw, elapsed)
+        except sqlite3.Error as e:
+            print(f"[LLM][cache] 저장 실패 (무시): {e}")
 
-    return content
+    return raw, {"llm_cache_hit": False, "llm_elapsed_sec": elapsed, "llm_saved_sec": 0.0}
 
 
 # ===== 3) 프롬프트 템플릿 =====
@@ -161,7 +274,7 @@ USER_PROMPT_WITH_CANDIDATES_TEMPLATE = """
 - 추가 설명: {extra}
 
 아래는 이 상품이 들어갈 수 있는 카테고리 후보 목록이다.
-각 항목의 [] 안 값이 category_id 이고, 그 뒤가 category_path 이다.
+{guide}
 
 {candidates_text}
 
@@ -203,6 +316,61 @@ def _extract_keywords(name: str, brand: Optional[str], extra: Optional[str]) ->
     return uniq
 
 
+class _PathSearchIndex:
+    """
+    카테고리 경로 부분 문자열 검색용 인덱스 (마스터 1개당 1번 생성).
+    - 모든 경로를 _normalize_text 한 뒤 '\n' 으로 이어 붙인 문자열 하나(blob)와
+      각 행의 시작 오프셋 배열을 들고 있다.
+    - 키워드 검색은 blob 위에서 str.find 를 반복 (행 안에서 찾으면 다음 행으로 점프)
+      → `kw in _normalize_text(path)` 를 1.6만 행에 돌리는 것과 결과가 같고 훨씬 빠름
+    """
+
+    def __init__(self, paths: List[str]) -> None:
+        norm = [_normalize_text(p) for p in paths]
+        lengths = np.fromiter((len(x) + 1 for x in norm), dtype=np.int64, count=len(norm))
+        self.starts = np.zeros(len(norm) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.starts[1:])
+        self.blob = "\n".join(norm)
+        self.n_rows = len(norm)
+
+    def rows_containing(self, kw_norm: str) -> np.ndarray:
+        if not kw_norm:
+            return np.empty(0, dtype=np.int64)
+        blob, starts = self.blob, self.starts
+        rows: List[int] = []
+        i = blob.find(kw_norm)
+        while i != -1:
+            row = int(np.searchsorted(starts, i, side="right")) - 1
+            rows.append(row)
+            i = blob.find(kw_norm, int(starts[row + 1]))
+        return np.asarray(rows, dtype=np.int64)
+
+
+_PATH_INDEX_CACHE: Optional[Tuple["weakref.ref[pd.DataFrame]", _PathSearchIndex]] = None
+_PATH_INDEX_LOCK = threading.Lock()
+
+
+def _get_path_search_index(df: pd.DataFrame) -> _PathSearchIndex:
+    """마스터 DF 객체가 바뀌지 않았으면 같은 인덱스 재사용."""
+    global _PATH_INDEX_CACHE
+    with _PATH_INDEX_LOCK:
+        cached = _PATH_INDEX_CACHE
+        if cached is not None and cached[0]() is df:
+            return cached[1]
+        index = _PathSearchIndex(df["category_path"].astype(str).tolist())
+        _PATH_INDEX_CACHE = (weakref.ref(df), index)
+        return index
+
+
+def _rows_to_candidates(df: pd.DataFrame, positions: np.ndarray) -> List[Dict[str, str]]:
+    ids = df["category_id"].to_numpy()
+    paths = df["category_path"].to_numpy()
+    return [
+        {"category_id": str(ids[i]), "category_path": str(paths[i])}
+        for i in positions
+    ]
+
+
 def pick_candidate_categories(
     product_name: str,
     brand: Optional[str] = None,
@@ -215,87 +383,86 @@ def pick_candidate_categories(
 
     간단 스코어링:
       - category_path 문자열에 키워드가 포함될수록 점수 +1
-      - 스코어>0 인 것들 중 상위 top_k
+      - 스코어>0 인 것들 중 상위 top_k (동점이면 마스터 앞쪽 행 우선)
       - 아무것도 없으면 앞에서부터 top_k 그냥 사용 (fallback)
+    정규화된 경로는 _PathSearchIndex 로 마스터당 한 번만 만들고, DF 복사 없이 점수 배열만 계산.
     """
     df = get_category_master()
     if df.empty:
         return []
 
+    n = len(df)
+    head = np.arange(min(top_k, n))
+
     keywords = _extract_keywords(product_name, brand, extra_text)
     if not keywords:
         # 키워드가 없으면 그냥 상위 몇 개만
-        head = df.head(top_k)
-        return [
-            {
-                "category_id": str(row["category_id"]),
-                "category_path": str(row["category_path"]),
-            }
-            for _, row in head.iterrows()
-        ]
-
-    # 복사본 사용 (원본 df에 __score__ 컬럼 안 남기려고)
-    df_tmp = df.copy()
+        return _rows_to_candidates(df, head)
 
-    def score_row(row) -> int:
-        path_text = _normalize_text(str(row["category_path"]))
-        score = 0
-        for kw in keywords:
-            kw_norm = _normalize_text(kw)
-            if kw_norm and kw_norm in path_text:
-                score += 1
-        return score
+    index = _get_path_search_index(df)
+    scores = np.zeros(n, dtype=np.int64)
+    for kw in keywords:
+        rows = index.rows_containing(_normalize_text(kw))
+        if len(rows):
+            scores[rows] += 1
 
-    df_tmp["__score__"] = df_tmp.apply(score_row, axis=1)
-    scored = df_tmp[df_tmp["__score__"] > 0]
-
-    if scored.empty:
+    scored = np.flatnonzero(scores)
+    if len(scored) == 0:
         # 매칭되는 게 하나도 없으면, 그냥 앞에서부터 top_k
-        head = df_tmp.head(top_k)
-    else:
-        head = scored.sort_values("__score__", ascending=False).head(top_k)
+        return _rows_to_candidates(df, head)
 
-    candidates = [
-        {
-            "category_id": str(row["category_id"]),
-            "category_path": str(row["category_path"]),
-        }
-        for _, row in head.iterrows()
-    ]
-    return candidates
+    # 점수 내림차순, 동점이면 행 번호 오름차순
+    if len(scored) > top_k:
+        rank_key = scores[scored] * n - scored
+        scored = scored[np.argpartition(-rank_key, top_k - 1)[:top_k]]
+    order = np.lexsort((scored, -scores[scored]))
+    return _rows_to_candidates(df, scored[order])
 
 
 def build_user_prompt_with_candidates(
     name: str,
     brand: Optional[str],
     extra: Optional[str],
-    candidates: List[Dict[str, str]],
+    candidates: "List[Dict[str, str]] | CandidateBlock",
 ) -> str:
-    """Step2용: 후보 카테고리 목록을 포함한 user 프롬프트 조립."""
-    if not candidates:
+    """
+    Step2용: 후보 카테고리 목록을 포함한 user 프롬프트 조립.
+    candidates 가 리스트면 여기서 build_candidate_block (토큰 예산 트리) 으로 변환.
+    """
+    if not isinstance(candidates, CandidateBlock):
+        candidates = build_candidate_block(candidates, _extract_keywords(name, brand, extra))
+
+    if not candidates.candidates:
         candidates_text = "(후보 카테고리가 없습니다. 이 경우, 적절한 카테고리를 고르기 어려울 수 있습니다.)"
     else:
-        lines = []
-        for i, c in enumerate(candidates, start=1):
-            cid = c.get("category_id", "")
-            cpath = c.get("category_path", "")
-            lines.append(f"{i}. [{cid}] {cpath}")
-        candidates_text = "\n".join(lines)
+        candidates_text = candidates.text
 
     return USER_PROMPT_WITH_CANDIDATES_TEMPLATE.format(
         name=name or "",
         brand=brand or "",
         extra=extra or "",
+        guide=CANDIDATE_TREE_GUIDE,
         candidates_text=candidates_text,
     )
 
 
+def _log_candidate_block(block: CandidateBlock) -> None:
+    if block.trimmed:
+        print(
+            f"[LLM] 후보 {block.total}개 → 토큰 예산 초과로 키워드 점수 상위 "
+            f"{len(block.candidates)}개만 사용 (추정 {block.est_tokens} 토큰)"
+        )
+    else:
+        print(f"[LLM] 후보 {block.total}개 트리 렌더링 (추정 {block.est_tokens} 토큰)")
+
+
 # ===== 4) LLM 기반 카테고리 추천 엔트리 포인트 =====
 
 def suggest_category_with_llm(
     product_name: str,
     brand: Optional[str] = None,
     extra_text: Optional[str] = None,
+    progress_cb: Optional[LLMProgressCallback] = None,
 ) -> Dict[str, Any]:
     """
     Step2: 카테고리 마스터(pkl)에서 후보 TOP_k 뽑고,
@@ -327,18 +494,27 @@ def suggest_category_with_llm(
             "reason": "카테고리 마스터에서 후보를 찾지 못했습니다.",
         }
 
+    # 후보 트리 (토큰 예산 넘으면 top-K 로 줄어듦)
+    block = build_candidate_block(candidates, _extract_keywords(product_name, brand, extra_text))
+    _log_candidate_block(block)
+
     # LLM이 잘못된 path를 반환해도, 우리는 id 기준으로만 신뢰한다.
-    cand_by_id = {c["category_id"]: c["category_path"] for c in candidates}
+    cand_by_id = block.by_id
 
     user_prompt = build_user_prompt_with_candidates(
         product_name,
         brand,
         extra_text,
-        candidates,
+        block,
     )
 
     try:
-        raw = call_ollama_chat(SYSTEM_PROMPT, user_prompt)
+        raw, cache_info = call_ollama_chat_cached(
+            SYSTEM_PROMPT,
+            user_prompt,
+            progress_cb=progress_cb,
+            response_format=build_choice_schema(cand_by_id),
+        )
     except LLMError as e:
         # LLM 호출 자체가 실패한 경우
         return {
@@ -347,16 +523,16 @@ def suggest_category_with_llm(
             "reason": f"LLM 호출 실패: {e}",
         }
 
+    result = _parse_llm_choice(raw, cand_by_id)
+    result.update(cache_info)
+    return result
+
+
+def _parse_llm_choice(raw: str, cand_by_id: Dict[str, str]) -> Dict[str, Any]:
+    """suggest_category_with_llm 응답 파싱: id 는 후보 목록에 있는 것만 인정, path 는 후보 값 사용."""
     # LLM이 JSON 형식으로 잘 응답했다고 가정하고 파싱 시도
-    # (혹시 앞뒤에 잡담이 붙어 있어도 첫 '{' ~ 마지막 '}' 구간만 파싱)
     try:
-        start = raw.find("{")
-        end = raw.rfind("}")
-        if start == -1 or end == -1 or end <= start:
-            raise ValueError(f"JSON 블록을 찾지 못했습니다: {raw[:200]}")
-
-        json_str = raw[start : end + 1]
-        obj = json.loads(json_str)
+        obj = _extract_json_object(raw)
 
         raw_cat_id = obj.get("category_id")
         reason = obj.get("reason") or ""
@@ -400,36 +576,47 @@ def suggest_category_with_llm(
             "category_path": None,
             "reason": f"LLM 응답 파싱 실패: {e} | raw={raw}",
         }
-        
+
+
 def suggest_category_with_candidates(
     product_name: str,
     brand: Optional[str],
     extra_text: Optional[str],
     candidates_df: Optional[pd.DataFrame],
+    progress_cb: Optional[LLMProgressCallback] = None,
 ) -> Dict[str, Any]:
     """
     candidates_df: category_id, category_path 컬럼을 가진 DataFrame
     - None 또는 empty면 기존 suggest_category_with_llm로 fallback
     - 아니면 후보 안에서만 고르게 LLM 프롬프트를 구성
+    progress_cb: 스트리밍 응답 진행 콜백 (받은 글자 수, 지금까지 텍스트)
     """
 
-    # 0) 후보가 없으면 → 기존 전체 검색 함수로 위임 + 시간 측정
+    # 0) 후보가 없으면 → 전체 마스터 검색 (2단계 계층 모드 또는 기존 키워드 top-30) + 시간 측정
     if candidates_df is None or candidates_df.empty:
         start_ts = time.monotonic()
-        result = suggest_category_with_llm(
+        full_search = suggest_category_hierarchical if LLM_HIERARCHICAL else suggest_category_with_llm
+        result = full_search(
             product_name=product_name,
             brand=brand,
             extra_text=extra_text,
+            progress_cb=progress_cb,
         )
         elapsed = time.monotonic() - start_ts
         print(f"[LLM] 전체 검색 모드 호출 소요 시간: {elapsed:.2f}초")
         return result
 
-    # 1) 후보 텍스트 구성
-    candidates_text = "\n".join(
-        f"- {row['category_id']}: {row['category_path']}"
-        for _, row in candidates_df.iterrows()
+    # 1) 후보 텍스트 구성 (공통 접두어를 한 번만 찍는 트리 + 토큰 예산)
+    block = build_candidate_block(
+        [
+            {"category_id": cid, "category_path": path}
+            for cid, path in zip(candidates_df["category_id"], candidates_df["category_path"])
+        ],
+        _extract_keywords(product_name, brand, extra_text),
     )
+    _log_candidate_block(block)
+    cand_by_id = block.by_id
+    candidates_text = block.text
 
     # 2) system_prompt / user_prompt 구성 (여기서 항상 정의!)
     system_prompt = SYSTEM_PROMPT + """
@@ -445,21 +632,31 @@ def suggest_category_with_candidates(
 - 추가 설명: {extra_text or ""}
 
 후보 카테고리 목록:
+{CANDIDATE_TREE_GUIDE}
 {candidates_text}
 
 위 후보 중에서 가장 적절한 category_id 하나를 고르고,
 해당 category_path와 reason을 JSON 한 개로만 출력해라.
 """
 
-    # 3) LLM 호출 + 시간 측정
+    # 3) LLM 호출 + 시간 측정 (같은 프롬프트면 캐시 응답 사용)
     try:
-        start_ts = time.monotonic()
-        raw = call_ollama_chat(system_prompt, user_prompt)
-        elapsed = time.monotonic() - start_ts
-        print(
-            f"[LLM] 후보 제한 모드 호출 소요 시간: {elapsed:.2f}초 "
-            f"(후보 수={len(candidates_df)})"
+        raw, cache_info = call_ollama_chat_cached(
+            system_prompt,
+            user_prompt,
+            progress_cb=progress_cb,
+            response_format=build_choice_schema(cand_by_id),
         )
+        if cache_info["llm_cache_hit"]:
+            print(
+                f"[LLM] 후보 제한 모드 캐시 히트: {cache_info['llm_saved_sec']:.2f}초 절약 "
+                f"(후보 수={len(candidates_df)})"
+            )
+        else:
+            print(
+                f"[LLM] 후보 제한 모드 호출 소요 시간: {cache_info['llm_elapsed_sec']:.2f}초 "
+                f"(후보 수={len(candidates_df)})"
+            )
     except LLMError as e:
         return {
             "category_id": None,
@@ -467,20 +664,28 @@ def suggest_category_with_candidates(
             "reason": f"LLM 호출 실패(후보 제한 모드): {e}",
         }
 
-    # 4) JSON 파싱 (기존 로직 그대로)
-    try:
-        start = raw.find("{")
-        end = raw.rfind("}")
-        if start == -1 or end == -1 or end <= start:
-            raise ValueError(f"JSON 블록을 찾지 못했습니다: {raw[:200]}")
+    # 4) JSON 파싱 (schema 로 id 가 제한되어 있어도, 구버전 Ollama 대비 검증은 유지)
+    result = _parse_candidates_choice(raw, cand_by_id)
+    result.update(cache_info)
+    return result
 
-        json_str = raw[start : end + 1]
-        obj = json.loads(json_str)
+
+def _parse_candidates_choice(raw: str, cand_by_id: Dict[str, str]) -> Dict[str, Any]:
+    """
+    suggest_category_with_candidates 응답 파싱.
+    id 가 후보에 있으면 path 는 후보 값으로 맞춘다 (모델이 경로를 살짝 바꿔 써도 무시).
+    """
+    try:
+        obj = _extract_json_object(raw)
 
         cat_id = obj.get("category_id")
         cat_path = obj.get("category_path")
         reason = obj.get("reason") or ""
 
+        if cat_id is not None and str(cat_id).strip() in cand_by_id:
+            cat_id = str(cat_id).strip()
+            cat_path = cand_by_id[cat_id]
+
         return {
             "category_id": cat_id,
             "category_path": cat_path,
@@ -496,6 +701,333 @@ def suggest_category_with_candidates(
 
 
 
+# ===== 4-1) 계층형 2단계 분류 (전체 마스터 대상) =====
+
+HIERARCHY_STAGE1_SYSTEM_PROMPT = SYSTEM_PROMPT + """
+
+이번 단계의 후보는 세부 카테고리가 아니라 '대분류>중분류' 묶음이다.
+이 상품의 세부 카테고리가 들어 있을 묶음 하나를 골라라.
+category_id 에는 고른 묶음의 [] 안 값을 그대로 쓴다.
+"""
+
+
+def _coarse_nodes(trie: CategoryTrie) -> List[TrieNode]:
+    """1단계 후보: level1>level2 노드 (하위가 없는 level1 은 그 자체)."""
+    nodes: List[TrieNode] = []
+    for top in trie.root.children:
+        if top.children:
+            nodes.extend(top.children)
+        else:
+            nodes.append(top)
+    return nodes
+
+
+def _coarse_keyword_scores(trie: CategoryTrie, nodes: List[TrieNode], keywords: List[str]) -> List[float]:
+    """
+    묶음별 점수 = 서브트리 어딘가의 경로에 포함되는 키워드 수.
+    ('주방용품>취사도구' 자체엔 '냄비' 가 없어도 하위에 '양수냄비' 가 있으면 점수)
+    """
+    starts = np.fromiter((n.start for n in nodes), dtype=np.int64, count=len(nodes))
+    ends = np.fromiter((n.end for n in nodes), dtype=np.int64, count=len(nodes))
+    scores = np.zeros(len(nodes), dtype=np.float64)
+    for kw in keywords:
+        kw_ns = kw.replace(" ", "")
+        if not kw_ns:
+            continue
+        hit_ranks = np.sort(trie.rank_of[trie.contains_positions(kw_ns)])
+        if not len(hit_ranks):
+            continue
+        # [start, end) 안에 hit 가 하나라도 있는 묶음
+        scores += np.searchsorted(hit_ranks, starts) < np.searchsorted(hit_ranks, ends)
+    return scores.tolist()
+
+
+def _merge_llm_info(*results: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "llm_cache_hit": all(r.get("llm_cache_hit", False) for r in results),
+        "llm_elapsed_sec": sum(r.get("llm_elapsed_sec", 0.0) for r in results),
+        "llm_saved_sec": sum(r.get("llm_saved_sec", 0.0) for r in results),
+    }
+
+
+def suggest_category_hierarchical(
+    product_name: str,
+    brand: Optional[str] = None,
+    extra_text: Optional[str] = None,
+    progress_cb: Optional[LLMProgressCallback] = None,
+) -> Dict[str, Any]:
+    """
+    전체 마스터에서 2단계로 고르기.
+      1) LLM 이 '대분류>중분류' 묶음(수백 개 짧은 문자열) 중 하나 선택
+      2) 그 묶음 서브트리의 세부 카테고리만 후보로 suggest_category_with_candidates
+    1단계가 판단 불가/실패면 기존 키워드 top-30 방식(suggest_category_with_llm)으로 fallback.
+    반환 dict 에 coarse_path(1단계 선택) 추가.
+    """
+    master = get_category_master()
+    if master.empty:
+        return suggest_category_with_llm(product_name, brand, extra_text, progress_cb=progress_cb)
+
+    trie = get_category_trie(master)
+    nodes = _coarse_nodes(trie)
+    keywords = _extract_keywords(product_name, brand, extra_text)
+
+    # 1단계: 묶음 후보 (id 는 묶음 번호)
+    coarse = [{"category_id": f"g{i}", "category_path": node.path} for i, node in enumerate(nodes)]
+    block = build_candidate_block(
+        coarse,
+        keywords,
+        token_budget=LLM_STAGE1_TOKEN_BUDGET,
+        scores=_coarse_keyword_scores(trie, nodes, keywords),
+    )
+    print(
+        f"[LLM] 2단계 모드 1단계: 묶음 {block.total}개 중 {len(block.candidates)}개 제시 "
+        f"(추정 {block.est_tokens} 토큰)"
+    )
+
+    user_prompt = build_user_prompt_with_candidates(product_name, brand, extra_text, block)
+    try:
+        raw, stage1_info = call_ollama_chat_cached(
+            HIERARCHY_STAGE1_SYSTEM_PROMPT,
+            user_prompt,
+            progress_cb=progress_cb,
+            response_format=build_choice_schema(block.by_id),
+        )
+    except LLMError as e:
+        print(f"[LLM] 2단계 모드 1단계 호출 실패 → 키워드 top-30 모드: {e}")
+        return suggest_category_with_llm(product_name, brand, extra_text, progress_cb=progress_cb)
+
+    stage1 = _parse_llm_choice(raw, block.by_id)
+    stage1.update(stage1_info)
+    if not stage1.get("category_id"):
+        print(f"[LLM] 2단계 모드 1단계 판단 불가 → 키워드 top-30 모드: {stage1.get('reason')}")
+        result = suggest_category_with_llm(product_name, brand, extra_text, progress_cb=progress_cb)
+        result.update(_merge_llm_info(stage1, result))
+        return result
+
+    node = nodes[int(stage1["category_id"][1:])]
+    positions = trie.subtree_positions(node)
+    print(f"[LLM] 2단계 모드 1단계 선택: {node.path} (하위 {len(positions)}개) → 2단계")
+
+    # 2단계: 선택한 묶음 안의 세부 카테고리
+    sub_df = master.iloc[positions]
+    result = suggest_category_with_candidates(
+        product_name=product_name,
+        brand=brand,
+        extra_text=extra_text,
+        candidates_df=sub_df,
+        progress_cb=progress_cb,
+    )
+    result.update(_merge_llm_info(stage1, result))
+    result["coarse_path"] = node.path
+    return result
+
+
+# ===== 4-2) 여러 상품 한 번에 (배치) =====
+
+BATCH_SYSTEM_PROMPT = SYSTEM_PROMPT + """
+
+이번에는 여러 상품이 [상품 N] 형태로 한 번에 주어지고, 상품마다 자기 후보 목록이 따로 있다.
+각 상품은 반드시 그 상품의 후보 목록 안에서만 고른다.
+출력은 JSON 객체 한 개로, "results" 배열에 상품 번호 순서대로
+{"item": 상품 번호, "category_id": ..., "category_path": ..., "reason": ...} 를 넣어라.
+"""
+
+
+def _has_results(obj: Dict[str, Any]) -> bool:
+    return "results" in obj
+
+
+def build_batch_schema(blocks: Sequence[CandidateBlock]) -> Optional[Dict[str, Any]]:
+    """배치 응답 schema: results[i] 의 category_id 는 i번째 상품의 후보 id enum (또는 null)."""
+    if not LOCAL_LLM_STRUCTURED_OUTPUT:
+        return None
+    items = []
+    for i, block in enumerate(blocks, start=1):
+        choice = build_choice_schema(block.by_id)
+        items.append(
+            {
+                "type": "object",
+                "properties": {"item": {"enum": [i]}, **choice["properties"]},
+                "required": ["item"] + choice["required"],
+            }
+        )
+    return {
+        "type": "object",
+        "properties": {
+            "results": {
+                "type": "array",
+                "prefixItems": items,
+                "minItems": len(items),
+                "maxItems": len(items),
+            }
+        },
+        "required": ["results"],
+    }
+
+
+def _parse_batch_choices(raw: str, blocks: Sequence[CandidateBlock]) -> List[Optional[Dict[str, Any]]]:
+    """
+    배치 응답 → 상품별 결과 (검증 실패한 상품은 None).
+    item 번호가 있으면 그걸로, 없으면 배열 순서로 매칭.
+    category_id 는 그 상품 후보에 있거나 null(판단 불가) 이어야 통과.
+    """
+    out: List[Optional[Dict[str, Any]]] = [None] * len(blocks)
+    try:
+        results = _extract_json_object(raw).get("results")
+    except ValueError:
+        return out
+    if not isinstance(results, list):
+        return out
+
+    for pos, obj in enumerate(results):
+        if not isinstance(obj, dict):
+            continue
+        try:
+            idx = int(obj.get("item", pos + 1)) - 1
+        except (TypeError, ValueError):
+            continue
+        if not 0 <= idx < len(blocks) or out[idx] is not None:
+            continue
+
+        raw_id = obj.get("category_id")
+        reason = obj.get("reason") or ""
+        if raw_id is None:
+            out[idx] = {
+                "category_id": None,
+                "category_path": None,
+                "reason": reason or "LLM이 카테고리를 판단할 수 없다고 응답했습니다.",
+            }
+            continue
+        cat_id = str(raw_id).strip()
+        if cat_id in blocks[idx].by_id:
+            out[idx] = {
+                "category_id": cat_id,
+                "category_path": blocks[idx].by_id[cat_id],
+                "reason": reason,
+            }
+    return out
+
+
+def suggest_categories_batch(
+    products: Sequence[Dict[str, Any]],
+    candidates_per_product: Sequence[Optional[pd.DataFrame]],
+    batch_size: Optional[int] = None,
+    progress_cb: Optional[LLMProgressCallback] = None,
+) -> List[Dict[str, Any]]:
+    """
+    여러 상품을 Ollama 요청 하나에 묶어서 분류 (CPU 추론에서 system prompt prefill /
+    모델 스케줄링 같은 요청당 고정 비용을 batch_size 개 상품이 나눠 냄).
+
+    products: [{"product_name": ..., "brand": ..., "extra_text": ...}, ...]
+    candidates_per_product: 상품별 후보 DF (category_id, category_path). None/empty 인 상품은
+                            묶지 않고 suggest_category_with_candidates (전체 마스터 모드) 로 개별 처리
+    반환: products 와 같은 순서의 결과 dict 리스트 (suggest_category_with_candidates 와 같은 형식 +
+          llm_batch_size). 배치 응답에서 검증에 실패한 상품만 개별 호출로 다시 처리.
+    """
+    if len(products) != len(candidates_per_product):
+        raise ValueError("products 와 candidates_per_product 길이가 다릅니다.")
+    size = max(1, int(batch_size or LLM_BATCH_SIZE))
+    results: List[Dict[str, Any]] = [{} for _ in products]
+
+    def _single(i: int) -> Dict[str, Any]:
+        p = products[i]
+        return suggest_category_with_candidates(
+            product_name=p.get("product_name") or "",
+            brand=p.get("brand"),
+            extra_text=p.get("extra_text"),
+            candidates_df=candidates_per_product[i],
+            progress_cb=progress_cb,
+        )
+
+    batchable: List[int] = []
+    for i, df in enumerate(candidates_per_product):
+        if df is not None and not df.empty:
+            batchable.append(i)
+        else:
+            results[i] = _single(i)
+
+    for start in range(0, len(batchable), size):
+        chunk = batchable[start:start + size]
+        if len(chunk) == 1:
+            results[chunk[0]] = _single(chunk[0])
+            continue
+
+        blocks: List[CandidateBlock] = []
+        sections: List[str] = []
+        for n, i in enumerate(chunk, start=1):
+            p = products[i]
+            df = candidates_per_product[i]
+            name, brand, extra = p.get("product_name") or "", p.get("brand"), p.get("extra_text")
+            block = build_candidate_block(
+                [
+                    {"category_id": cid, "category_path": path}
+                    for cid, path in zip(df["category_id"], df["category_path"])
+                ],
+                _extract_keywords(name, brand, extra),
+                token_budget=LLM_BATCH_ITEM_TOKEN_BUDGET,
+            )
+            blocks.append(block)
+            sections.append(
+                f"[상품 {n}]\n"
+                f"- 상품명: {name}\n"
+                f"- 브랜드: {brand or ''}\n"
+                f"- 추가 설명: {extra or ''}\n"
+                f"후보 카테고리 목록:\n{block.text}"
+            )
+
+        user_prompt = (
+            f"{CANDIDATE_TREE_GUIDE}\n\n"
+            + "\n\n".join(sections)
+            + f"\n\n상품 {len(chunk)}개 각각에 대해 자기 후보 중 category_id 하나를 고르고,"
+            " results 배열 JSON 한 개로만 출력해라."
+        )
+        # 데드라인: 워밍업 측정 속도 기준 (출력은 상품 수만큼), 측정 전이면 기본 데드라인 × 상품 수/2
+        max_deadline = get_ollama_client().default_deadline * max(1.0, len(chunk) / 2)
+        deadline = recommended_llm_deadline(
+            estimate_tokens(BATCH_SYSTEM_PROMPT) + estimate_tokens(user_prompt),
+            DEFAULT_OUTPUT_TOKENS * len(chunk),
+            max_deadline=max_deadline,
+        )
+        try:
+            raw, cache_info = call_ollama_chat_cached(
+                BATCH_SYSTEM_PROMPT,
+                user_prompt,
+                timeout=deadline if deadline is not None else max_deadline,
+                progress_cb=progress_cb,
+                response_format=build_batch_schema(blocks),
+                stop_when=_has_results,
+            )
+            parsed = _parse_batch_choices(raw, blocks)
+        except LLMError as e:
+            print(f"[LLM] 배치({len(chunk)}개) 호출 실패 → 개별 호출: {e}")
+            cache_info = None
+            parsed = [None] * len(chunk)
+
+        n_ok = sum(r is not None for r in parsed)
+        if cache_info is not None:
+            print(
+                f"[LLM] 배치 {len(chunk)}개: 통과 {n_ok}개 / 개별 재시도 {len(chunk) - n_ok}개 "
+                f"(소요 {cache_info['llm_elapsed_sec']:.2f}초, 캐시={cache_info['llm_cache_hit']})"
+            )
+
+        for i, r in zip(chunk, parsed):
+            if r is None:
+                results[i] = _single(i)
+                continue
+            # 배치 호출 시간은 상품 수로 나눠서 기록
+            r.update(
+                {
+                    "llm_cache_hit": cache_info["llm_cache_hit"],
+                    "llm_elapsed_sec": cache_info["llm_elapsed_sec"] / len(chunk),
+                    "llm_saved_sec": cache_info["llm_saved_sec"] / len(chunk),
+                    "llm_batch_size": len(chunk),
+                }
+            )
+            results[i] = r
+
+    return results
+
+
 # ===== 5) 단독 실행용 테스트 =====
 
 if __name__ == "__main__":
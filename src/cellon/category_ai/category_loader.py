@@ -9,9 +9,14 @@
 import os  # 폴더/파일 목록을 다루는 모듈
 import re  # 문자열에서 패턴 찾기 위한 모듈
 import hashlib  # 문자열을 해시값으로 변환하는 모듈
+import json  # 파일 캐시 manifest 저장용
+from concurrent.futures import ProcessPoolExecutor, as_completed  # 변경 파일 병렬 분석
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path  # 파일/폴더 경로를 쉽게 다루는 모듈
-from typing import List, Callable, Optional  # 타입 힌트용
+from typing import List, Callable, Optional, Sequence  # 타입 힌트용
 
+import numpy as np  # id 인덱스(위치 배열)용
+import openpyxl  # 카테고리 엑셀 스트리밍(read-only) 읽기
 import pandas as pd  # 엑셀 등 표 데이터를 다루는 라이브러리
 
 # ===== 경로 설정 =====
@@ -22,6 +27,7 @@ import pandas as pd
 import os, re, hashlib
 
 from cellon.config import CATEGORY_EXCEL_DIR, CACHE_DIR as CONFIG_CACHE_DIR
+from cellon.category_ai.category_store import ColumnarMaster, write_columnar_master
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 CATEGORY_DIR = CATEGORY_EXCEL_DIR          # ← 엑셀 위치는 config에서 통일 관리
@@ -32,7 +38,11 @@ CACHE_DIR.mkdir(parents=True, exist_ok=True)
 CACHE_FILES_DIR = CACHE_DIR / "category_files"
 CACHE_FILES_DIR.mkdir(parents=True, exist_ok=True)
 
-MASTER_CACHE_FILE = CACHE_DIR / "category_master.pkl"
+MASTER_CACHE_FILE = CACHE_DIR / "category_master.pkl"      # 구버전 캐시 (있으면 컬럼형으로 옮김)
+MASTER_STORE_DIR = CACHE_DIR / "category_master_store"    # 컬럼형 캐시 (category_store 참고)
+
+# 매처/LLM 후보처럼 id·경로만 필요한 곳에서 쓰는 컬럼
+MASTER_ID_COLUMNS = ("category_id", "category_path")
 
 def _file_key(path: Path) -> str:  # 파일 경로를 해시값(고유키)로 변환
     h = hashlib.sha1(str(path.resolve()).encode("utf-8")).hexdigest()  # 경로를 sha1 해시로 변환
@@ -66,6 +76,63 @@ def _has_new_schema(df: pd.DataFrame) -> bool:
 
 
 # ===== 1) 개별 엑셀에서 카테고리 추출 =====
+# pd.read_excel 기본 NA 문자열 (이 값이면 빈 칸 취급 → "")
+_EXCEL_NA_STRINGS = {
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+}
+
+_CATEGORY_CELL_RE = re.compile(r"\[(\d+)\]\s*(.+)")
+
+
+def _excel_cell_text(cell) -> str:
+    """
+    openpyxl 셀 → 문자열 (pd.read_excel 후 str().strip() 하던 것과 같은 규칙)
+    - 빈 칸 / 오류 셀 / NA 문자열 → ""
+    - 정수로 떨어지는 실수(3.0) → "3"
+    """
+    v = getattr(cell, "value", None)
+    if v is None or getattr(cell, "data_type", None) == "e":
+        return ""
+    if isinstance(v, str):
+        return "" if v in _EXCEL_NA_STRINGS else v.strip()
+    if isinstance(v, float):
+        if v != v:  # NaN
+            return ""
+        if v.is_integer():
+            return str(int(v))
+    return str(v).strip()
+
+
+def _iter_category_rows(path: str):
+    """
+    'data' 시트를 read-only 모드로 한 행씩 읽으면서
+    A열이 "[id] 경로" 형식인 행만 (cat_id, path_str, C~J 셀 8개) 로 내보낸다.
+    - A~J 열(10칸)만 읽고, 나머지 열/행 데이터는 메모리에 올리지 않음
+    """
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        if "data" not in wb.sheetnames:
+            raise ValueError(f"Worksheet named 'data' not found: {path}")
+        ws = wb["data"]
+        for cells in ws.iter_rows(max_col=10):
+            if not cells:
+                continue
+            first = cells[0]
+            v = getattr(first, "value", None)
+            if not (isinstance(v, str) and "[" in v and "]" in v):
+                continue
+            if getattr(first, "data_type", None) == "e" or v in _EXCEL_NA_STRINGS:
+                continue
+
+            m = _CATEGORY_CELL_RE.match(v.strip())
+            if not m:
+                continue
+            yield m.group(1), m.group(2), cells[2:10]
+    finally:
+        wb.close()
+
+
 def extract_categories_from_file(path: str) -> pd.DataFrame:
     """
     엑셀 1개에서 카테고리 추출
@@ -74,24 +141,20 @@ def extract_categories_from_file(path: str) -> pd.DataFrame:
       category_id / category_path / level1~4 를 만든다.
     - 같은 행의 C~J 열(0-based로 2~9열)을 그대로 저장해서,
       나중에 셀러툴 업로드 엑셀(data 시트 J~Q)에 복사해서 쓸 수 있게 한다.
+    - 시트 전체를 DataFrame 으로 읽지 않고 행 단위 스트리밍으로 필요한 셀만 꺼낸다.
     """
-    df = pd.read_excel(path, sheet_name="data", header=None)  # 'data' 시트 전체 읽기
-    col0 = df.iloc[:, 0]  # 첫 번째 컬럼(A열)만 추출
-
-    # (row_idx, cat_id, path_str) 목록
-    cat_rows: list[tuple[int, str, str]] = []
-
-    for row_idx, v in col0.items():
-        if not (isinstance(v, str) and "[" in v and "]" in v):
-            continue
+    # (cat_id, path_str, C~J 문자열 8개) 목록
+    cat_rows: list[tuple[str, str, list[str]]] = []
+    seen: set[str] = set()
 
-        m = re.match(r"\[(\d+)\]\s*(.+)", v.strip())
-        if not m:
+    for cat_id, path_str, tail_cells in _iter_category_rows(path):
+        # → 같은 카테고리가 여러 번 나오면 첫 번째 행만 사용
+        if cat_id in seen:
             continue
-
-        cat_id = m.group(1)
-        path_str = m.group(2)
-        cat_rows.append((row_idx, cat_id, path_str))
+        seen.add(cat_id)
+        values = [_excel_cell_text(c) for c in tail_cells]
+        values += [""] * (8 - len(values))
+        cat_rows.append((cat_id, path_str, values))
 
     if not cat_rows:
         return pd.DataFrame(
@@ -114,41 +177,15 @@ def extract_categories_from_file(path: str) -> pd.DataFrame:
             ]
         )
 
-    # (cat_id, path_str) 중복 제거 (row_idx는 무시)
-    # → 같은 카테고리가 여러 파일에 중복 있을 경우 첫 번째만 사용
-    seen = {}
-    for row_idx, cat_id, path_str in cat_rows:
-        if cat_id not in seen:
-            seen[cat_id] = (row_idx, path_str)
-    cat_rows_unique = [(rid, cid, p) for cid, (rid, p) in seen.items()]
-
     records = []
 
-    for row_idx, cat_id, path_str in cat_rows_unique:
+    for cat_id, path_str, values in cat_rows:
         parts = [p.strip() for p in path_str.split(">")]
         parts = parts + [""] * (4 - len(parts))
         level1, level2, level3, level4 = parts[:4]
 
-        # 이 카테고리가 있는 행의 C~J 열 값 추출 (없으면 "")
-        row = df.iloc[row_idx] if row_idx < len(df) else pd.Series(dtype=object)
-
-        def _get_col(series: pd.Series, idx: int) -> str:
-            try:
-                v = series.iloc[idx]
-            except Exception:
-                return ""
-            if pd.isna(v):
-                return ""
-            return str(v).strip()
-
-        col_c = _get_col(row, 2)  # C열
-        col_d = _get_col(row, 3)  # D열
-        col_e = _get_col(row, 4)  # E열
-        col_f = _get_col(row, 5)  # F열
-        col_g = _get_col(row, 6)  # G열
-        col_h = _get_col(row, 7)  # H열
-        col_i = _get_col(row, 8)  # I열
-        col_j = _get_col(row, 9)  # J열
+        # 이 카테고리가 있는 행의 C~J 열 값 (없으면 "")
+        col_c, col_d, col_e, col_f, col_g, col_h, col_i, col_j = values
 
         records.append(
             {
@@ -174,6 +211,106 @@ def extract_categories_from_file(path: str) -> pd.DataFrame:
 
 
 # ===== 2) 증분 방식 카테고리 마스터 생성 =====
+# 파일별 캐시 유효성 판정용 manifest
+#   files : 파일키 → {path, size, mtime_ns, sha1}
+#   master: 마스터 pkl 을 만들 때 쓴 (파일키, sha1) 순서 목록
+CACHE_MANIFEST_FILE = CACHE_FILES_DIR / "manifest.json"
+
+MASTER_EMPTY_COLUMNS = ["category_id", "category_path", "level1", "level2", "level3", "level4"]
+
+
+def _load_manifest() -> dict:
+    try:
+        with open(CACHE_MANIFEST_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data.setdefault("files", {})
+            data.setdefault("master", [])
+            return data
+    except (OSError, ValueError):
+        pass
+    return {"files": {}, "master": []}
+
+
+def _save_manifest(manifest: dict) -> None:
+    tmp = CACHE_MANIFEST_FILE.with_suffix(".json.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, CACHE_MANIFEST_FILE)
+
+
+def _file_sha1(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _check_file_cache(excel_path: Path, cache_pkl: Path, entry: Optional[dict]) -> tuple[bool, dict]:
+    """
+    파일 캐시가 유효한지 판정하고, 갱신된 manifest 항목을 돌려준다.
+    - size/mtime 이 같으면 해시 계산 없이 유효
+    - size/mtime 이 달라도 내용 해시(sha1)가 같으면 유효 (복사/터치만 된 경우)
+    """
+    st = excel_path.stat()
+    new_entry = {
+        "path": str(excel_path),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha1": (entry or {}).get("sha1"),
+    }
+    if not entry or not cache_pkl.exists():
+        new_entry["sha1"] = _file_sha1(excel_path)
+        return False, new_entry
+
+    if entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns:
+        return True, new_entry
+
+    new_entry["sha1"] = _file_sha1(excel_path)
+    return new_entry["sha1"] == entry.get("sha1"), new_entry
+
+
+def _read_file_cache(cache_pkl: Path) -> Optional[pd.DataFrame]:
+    """파일 캐시 pkl 로드. 깨졌거나 구버전(col_c~col_j 없음)이면 None."""
+    try:
+        df = pd.read_pickle(cache_pkl)
+    except Exception:
+        return None
+    # 빈 DF(카테고리 없는 엑셀)도 정상 캐시로 취급
+    if df is None or (not df.empty and not _has_new_schema(df)):
+        return None
+    return df
+
+
+def _extract_many(
+    paths: List[Path],
+    on_done: Callable[[Path, pd.DataFrame], None],
+) -> None:
+    """
+    변경된 엑셀들을 프로세스 풀에서 병렬 분석.
+    파일이 1개뿐이거나 풀을 못 쓰는 환경이면 순차 처리.
+    """
+    if len(paths) <= 1:
+        for p in paths:
+            on_done(p, extract_categories_from_file(str(p)))
+        return
+
+    remaining = list(paths)
+    try:
+        max_workers = max(1, min(len(paths), os.cpu_count() or 1))
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(extract_categories_from_file, str(p)): p for p in paths}
+            for fut in as_completed(futures):
+                p = futures[fut]
+                on_done(p, fut.result())
+                remaining.remove(p)
+    except (BrokenProcessPool, OSError) as e:
+        print(f"[category_loader] 프로세스 풀 사용 불가 → 순차 분석으로 전환: {e}")
+        for p in remaining:
+            on_done(p, extract_categories_from_file(str(p)))
+
+
 def get_category_master(
     category_dir: Path = CATEGORY_DIR,
     progress_cb: Optional[Callable[[int, str], None]] = None,
@@ -182,6 +319,10 @@ def get_category_master(
     여러 엑셀 파일을 읽어서, 캐시가 있으면 캐시 사용, 없으면 새로 분석
     모든 결과를 합쳐서 마스터 테이블로 만듦
     진행상황을 콜백 함수로 알릴 수 있음
+
+    - 파일 캐시는 manifest(size, mtime, sha1) 기준으로 유효성 판정
+    - 바뀐 파일만 프로세스 풀에서 병렬로 다시 분석
+    - 파일 구성/내용이 마스터 pkl 을 만들 때와 같으면 마스터 pkl 을 그대로 재사용
     """
     excel_files: List[Path] = []  # 엑셀 파일 경로 리스트
     for fname in os.listdir(category_dir):  # 폴더 내 파일 반복
@@ -195,59 +336,82 @@ def get_category_master(
     if total == 0:  # 파일 없으면
         if progress_cb:
             progress_cb(100, "카테고리 엑셀 파일이 없습니다.")  # 콜백으로 알림
-        return pd.DataFrame(
-            columns=["category_id", "category_path", "level1", "level2", "level3", "level4"]  # 빈 테이블 반환
-        )
+        return pd.DataFrame(columns=MASTER_EMPTY_COLUMNS)  # 빈 테이블 반환
 
     if progress_cb:
         progress_cb(0, f"카테고리 엑셀 {total}개 분석 시작...")  # 시작 메시지
 
-    per_file_dfs: List[pd.DataFrame] = []  # 각 파일별 결과 리스트
-    processed = 0  # 처리한 파일 개수
-    last_reported_percent = -5  # 진행률 보고용 변수
+    manifest = _load_manifest()
+    old_files: dict = manifest["files"]
+    new_files: dict = {}
 
-    for excel_path in excel_files:  # 모든 엑셀 파일 반복
-        processed += 1  # 처리 파일 개수 증가
-        key = _file_key(excel_path)  # 파일 경로 해시값 생성
-        cache_pkl = CACHE_FILES_DIR / f"{key}.pkl"  # 캐시 파일 경로
+    keys = [_file_key(p) for p in excel_files]
+    per_file: dict[str, pd.DataFrame] = {}   # 파일키 → 분석 결과
+    status_of: dict[str, str] = {}
+    changed: List[Path] = []
 
-        excel_mtime = excel_path.stat().st_mtime  # 엑셀 파일 수정시간
-        use_cache = False  # 캐시 사용 여부
-
-        if use_cache:
-            df = pd.read_pickle(cache_pkl)
-            # ✅ 구버전 캐시(= col_c~col_j 없는 데이터)면 자동 재분석
-            if not _has_new_schema(df):
-                df = extract_categories_from_file(str(excel_path))
-                df.to_pickle(cache_pkl)
-                status = "구버전 캐시 감지 → 재분석 및 캐시 갱신"
-            else:
-                status = "캐시 사용"
+    # 1) 캐시 유효성 판정 (유효한 파일은 pkl 로드)
+    for excel_path, key in zip(excel_files, keys):
+        cache_pkl = CACHE_FILES_DIR / f"{key}.pkl"  # 캐시 파일 경로
+        valid, entry = _check_file_cache(excel_path, cache_pkl, old_files.get(key))
+        new_files[key] = entry
+        if valid:
+            df = _read_file_cache(cache_pkl)
+            if df is not None:
+                per_file[key] = df
+                status_of[key] = "캐시 사용"
+                continue
+            status_of[key] = "구버전/손상 캐시 감지 → 재분석 및 캐시 갱신"
         else:
-            df = extract_categories_from_file(str(excel_path))
-            df.to_pickle(cache_pkl)
-            status = "재분석 및 캐시 갱신"
+            status_of[key] = "재분석 및 캐시 갱신"
+        changed.append(excel_path)
 
-        per_file_dfs.append(df)  # 결과 리스트에 추가
+    # 2) 진행률: 캐시 사용 파일은 바로, 재분석 파일은 완료될 때마다 5% 단위로 로그
+    processed = 0  # 처리한 파일 개수
+    last_reported_percent = -5  # 진행률 보고용 변수
 
-        # 진행률 계산 및 5% 단위로만 로그
+    def _report(excel_path: Path, key: str) -> None:
+        nonlocal processed, last_reported_percent
+        processed += 1  # 처리 파일 개수 증가
         if progress_cb and total > 0:
             percent = int(processed / total * 100)  # 진행률 계산
             if percent - last_reported_percent >= 5:  # 5% 이상 변하면
                 last_reported_percent = percent  # 마지막 보고값 갱신
-                msg = f"[{percent}%] {excel_path.name} 처리 완료 ({status})"  # 메시지 생성
+                msg = f"[{percent}%] {excel_path.name} 처리 완료 ({status_of[key]})"  # 메시지 생성
                 progress_cb(percent, msg)  # 콜백 함수로 알림
 
-    # 전체 마스터 합치기
-    if per_file_dfs:  # 데이터가 있으면
-        master = pd.concat(per_file_dfs, ignore_index=True)  # 여러 파일 데이터 합침
-        master = master.drop_duplicates(subset=["category_id"]).reset_index(drop=True)  # 중복 제거
-    else:  # 데이터가 없으면
-        master = pd.DataFrame(
-            columns=["category_id", "category_path", "level1", "level2", "level3", "level4"]  # 빈 테이블 생성
-        )
-
-    master.to_pickle(MASTER_CACHE_FILE)  # 전체 결과를 캐시 파일로 저장
+    for excel_path, key in zip(excel_files, keys):
+        if key in per_file:
+            _report(excel_path, key)
+
+    def _on_extracted(excel_path: Path, df: pd.DataFrame) -> None:
+        key = _file_key(excel_path)
+        df.to_pickle(CACHE_FILES_DIR / f"{key}.pkl")
+        per_file[key] = df
+        _report(excel_path, key)
+
+    if changed:
+        _extract_many(changed, _on_extracted)
+
+    # 3) 마스터 합치기: 파일 구성/내용이 그대로면 기존 컬럼형 마스터 캐시 재사용
+    signature = [[key, new_files[key]["sha1"]] for key in keys]
+    master = None
+    if not changed and manifest.get("master") == signature:
+        store = ColumnarMaster.open_current(MASTER_STORE_DIR)
+        if store is not None and store.has_columns(NEW_SCHEMA_REQUIRED_COLS):
+            master = store.frame()
+
+    if master is None:
+        per_file_dfs = [per_file[key] for key in keys if key in per_file]  # 원래 파일 순서 유지
+        if per_file_dfs:  # 데이터가 있으면
+            master = pd.concat(per_file_dfs, ignore_index=True)  # 여러 파일 데이터 합침
+            master = master.drop_duplicates(subset=["category_id"]).reset_index(drop=True)  # 중복 제거
+        else:  # 데이터가 없으면
+            master = pd.DataFrame(columns=MASTER_EMPTY_COLUMNS)  # 빈 테이블 생성
+        write_columnar_master(master, MASTER_STORE_DIR)  # 전체 결과를 컬럼형 캐시로 저장
+        _invalidate_master_cache()  # 이미 로드된 메모리 캐시/뷰는 다음 조회 때 새 스냅샷으로
+
+    _save_manifest({"files": new_files, "master": signature})
 
     if progress_cb:  # 콜백 함수가 있으면
         progress_cb(100, "카테고리 마스터 생성 완료")  # 100% 완료 메시지 알림
@@ -255,48 +419,222 @@ def get_category_master(
     return master  # 최종 결과 반환
 
 # === 3) 외부에서 쓰기 편하게: 마스터 로드 헬퍼 ===
-_category_master_cache: pd.DataFrame | None = None  # 내부 캐시
+class CategoryIdIndex:
+    """
+    카테고리 마스터의 category_id → 행 위치(position) 인덱스.
 
+    - ids      : 미리 문자열로 바꿔 둔 category_id 배열 (마스터 행 순서 그대로)
+    - labels   : 마스터 index 라벨 배열 (마스터에서 잘라낸 DF 의 행을 라벨로 찾을 때 사용)
+    - _pos     : category_id → 첫 번째 행 위치
+    → 매번 df["category_id"].astype(str) 전체 변환/비교 대신 해시 조회 + iloc 으로 처리한다.
+    """
 
-def load_category_master(force_rebuild: bool = False,
-                         progress_cb: Optional[Callable[[int, str], None]] = None) -> pd.DataFrame:
+    def __init__(self, master: pd.DataFrame) -> None:
+        self.master = master
+        if master is None or master.empty or "category_id" not in master.columns:
+            self.ids = np.empty(0, dtype=object)
+        else:
+            self.ids = master["category_id"].astype(str).to_numpy()
+        self.labels = master.index.to_numpy() if master is not None else np.empty(0)
+        self._pos: dict[str, int] = {}
+        for i, cid in enumerate(self.ids.tolist()):
+            self._pos.setdefault(cid, i)
+        self.unique = len(self._pos) == len(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def position(self, category_id) -> Optional[int]:
+        """category_id 의 마스터 행 위치. 없으면 None."""
+        return self._pos.get(str(category_id).strip())
+
+    def positions(self, category_ids) -> np.ndarray:
+        """
+        여러 category_id 의 행 위치 (마스터 순서로 정렬).
+        df[df["category_id"].astype(str).isin(ids)] 와 같은 행/순서를 돌려주기 위함.
+        """
+        wanted = {str(cid).strip() for cid in category_ids}
+        if not self.unique:
+            return np.flatnonzero(np.isin(self.ids, list(wanted)))
+        pos = [self._pos[cid] for cid in wanted if cid in self._pos]
+        return np.sort(np.asarray(pos, dtype=np.int64))
+
+    def row(self, category_id) -> Optional[pd.Series]:
+        pos = self.position(category_id)
+        if pos is None:
+            return None
+        return self.master.iloc[pos]
+
+    def take(self, category_ids) -> pd.DataFrame:
+        """category_id 목록에 해당하는 마스터 행들 (마스터 순서)."""
+        return self.master.iloc[self.positions(category_ids)]
+
+    def labels_of(self, category_ids) -> np.ndarray:
+        """category_id 목록에 해당하는 마스터 index 라벨 (마스터에서 잘라낸 DF 의 index 와 비교용)."""
+        return self.labels[self.positions(category_ids)]
+
+    def locate(self, df: pd.DataFrame, category_id) -> Optional[int]:
+        """
+        마스터에서 잘라낸 df(index 유지) 안에서 category_id 행의 순번(iloc 위치). 없으면 None.
+        df 가 마스터 슬라이스가 아니면(reset_index 등으로 라벨이 없거나 id 가 다르면) 전체 비교로 찾는다.
+        """
+        cid = str(category_id).strip()
+        pos = self._pos.get(cid)
+        if pos is None or df is None or df.empty:
+            return None
+        label = self.labels[pos]
+        if df.index.is_unique and label in df.index:
+            off = df.index.get_loc(label)
+            if str(df["category_id"].iat[off]) == cid:
+                return int(off)
+        hit = np.flatnonzero(df["category_id"].astype(str).to_numpy() == cid)
+        return int(hit[0]) if len(hit) else None
+
+
+_category_master_cache: pd.DataFrame | None = None  # 내부 캐시 (전체 컬럼)
+_master_store: ColumnarMaster | None = None          # 현재 컬럼형 스냅샷 (지연 로딩)
+_master_views: dict[tuple, pd.DataFrame] = {}        # 컬럼 일부만 읽은 DF 캐시
+_id_indexes: list[CategoryIdIndex] = []              # 위 DF 들의 id 인덱스
+_master_version: int = 0                             # 메모리 캐시가 바뀔 때마다 +1
+
+
+def category_master_version() -> int:
+    """메모리 마스터(전체/컬럼 뷰)가 교체될 때마다 바뀌는 번호. 매처 풀 등이 재빌드 판단에 사용."""
+    return _master_version
+
+
+def category_master_token() -> str:
     """
-    - force_rebuild=False 이면:
-        1) 메모리 캐시 있으면 그대로 사용
-        2) 메모리 캐시 없고, MASTER_CACHE_FILE 이 있으면 pkl 로드
-        3) pkl 도 없으면 get_category_master() 돌려서 새로 생성
-    - force_rebuild=True 이면:
-        무조건 get_category_master()로 다시 만들고 pkl 갱신
+    현재 마스터 스냅샷 이름 (컬럼형 캐시 CURRENT). 스냅샷이 없으면 메모리 버전 번호.
+    프로세스 재시작 후에도 같은 마스터인지 판단해야 하는 디스크 캐시의 키로 사용.
     """
+    store = _open_master_store()
+    return store.token if store is not None else f"mem-{_master_version}"
+
+
+def _invalidate_master_cache() -> None:
+    """메모리 캐시/뷰/id 인덱스를 모두 비우고 버전을 올린다."""
+    global _category_master_cache, _master_store, _master_version
+    _category_master_cache = None
+    _master_store = None
+    _master_views.clear()
+    _id_indexes.clear()
+    _master_version += 1
+
+
+def _set_master_cache(df: pd.DataFrame) -> pd.DataFrame:
+    """메모리 캐시 + id 인덱스를 함께 갱신."""
     global _category_master_cache
+    _invalidate_master_cache()
+    _category_master_cache = df
+    _id_indexes.append(CategoryIdIndex(df))
+    return df
 
-    # 1) 메모리 캐시 우선
-    if _category_master_cache is not None and not force_rebuild:
-        return _category_master_cache
 
-    # 2) 파일 캐시(pkl) 사용
-    if not force_rebuild and MASTER_CACHE_FILE.exists():
+def _open_master_store() -> ColumnarMaster | None:
+    """컬럼형 스냅샷 열기 (신규 스키마가 아니면 None)."""
+    global _master_store
+    if _master_store is None:
+        store = ColumnarMaster.open_current(MASTER_STORE_DIR)
+        if store is not None and store.has_columns(NEW_SCHEMA_REQUIRED_COLS):
+            _master_store = store
+    return _master_store
+
+
+def get_category_id_index(master: pd.DataFrame | None = None) -> CategoryIdIndex:
+    """
+    마스터의 CategoryIdIndex 반환.
+    - master 생략: load_category_master() 결과 기준
+    - 캐시된 마스터(전체/컬럼 뷰)면 만들어 둔 인덱스 재사용,
+      아니면 그 DF 로 즉석에서 만든다.
+    """
+    if master is None:
+        master = load_category_master()
+    for index in _id_indexes:
+        if index.master is master:
+            return index
+    index = CategoryIdIndex(master)
+    if master is _category_master_cache or any(v is master for v in _master_views.values()):
+        _id_indexes.append(index)
+    return index
+
+
+def _load_full_master(progress_cb: Optional[Callable[[int, str], None]]) -> pd.DataFrame:
+    """
+    1) 컬럼형 스냅샷이 있으면 그걸로 DF 구성
+    2) 없으면 구버전 MASTER_CACHE_FILE(pkl) 을 읽어 컬럼형으로 옮김
+    3) 그것도 없거나 구버전 스키마면 get_category_master() 로 새로 생성
+    """
+    store = _open_master_store()
+    if store is not None:
+        if progress_cb:
+            progress_cb(0, f"기존 카테고리 마스터 캐시 로드: {store.directory}")
+        df = store.frame()
+        if progress_cb:
+            progress_cb(100, f"카테고리 마스터 캐시 로드 완료 (총 {len(df)}개)")
+        return df
+
+    if MASTER_CACHE_FILE.exists():
         if progress_cb:
             progress_cb(0, f"기존 카테고리 마스터 캐시 로드: {MASTER_CACHE_FILE}")
         df = pd.read_pickle(MASTER_CACHE_FILE)
 
         # ✅ 마스터 캐시도 구버전(= col_c~col_j 없음)이면 자동 재생성
-        if not _has_new_schema(df):
+        if _has_new_schema(df):
+            write_columnar_master(df, MASTER_STORE_DIR)
             if progress_cb:
-                progress_cb(0, "구버전 마스터 캐시 감지 → 전체 재생성 시작")
-            df = get_category_master(category_dir=CATEGORY_DIR, progress_cb=progress_cb)
-            _category_master_cache = df
+                progress_cb(100, f"카테고리 마스터 캐시 로드 완료 (총 {len(df)}개)")
             return df
-
         if progress_cb:
-            progress_cb(100, f"카테고리 마스터 캐시 로드 완료 (총 {len(df)}개)")
-        _category_master_cache = df
-        return df
+            progress_cb(0, "구버전 마스터 캐시 감지 → 전체 재생성 시작")
 
-    # 3) 없으면 새로 생성
-    df = get_category_master(category_dir=CATEGORY_DIR, progress_cb=progress_cb)
-    _category_master_cache = df
-    return df
+    return get_category_master(category_dir=CATEGORY_DIR, progress_cb=progress_cb)
+
+
+def load_category_master(force_rebuild: bool = False,
+                         progress_cb: Optional[Callable[[int, str], None]] = None,
+                         columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    - force_rebuild=False 이면:
+        1) 메모리 캐시 있으면 그대로 사용
+        2) 메모리 캐시 없으면 컬럼형 캐시(MASTER_STORE_DIR) 로드
+           (없으면 구버전 MASTER_CACHE_FILE pkl 을 읽어서 컬럼형으로 옮김)
+        3) 캐시가 전혀 없으면 get_category_master() 돌려서 새로 생성
+    - force_rebuild=True 이면:
+        무조건 get_category_master()로 다시 만들고 캐시 갱신
+    - columns 를 주면 그 컬럼만 가진 DF 를 반환 (예: 매처는 category_id / category_path 만).
+      전체 마스터가 아직 메모리에 없으면 컬럼형 캐시에서 해당 컬럼만 읽는다.
+    """
+    if force_rebuild:
+        df = get_category_master(category_dir=CATEGORY_DIR, progress_cb=progress_cb)
+        _set_master_cache(df)
+    elif columns is None:
+        # 1) 메모리 캐시 우선
+        if _category_master_cache is not None:
+            return _category_master_cache
+        return _set_master_cache(_load_full_master(progress_cb))
+
+    if columns is None:
+        return _category_master_cache
+
+    key = tuple(columns)
+    view = _master_views.get(key)
+    if view is not None:
+        return view
+
+    if _category_master_cache is not None:
+        view = _category_master_cache[list(key)]
+    else:
+        store = _open_master_store()
+        if store is not None and store.has_columns(key):
+            if progress_cb:
+                progress_cb(0, f"카테고리 마스터 캐시 로드 ({', '.join(key)}): {store.directory}")
+            view = store.frame(key)
+        else:
+            view = load_category_master(progress_cb=progress_cb)[list(key)]
+
+    _master_views[key] = view
+    return view
 
 # === 4) 카테고리 ID로 행 조회 헬퍼 (C~J 열 가져오는 헬퍼)===
 def get_category_row_by_id(category_id: str) -> Optional[pd.Series]:
@@ -304,20 +642,23 @@ def get_category_row_by_id(category_id: str) -> Optional[pd.Series]:
     category_id 로 카테고리 마스터에서 해당 행을 찾아 Series 로 반환.
     - 없으면 None
     - col_c ~ col_j 까지 같이 포함되어 있음.
+    - 전체 마스터가 아직 메모리에 없으면 id 컬럼 인덱스로 위치만 찾고,
+      그 한 행만 컬럼형 캐시에서 읽는다.
     """
-    df = load_category_master()
-    if df is None or df.empty:
-        return None
-
     cid = str(category_id).strip()
     if not cid:
         return None
 
-    mask = df["category_id"].astype(str) == cid
-    sub = df[mask]
-    if sub.empty:
+    store = _open_master_store() if _category_master_cache is None else None
+    if store is not None:
+        ids = load_category_master(columns=MASTER_ID_COLUMNS)
+        pos = get_category_id_index(ids).position(cid)
+        return None if pos is None else store.row(pos)
+
+    df = load_category_master()
+    if df is None or df.empty:
         return None
-    return sub.iloc[0]
+    return get_category_id_index(df).row(cid)
 
 # === pkl data 확인용 특정 카테고리 ID로 정보 조회 ===
 
@@ -327,8 +668,7 @@ def find_category_by_id(category_id: str | int):
     없으면 빈 DataFrame.
     """
     df = load_category_master()
-    cid = str(category_id).strip()
-    return df[df["category_id"] == cid]
+    return get_category_id_index(df).take([category_id])
 
 
 def get_category_info(category_id: str | int) -> dict | None:
@@ -0,0 +1,246 @@
+# cellon/category_ai/category_store.py
+"""
+카테고리 마스터 컬럼형(columnar) 디스크 캐시.
+
+category_master.pkl 은 시작할 때마다 DataFrame 전체(col_c~col_j 포함)를 역직렬화해야 해서,
+컬럼별로 아래처럼 나눠 저장하고 필요한 컬럼만 읽는다.
+
+    <root>/CURRENT                 : 현재 스냅샷 폴더 이름
+    <root>/<token>/meta.json       : {"format", "rows", "columns"}
+    <root>/<token>/<i>.data.npy    : i번째 컬럼 문자열들을 utf-8 로 이어붙인 uint8 배열
+    <root>/<token>/<i>.offsets.npy : 각 행의 시작 byte 위치 (int64, rows+1 개)
+
+- .npy 는 np.load(mmap_mode="r") 로 열어서, 여러 워커 프로세스가 같은 물리 페이지를 공유한다.
+  column() 은 지연 디코드 뷰(ColumnView) 라서 읽는 행만 파이썬 문자열이 된다.
+  frame() 은 DataFrame 을 만들어야 하므로 요청한 행(rows)/컬럼만 디코드한다 (전체 blob 복사 없음).
+- 쓰기는 새 스냅샷 폴더를 만든 뒤 CURRENT 만 바꿔치기 하므로,
+  다른 프로세스가 이전 스냅샷을 열고 있어도 깨지지 않는다.
+  · 직전 스냅샷 1개는 항상 남기고, 그보다 오래된 것도 만든 지 _SNAPSHOT_GRACE_SEC 가 지나야 지운다
+    (ColumnarMaster 는 .npy 를 지연해서 열기 때문에 리더가 아직 옛 스냅샷을 쓸 수 있음)
+  · 지울 때는 먼저 "<token>.trash" 로 이름을 바꾼 뒤 삭제 → 사용 중이라 이름을 못 바꾸면(Windows)
+    그대로 두고 다음 번에 다시 시도 (반쯤 지워진 스냅샷이 남지 않음)
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+STORE_FORMAT = 1
+_CURRENT_FILE = "CURRENT"
+_META_FILE = "meta.json"
+_TRASH_SUFFIX = ".trash"
+_SNAPSHOT_KEEP_PREVIOUS = 1        # CURRENT 외에 항상 남기는 이전 스냅샷 수
+_SNAPSHOT_GRACE_SEC = 10 * 60      # 이보다 최근에 만든 스냅샷은 지우지 않음
+_DECODE_CHUNK_ROWS = 4096          # ColumnView 순회 때 한 번에 복사/디코드하는 행 수
+
+
+def _cell_str(v) -> str:
+    if v is None:
+        return ""
+    try:
+        if pd.isna(v):
+            return ""
+    except (TypeError, ValueError):
+        pass
+    return str(v)
+
+
+def write_columnar_master(df: pd.DataFrame, root: Path) -> str:
+    """
+    df 를 새 스냅샷으로 저장하고 CURRENT 를 갱신한다. 스냅샷 이름(token) 반환.
+    모든 값은 문자열로 저장된다 (NaN/None → "").
+    """
+    root.mkdir(parents=True, exist_ok=True)
+    token = f"{time.time_ns():x}"
+    snap = root / token
+    snap.mkdir()
+
+    n = len(df)
+    columns = [str(c) for c in df.columns]
+    for i, col in enumerate(df.columns):
+        encoded = [_cell_str(v).encode("utf-8") for v in df[col].tolist()]
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        if n:
+            np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=n), out=offsets[1:])
+        data = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        np.save(snap / f"{i}.data.npy", data)
+        np.save(snap / f"{i}.offsets.npy", offsets)
+
+    with open(snap / _META_FILE, "w", encoding="utf-8") as f:
+        json.dump({"format": STORE_FORMAT, "rows": n, "columns": columns}, f, ensure_ascii=False)
+
+    tmp = root / f"{_CURRENT_FILE}.tmp"
+    tmp.write_text(token, encoding="utf-8")
+    os.replace(tmp, root / _CURRENT_FILE)
+
+    _remove_old_snapshots(root, keep=token)
+    return token
+
+
+def _snapshot_time_ns(name: str) -> Optional[int]:
+    """스냅샷 이름(token = 만든 시각 time_ns 의 16진수) → 만든 시각. 스냅샷 이름이 아니면 None."""
+    try:
+        return int(name, 16)
+    except ValueError:
+        return None
+
+
+def _remove_old_snapshots(root: Path, keep: str) -> None:
+    """
+    이전 스냅샷 정리.
+    - keep(새 CURRENT) + 그 직전 _SNAPSHOT_KEEP_PREVIOUS 개는 남김
+    - 나머지도 만든 지 _SNAPSHOT_GRACE_SEC 가 지난 것만 지움
+    - rename → rmtree 순서: 다른 프로세스가 mmap 중이라 rename 이 안 되면(Windows) 다음 번에 다시 시도
+    """
+    snapshots = sorted(
+        (t, p) for p in root.iterdir()
+        if p.is_dir() and p.name != keep and (t := _snapshot_time_ns(p.name)) is not None
+    )
+    old = snapshots[:-_SNAPSHOT_KEEP_PREVIOUS] if _SNAPSHOT_KEEP_PREVIOUS else snapshots
+    cutoff = time.time_ns() - int(_SNAPSHOT_GRACE_SEC * 1e9)
+
+    for created, p in old:
+        if created > cutoff:
+            continue
+        trash = p.with_name(p.name + _TRASH_SUFFIX)
+        try:
+            os.replace(p, trash)
+        except OSError:
+            continue
+        shutil.rmtree(trash, ignore_errors=True)
+
+    # 이전에 rename 까지만 되고 남은 휴지통 폴더
+    for p in root.glob(f"*{_TRASH_SUFFIX}"):
+        shutil.rmtree(p, ignore_errors=True)
+
+
+def _load_npy(path: Path) -> np.ndarray:
+    try:
+        return np.load(path, mmap_mode="r")
+    except ValueError:
+        # 길이 0 배열은 mmap 불가 → 일반 로드
+        return np.load(path)
+
+
+class ColumnView(Sequence[str]):
+    """컬럼 1개에 대한 지연 디코드 뷰. mmap 은 그대로 두고 읽는 행만 문자열로 만든다."""
+
+    __slots__ = ("_data", "_offsets", "_rows")
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray) -> None:
+        self._data = data
+        self._offsets = offsets
+        self._rows = max(0, len(offsets) - 1)
+
+    def __len__(self) -> int:
+        return self._rows
+
+    def _decode(self, pos: int) -> str:
+        start, end = int(self._offsets[pos]), int(self._offsets[pos + 1])
+        return self._data[start:end].tobytes().decode("utf-8")
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._decode(j) for j in range(*i.indices(self._rows))]
+        if i < 0:
+            i += self._rows
+        if not 0 <= i < self._rows:
+            raise IndexError(i)
+        return self._decode(i)
+
+    def __iter__(self) -> Iterator[str]:
+        # 행마다 numpy 슬라이스를 만들면 느리므로 _DECODE_CHUNK_ROWS 행씩 묶어서 복사/디코드
+        for a in range(0, self._rows, _DECODE_CHUNK_ROWS):
+            b = min(self._rows, a + _DECODE_CHUNK_ROWS)
+            bounds = self._offsets[a:b + 1].tolist()
+            base = bounds[0]
+            chunk = self._data[base:bounds[-1]].tobytes()
+            for k in range(b - a):
+                yield chunk[bounds[k] - base:bounds[k + 1] - base].decode("utf-8")
+
+    def take(self, positions: Iterable[int]) -> List[str]:
+        return [self[int(p)] for p in positions]
+
+
+class ColumnarMaster:
+    """
+    컬럼형 스냅샷 1개에 대한 지연 로딩 뷰.
+    - column(name) 을 처음 부를 때만 해당 컬럼 .npy 를 mmap 으로 연다.
+    - value(name, pos) 는 그 행의 byte 범위만 디코드한다.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        self.token = self.directory.name
+        with open(self.directory / _META_FILE, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != STORE_FORMAT:
+            raise ValueError(f"지원하지 않는 카테고리 캐시 포맷: {meta.get('format')}")
+        self.rows: int = int(meta["rows"])
+        self.columns: List[str] = list(meta["columns"])
+        self._col_no: Dict[str, int] = {c: i for i, c in enumerate(self.columns)}
+        self._raw: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+    @classmethod
+    def open_current(cls, root: Path) -> Optional["ColumnarMaster"]:
+        """CURRENT 가 가리키는 스냅샷을 연다. 없거나 깨졌으면 None."""
+        try:
+            token = (root / _CURRENT_FILE).read_text(encoding="utf-8").strip()
+            if not token:
+                return None
+            return cls(root / token)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def has_columns(self, columns: Sequence[str]) -> bool:
+        return all(c in self._col_no for c in columns)
+
+    def _arrays(self, name: str) -> Tuple[np.ndarray, np.ndarray]:
+        raw = self._raw.get(name)
+        if raw is None:
+            i = self._col_no[name]
+            raw = (
+                _load_npy(self.directory / f"{i}.data.npy"),
+                _load_npy(self.directory / f"{i}.offsets.npy"),
+            )
+            self._raw[name] = raw
+        return raw
+
+    def column(self, name: str) -> ColumnView:
+        return ColumnView(*self._arrays(name))
+
+    def value(self, name: str, pos: int) -> str:
+        data, offsets = self._arrays(name)
+        start, end = int(offsets[pos]), int(offsets[pos + 1])
+        return data[start:end].tobytes().decode("utf-8")
+
+    def frame(
+        self,
+        columns: Optional[Sequence[str]] = None,
+        rows: Optional[Sequence[int]] = None,
+    ) -> pd.DataFrame:
+        """
+        columns/rows 만 디코드한 DataFrame (rows 를 주면 index 도 그 위치).
+        DataFrame 의 문자열은 프로세스마다 따로 갖게 되므로 필요한 컬럼만 요청할 것.
+        """
+        cols = list(columns) if columns is not None else list(self.columns)
+        if rows is None:
+            return pd.DataFrame({c: list(self.column(c)) for c in cols}, columns=cols)
+        rows = [int(r) for r in rows]
+        return pd.DataFrame({c: self.column(c).take(rows) for c in cols}, columns=cols, index=rows)
+
+    def row(self, pos: int, columns: Optional[Sequence[str]] = None) -> pd.Series:
+        cols = list(columns) if columns is not None else list(self.columns)
+        return pd.Series({c: self.value(c, pos) for c in cols}, name=pos, dtype=object)
@@ -15,6 +15,7 @@ from .category_loader import get_category_master
 from .category_rules_builder import build_coupang_rules_for_all_groups
 
 from .category_ai_meta_rules_builder import build_meta_rules
+from build_coupang_upload_index import build_coupang_upload_index
 
 
 class CategoryBuildWorker(QThread):
@@ -83,6 +84,23 @@ class CategoryBuildWorker(QThread):
             self.error.emit(str(e))
             
             
+class UploadIndexBuildWorker(QThread):
+    """
+    coupang_upload_form 템플릿 인덱스(coupang_upload_index.json)를 만드는 워커(QThread).
+    - 템플릿마다 메타 스캔(openpyxl read-only + sha1, 프로세스 풀)을 하므로 UI 스레드에서 돌리지 않는다
+    - 완료 시 finished(Path) 시그널로 인덱스 JSON 경로 전달
+    - 오류 시 error(str) 시그널로 메시지 전달
+    """
+    finished = pyqtSignal(object)  # Path
+    error = pyqtSignal(str)
+
+    def run(self):
+        try:
+            self.finished.emit(build_coupang_upload_index())
+        except Exception as e:
+            self.error.emit(str(e))
+
+
     # CategoryWorker 클래스 내부 혹은 유틸리티 섹션에 삽입
     def save_to_excel_template(self, product, matched_category):
         """
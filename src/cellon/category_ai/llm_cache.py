@@ -0,0 +1,137 @@
+# cellon/category_ai/llm_cache.py
+"""
+LLM 응답 캐시 (SQLite, 내용 주소 방식).
+
+- 키: sha256(model, system_prompt, user_prompt[, 추가 요청 옵션])
+  → 같은 상품 재크롤링 / 같은 후보 목록이면 프롬프트가 같으므로 Ollama 를 다시 부르지 않는다.
+- TTL 이 지난 항목은 조회되지 않고, 최대 개수를 넘으면 마지막 사용이 오래된 것부터 삭제.
+- 모델이 답하는 데 걸린 시간(elapsed_sec)을 같이 저장해서, 히트 때 "아낀 시간"을 알려준다.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from ..config import LLM_CACHE_DB, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SEC
+
+
+def llm_cache_key(model: str, system_prompt: str, user_prompt: str, extra: Any = None) -> str:
+    parts = [model or "", system_prompt or "", user_prompt or ""]
+    if extra is not None:
+        parts.append(json.dumps(extra, ensure_ascii=False, sort_keys=True, default=str))
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """key → (응답 원문, 모델 소요 시간). 스레드 안전 (연결 1개 + lock)."""
+
+    def __init__(self, db_path: Path, *, ttl_sec: float, max_entries: int) -> None:
+        self.db_path = Path(db_path)
+        self.ttl_sec = float(ttl_sec)
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        # 이번 실행 동안의 누적 통계
+        self.hits = 0
+        self.misses = 0
+        self.saved_sec = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS llm_cache (
+                    key         TEXT PRIMARY KEY,
+                    model       TEXT NOT NULL,
+                    response    TEXT NOT NULL,
+                    elapsed_sec REAL NOT NULL,
+                    created_at  REAL NOT NULL,
+                    last_used   REAL NOT NULL,
+                    hits        INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[Tuple[str, float]]:
+        """(응답 원문, 원래 걸렸던 초) 또는 None."""
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT response, elapsed_sec, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[2] > self.ttl_sec:
+                if row is not None:
+                    conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    conn.commit()
+                self.misses += 1
+                return None
+            conn.execute(
+                "UPDATE llm_cache SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key)
+            )
+            conn.commit()
+            self.hits += 1
+            self.saved_sec += float(row[1])
+        return row[0], float(row[1])
+
+    def put(self, key: str, model: str, response: str, elapsed_sec: float) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                """
+                INSERT INTO llm_cache (key, model, response, elapsed_sec, created_at, last_used, hits)
+                VALUES (?, ?, ?, ?, ?, ?, 0)
+                ON CONFLICT(key) DO UPDATE SET
+                    response = excluded.response,
+                    elapsed_sec = excluded.elapsed_sec,
+                    created_at = excluded.created_at,
+                    last_used = excluded.last_used
+                """,
+                (key, model or "", response, float(elapsed_sec), now, now),
+            )
+            conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl_sec,))
+            (count,) = conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    """
+                    DELETE FROM llm_cache WHERE key IN (
+                        SELECT key FROM llm_cache ORDER BY last_used ASC LIMIT ?
+                    )
+                    """,
+                    (overflow,),
+                )
+            conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "saved_sec": round(self.saved_sec, 2)}
+
+
+_LLM_CACHE: Optional[LLMResponseCache] = None
+_LLM_CACHE_LOCK = threading.Lock()
+
+
+def get_llm_cache() -> LLMResponseCache:
+    """프로세스 공용 LLMResponseCache (config 의 LLM_CACHE_* 사용)."""
+    global _LLM_CACHE
+    with _LLM_CACHE_LOCK:
+        if _LLM_CACHE is None:
+            _LLM_CACHE = LLMResponseCache(
+                LLM_CACHE_DB, ttl_sec=LLM_CACHE_TTL_SEC, max_entries=LLM_CACHE_MAX_ENTRIES
+            )
+        return _LLM_CACHE
@@ -0,0 +1,154 @@
+# cellon/category_ai/llm_warmup.py
+"""
+로컬 LLM 워밍업 + 속도 측정.
+
+- 앱 시작 직후 백그라운드 스레드에서 모델을 미리 올려 둔다
+  (qwen2.5:7b 를 CPU 로 처음 올리면 수십 초 → 첫 카테고리 추천에서 기다리지 않게)
+- 짧은 고정 프롬프트로 한 번 호출해서 prompt/출력 토큰 처리 속도(tokens/sec)를 기록
+- recommended_llm_deadline(): 기록된 속도로 "이 정도 프롬프트면 몇 초면 충분한지" 계산
+  → call_ollama_chat 이 timeout 을 따로 안 받으면 이 값을 데드라인으로 사용
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from ..config import LOCAL_LLM_DEADLINE_SEC, LOCAL_LLM_WARMUP_DEADLINE_SEC
+from .ollama_client import LLMError, get_ollama_client
+
+
+# 속도 측정용 고정 프롬프트 (카테고리 추천 응답과 비슷한 길이의 JSON 한 개)
+_PROBE_SYSTEM = "너는 JSON 만 출력한다."
+_PROBE_USER = (
+    "다음 상품의 카테고리를 후보 중에서 골라 JSON 으로 답하라.\n"
+    "상품명: 스테인리스 양수냄비 24cm\n"
+    "후보: [1] 주방용품>취사도구>냄비>양수냄비, [2] 주방용품>취사도구>프라이팬\n"
+    '형식: {"category_id": "...", "reason": "..."}'
+)
+_PROBE_NUM_PREDICT = 48
+
+# 데드라인 추천값 계산용
+_DEADLINE_SAFETY = 2.5       # 측정 속도 대비 여유 배수
+_DEADLINE_MIN_SEC = 15.0
+DEFAULT_OUTPUT_TOKENS = 80  # 추천 JSON 한 개 출력 토큰 (대략)
+
+
+@dataclass
+class LLMProbe:
+    model: str
+    ok: bool
+    load_sec: float = 0.0            # 워밍업(모델 로드) 요청 소요
+    prompt_tokens: int = 0
+    prompt_tps: float = 0.0          # prompt 처리 속도 (tokens/sec)
+    eval_tokens: int = 0
+    eval_tps: float = 0.0            # 출력 생성 속도 (tokens/sec)
+    probe_sec: float = 0.0           # 측정 요청 전체 소요
+    error: Optional[str] = None
+    measured_at: str = ""
+
+    def summary(self) -> str:
+        if not self.ok:
+            return f"model={self.model} 실패: {self.error}"
+        return (
+            f"model={self.model} 로드 {self.load_sec:.1f}초, "
+            f"prompt {self.prompt_tps:.0f} tok/s, 출력 {self.eval_tps:.1f} tok/s"
+        )
+
+
+_LAST_PROBE: Optional[LLMProbe] = None
+_PROBE_LOCK = threading.Lock()
+
+
+def _rate(count: Any, duration_ns: Any) -> float:
+    try:
+        count = float(count or 0)
+        sec = float(duration_ns or 0) / 1e9
+    except (TypeError, ValueError):
+        return 0.0
+    return count / sec if count > 0 and sec > 0 else 0.0
+
+
+def warm_up_llm(probe: bool = True) -> LLMProbe:
+    """
+    모델 로드 + (선택) 속도 측정. 실패해도 예외 대신 ok=False 인 LLMProbe 반환.
+    결과는 get_llm_probe() 로 다시 볼 수 있다.
+    """
+    global _LAST_PROBE
+    client = get_ollama_client()
+    result = LLMProbe(model=client.model, ok=False, measured_at=datetime.now().isoformat(timespec="seconds"))
+
+    try:
+        t0 = time.monotonic()
+        client.load_model(deadline=LOCAL_LLM_WARMUP_DEADLINE_SEC)
+        result.load_sec = time.monotonic() - t0
+
+        if probe:
+            t1 = time.monotonic()
+            data: Dict[str, Any] = client.chat_raw(
+                _PROBE_SYSTEM,
+                _PROBE_USER,
+                deadline=LOCAL_LLM_WARMUP_DEADLINE_SEC,
+                options={"num_predict": _PROBE_NUM_PREDICT, "temperature": 0},
+            )
+            result.probe_sec = time.monotonic() - t1
+            result.prompt_tokens = int(data.get("prompt_eval_count") or 0)
+            result.prompt_tps = _rate(data.get("prompt_eval_count"), data.get("prompt_eval_duration"))
+            result.eval_tokens = int(data.get("eval_count") or 0)
+            result.eval_tps = _rate(data.get("eval_count"), data.get("eval_duration"))
+        result.ok = True
+    except LLMError as e:
+        result.error = str(e)
+
+    with _PROBE_LOCK:
+        # 실패한 재측정이 이전의 정상 측정값을 덮지 않도록
+        if result.ok or _LAST_PROBE is None or not _LAST_PROBE.ok:
+            _LAST_PROBE = result
+    print(f"[LLM][warmup] {result.summary()}")
+    return result
+
+
+def get_llm_probe() -> Optional[LLMProbe]:
+    with _PROBE_LOCK:
+        return _LAST_PROBE
+
+
+def recommended_llm_deadline(
+    prompt_tokens: int,
+    output_tokens: int = DEFAULT_OUTPUT_TOKENS,
+    max_deadline: float = LOCAL_LLM_DEADLINE_SEC,
+) -> Optional[float]:
+    """
+    측정된 속도 기준 데드라인(초): (prompt 처리 + 출력 생성 예상 시간) × 여유 배수
+    + 워밍업 때 잰 모델 로드 시간 (keep_alive 가 지나 모델이 내려갔다가 다시 올라오는 경우 대비).
+    max_deadline 으로 상한 (배치처럼 출력이 긴 호출은 더 큰 상한을 넘김).
+    측정값이 없으면 None (→ 호출부는 LOCAL_LLM_DEADLINE_SEC 사용).
+    """
+    probe = get_llm_probe()
+    if probe is None or not probe.ok or probe.prompt_tps <= 0 or probe.eval_tps <= 0:
+        return None
+    expected = prompt_tokens / probe.prompt_tps + output_tokens / probe.eval_tps
+    budget = expected * _DEADLINE_SAFETY + probe.load_sec
+    return min(max_deadline, max(_DEADLINE_MIN_SEC, budget))
+
+
+def start_llm_warmup(
+    on_done: Optional[Callable[[LLMProbe], None]] = None,
+    probe: bool = True,
+) -> threading.Thread:
+    """warm_up_llm 을 데몬 스레드로 실행. on_done(LLMProbe) 은 그 스레드에서 호출된다."""
+
+    def _run() -> None:
+        result = warm_up_llm(probe=probe)
+        if on_done is not None:
+            try:
+                on_done(result)
+            except Exception as e:
+                print(f"[LLM][warmup] on_done 콜백 오류 (무시): {e}")
+
+    t = threading.Thread(target=_run, name="llm-warmup", daemon=True)
+    t.start()
+    return t
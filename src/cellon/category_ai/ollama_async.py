@@ -0,0 +1,274 @@
+# cellon/category_ai/ollama_async.py
+"""
+Ollama 비동기(asyncio) 호출 계층.
+
+- 전용 이벤트 루프 스레드 1개에서 모든 LLM 요청을 관리한다.
+  · asyncio.Semaphore 로 동시 요청 수를 LOCAL_LLM_NUM_PARALLEL 로 제한
+    (Ollama 서버의 OLLAMA_NUM_PARALLEL 보다 많이 보내 봐야 서버 큐에서 기다릴 뿐)
+  · 같은 요청(모델 + 프롬프트 + format/options/stream)이 처리 중이면 새로 보내지 않고
+    같은 Task 결과를 나눠 받는다 (in-flight 중복 제거)
+- 실제 HTTP 는 기존 OllamaClient(keep-alive 풀 + 재시도 + 스트리밍)를 스레드 풀에서 실행
+  → 재시도/타임아웃/스트리밍 조기 종료 로직을 한 곳에만 둔다.
+- async 코드: `await client.chat(...)` (어느 이벤트 루프에서 불러도 됨)
+  동기 코드: `client.chat_sync(...)` (매처/QThread 워커 등 기존 호출부)
+- on_progress 는 HTTP 를 도는 스레드가 아니라 호출한 쪽 스레드(동기) / 이벤트 루프(async)에서 불린다
+  (매처 로그 → Qt 위젯처럼 다른 스레드에서 만지면 안 되는 콜백이 많음)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import queue
+import threading
+import time
+from concurrent.futures import CancelledError as FutureCancelledError
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, Optional
+
+from ..config import LOCAL_LLM_NUM_PARALLEL, LOCAL_LLM_QUEUE_SLACK_SEC
+from .llm_cache import llm_cache_key
+from .ollama_client import LLMError, OllamaClient, get_ollama_client
+
+
+_PROGRESS_POLL_SEC = 0.2  # chat_sync: 진행 콜백을 호출 스레드로 옮겨 부르는 간격
+
+
+def _call_progress(on_progress: Callable[[int, str], None], n_chars: int, text: str) -> None:
+    try:
+        on_progress(n_chars, text)
+    except Exception as e:
+        print(f"[LLM] on_progress 콜백 오류 (무시): {e}")
+
+
+class AsyncOllamaClient:
+    """OllamaClient 위의 asyncio 계층 (동시성 제한 + 같은 요청 합치기)."""
+
+    def __init__(self, client: Optional[OllamaClient] = None, *, max_concurrency: int = LOCAL_LLM_NUM_PARALLEL) -> None:
+        self.client = client or get_ollama_client()
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="ollama-call"
+        )
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="ollama-loop", daemon=True
+        )
+        self._thread.start()
+
+        # 루프 스레드 안에서만 만지는 상태
+        self._sem = asyncio.run_coroutine_threadsafe(self._make_semaphore(), self._loop).result()
+        self._inflight: Dict[str, "asyncio.Task[str]"] = {}
+
+        # 통계 (루프 스레드에서만 갱신)
+        self.requests = 0
+        self.coalesced = 0
+
+    async def _make_semaphore(self) -> asyncio.Semaphore:
+        return asyncio.Semaphore(self.max_concurrency)
+
+    # ---------- 내부: 루프 스레드에서 실행 ----------
+    async def _call(self, call: Callable[[], str]) -> str:
+        async with self._sem:
+            return await self._loop.run_in_executor(self._executor, call)
+
+    def _forget(self, key: str, task: "asyncio.Task[str]") -> None:
+        if self._inflight.get(key) is task:
+            self._inflight.pop(key, None)
+        # 기다리던 쪽이 모두 먼저 포기했으면 "exception was never retrieved" 경고가 나지 않도록 꺼내 둔다
+        if not task.cancelled():
+            task.exception()
+
+    async def _run(
+        self,
+        key: str,
+        call: Callable[[], str],
+    ) -> str:
+        """
+        같은 key 의 HTTP 호출은 Task 하나로 돌리고, 처음 보낸 쪽을 포함한 모든 대기자가 shield 로 기다린다.
+        → 한 대기자가 타임아웃으로 취소돼도 같은 결과를 기다리는 다른 대기자에게는 영향이 없다.
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            task = self._loop.create_task(self._call(call))
+            self._inflight[key] = task
+            self.requests += 1
+            task.add_done_callback(lambda t: self._forget(key, t))
+        return await asyncio.shield(task)
+
+    def _chat_coro(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        deadline: Optional[float],
+        options: Optional[Dict[str, Any]],
+        response_format: Any,
+        stream: bool,
+        stop_when: Optional[Callable[[Dict[str, Any]], bool]],
+        on_progress: Optional[Callable[[int, str], None]],
+    ):
+        client = self.client
+        key = llm_cache_key(
+            client.model,
+            system_prompt,
+            user_prompt,
+            extra={"format": response_format, "options": options, "stream": stream},
+        )
+        if stream:
+            def call() -> str:
+                return client.chat_stream(
+                    system_prompt,
+                    user_prompt,
+                    deadline=deadline,
+                    options=options,
+                    response_format=response_format,
+                    stop_when=stop_when,
+                    on_progress=on_progress,
+                )
+        else:
+            def call() -> str:
+                return client.chat(
+                    system_prompt,
+                    user_prompt,
+                    deadline=deadline,
+                    options=options,
+                    response_format=response_format,
+                )
+        return self._run(key, call)
+
+    # ---------- 공개 API ----------
+    async def chat(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        deadline: Optional[float] = None,
+        options: Optional[Dict[str, Any]] = None,
+        response_format: Any = None,
+        stream: bool = False,
+        stop_when: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        on_progress: Optional[Callable[[int, str], None]] = None,
+    ) -> str:
+        """
+        비동기 chat. 반환/예외는 OllamaClient.chat / chat_stream 과 같다 (실패 시 LLMError).
+        같은 요청이 이미 처리 중이면 그 결과를 같이 받는다 (이때 on_progress 는 먼저 보낸 쪽에만 호출됨).
+        on_progress 는 await 한 쪽 이벤트 루프에서 call_soon_threadsafe 로 불린다.
+        """
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        relay = None
+        if on_progress is not None and running is not None:
+            def relay(n_chars: int, text: str) -> None:
+                running.call_soon_threadsafe(_call_progress, on_progress, n_chars, text)
+
+        coro = self._chat_coro(
+            system_prompt,
+            user_prompt,
+            deadline=deadline,
+            options=options,
+            response_format=response_format,
+            stream=stream,
+            stop_when=stop_when,
+            on_progress=relay,
+        )
+        if running is self._loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._loop))
+
+    def chat_sync(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        deadline: Optional[float] = None,
+        options: Optional[Dict[str, Any]] = None,
+        response_format: Any = None,
+        stream: bool = False,
+        stop_when: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        on_progress: Optional[Callable[[int, str], None]] = None,
+    ) -> str:
+        """
+        동기 호출부용 (매처 / QThread 워커). 인자는 chat() 과 같다.
+        - on_progress 는 이 함수를 부른 스레드에서 호출된다 (결과를 기다리는 동안 큐에서 꺼내 부름)
+        - 대기 상한 = deadline(없으면 클라이언트 기본값) + LOCAL_LLM_QUEUE_SLACK_SEC
+          (deadline 은 HTTP 호출에만 걸리고, 동시 요청 제한으로 줄 서 있는 시간은 안 셈) → 넘으면 취소 + LLMError
+          (취소되는 건 이 호출의 대기뿐, 같은 요청을 나눠 받는 다른 호출부의 HTTP 호출은 계속된다)
+        """
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("LLM 이벤트 루프 스레드 안에서는 chat_sync 를 쓸 수 없습니다 (await chat 사용).")
+
+        progress_q: Optional["queue.SimpleQueue[tuple]"] = None
+        relay = None
+        if on_progress is not None:
+            progress_q = queue.SimpleQueue()
+
+            def relay(n_chars: int, text: str) -> None:
+                progress_q.put((n_chars, text))
+
+        def _drain() -> None:
+            while progress_q is not None:
+                try:
+                    n_chars, text = progress_q.get_nowait()
+                except queue.Empty:
+                    return
+                _call_progress(on_progress, n_chars, text)
+
+        coro = self._chat_coro(
+            system_prompt,
+            user_prompt,
+            deadline=deadline,
+            options=options,
+            response_format=response_format,
+            stream=stream,
+            stop_when=stop_when,
+            on_progress=relay,
+        )
+        fut = asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+        budget = (self.client.default_deadline if deadline is None else float(deadline)) + LOCAL_LLM_QUEUE_SLACK_SEC
+        end = time.monotonic() + budget
+        while True:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                fut.cancel()
+                _drain()
+                raise LLMError(f"LLM 응답 대기 시간 초과 ({budget:.0f}초, 동시 요청 대기 포함)")
+            wait = min(remaining, _PROGRESS_POLL_SEC) if progress_q is not None else remaining
+            try:
+                result = fut.result(timeout=wait)
+            except FutureTimeoutError:
+                _drain()
+                continue
+            except (FutureCancelledError, asyncio.CancelledError) as e:
+                _drain()
+                raise LLMError("LLM 호출이 취소되었습니다.") from e
+            _drain()
+            return result
+
+    def stats(self) -> Dict[str, int]:
+        return {"requests": self.requests, "coalesced": self.coalesced, "in_flight": len(self._inflight)}
+
+    def close(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._executor.shutdown(wait=False)
+
+
+_ASYNC_CLIENT: Optional[AsyncOllamaClient] = None
+_ASYNC_CLIENT_LOCK = threading.Lock()
+
+
+def get_async_ollama_client() -> AsyncOllamaClient:
+    """모듈 공용 AsyncOllamaClient (처음 호출 때 생성, get_ollama_client() 를 감쌈)."""
+    global _ASYNC_CLIENT
+    with _ASYNC_CLIENT_LOCK:
+        if _ASYNC_CLIENT is None:
+            _ASYNC_CLIENT = AsyncOllamaClient()
+        return _ASYNC_CLIENT
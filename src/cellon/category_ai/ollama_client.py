@@ -0,0 +1,352 @@
+# cellon/category_ai/ollama_client.py
+"""
+Ollama HTTP 클라이언트 (모듈 공용 1개).
+
+- requests.Session + HTTPAdapter 커넥션 풀로 LOCAL_LLM_BASE_URL 에 keep-alive 연결 재사용
+- 재시도/백오프는 urllib3 Retry 로 한 번만 설정
+  (접속 실패 / 502·503·504 같은 "모델이 아직 안 떠 있는" 경우만 재시도,
+   읽기 타임아웃은 재시도하지 않음 → 데드라인을 넘겨서 다시 생성시키지 않음)
+- 호출마다 deadline(초) 을 줄 수 있고, 생략하면 config 의 LOCAL_LLM_DEADLINE_SEC 사용
+- chat_stream(): /api/chat 을 stream=True 로 받아서, 원하는 JSON 객체가 완성되는 즉시
+  연결을 끊는다 (모델이 JSON 뒤에 붙이는 잡담을 기다리지 않음 + 진행 상황 콜백)
+- response_format: Ollama 의 "format" 필드 ("json" 또는 JSON schema dict → 구조화 출력)
+- 모든 /api/chat 요청에 keep_alive 와 options.num_ctx 를 같은 값으로 넣는다
+  (num_ctx 가 요청마다 다르면 Ollama 가 모델을 다시 올린다)
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, ReadTimeoutError
+from urllib3.util.retry import Retry
+
+from ..config import (
+    LOCAL_LLM_BASE_URL,
+    LOCAL_LLM_MODEL,
+    LOCAL_LLM_CONNECT_TIMEOUT_SEC,
+    LOCAL_LLM_DEADLINE_SEC,
+    LOCAL_LLM_MAX_RETRIES,
+    LOCAL_LLM_POOL_SIZE,
+    LOCAL_LLM_KEEP_ALIVE,
+    LOCAL_LLM_NUM_CTX,
+)
+
+
+class LLMError(RuntimeError):
+    pass
+
+
+def _is_timeout(e: requests.RequestException) -> bool:
+    """재시도 어댑터를 거치면 읽기 타임아웃이 ConnectionError(MaxRetryError) 로 감싸져 올라온다."""
+    if isinstance(e, requests.exceptions.Timeout):
+        return True
+    if not e.args:
+        return False
+    inner = e.args[0]
+    # 스트리밍 중 읽기 타임아웃은 ConnectionError(ReadTimeoutError) 로 바로 감싸져 온다.
+    reason = getattr(inner, "reason", inner)
+    return isinstance(reason, (ReadTimeoutError, ConnectTimeoutError))
+
+
+class JsonObjectScanner:
+    """
+    조각으로 들어오는 텍스트에서 완성된 최상위 JSON 객체({ ... }) 구간을 찾아낸다.
+    (문자열 안의 괄호 / 이스케이프는 무시)
+    """
+
+    def __init__(self) -> None:
+        self._buf: List[str] = []
+        self._cur: List[str] = []
+        self._depth = 0
+        self._in_str = False
+        self._escape = False
+
+    def feed(self, text: str) -> List[str]:
+        """text 를 이어 붙이고, 이번에 닫힌 최상위 객체 문자열들을 반환."""
+        done: List[str] = []
+        for ch in text:
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._cur = [ch]
+                continue
+
+            self._cur.append(ch)
+            if self._in_str:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_str = False
+            elif ch == '"':
+                self._in_str = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    done.append("".join(self._cur))
+                    self._cur = []
+        return done
+
+
+class OllamaClient:
+    """
+    /api/* 호출용 클라이언트. 스레드 간 공유해서 사용한다.
+    """
+
+    def __init__(
+        self,
+        base_url: str = LOCAL_LLM_BASE_URL,
+        model: str = LOCAL_LLM_MODEL,
+        *,
+        connect_timeout: float = LOCAL_LLM_CONNECT_TIMEOUT_SEC,
+        default_deadline: float = LOCAL_LLM_DEADLINE_SEC,
+        max_retries: int = LOCAL_LLM_MAX_RETRIES,
+        backoff_factor: float = 0.6,
+        pool_size: int = LOCAL_LLM_POOL_SIZE,
+        keep_alive: Optional[str] = LOCAL_LLM_KEEP_ALIVE,
+        num_ctx: Optional[int] = LOCAL_LLM_NUM_CTX,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.keep_alive = keep_alive
+        self.num_ctx = num_ctx
+        self.connect_timeout = float(connect_timeout)
+        self.default_deadline = float(default_deadline)
+
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            status=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=frozenset({"GET", "POST"}),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def url(self, path: str) -> str:
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def _timeout(self, deadline: Optional[float]) -> tuple[float, float]:
+        """(connect, read) 타임아웃. read 는 남은 데드라인 전체."""
+        budget = self.default_deadline if deadline is None else float(deadline)
+        budget = max(1.0, budget)
+        return (min(self.connect_timeout, budget), budget)
+
+    @staticmethod
+    def _request_error(e: requests.RequestException, timeout: tuple[float, float]) -> LLMError:
+        if _is_timeout(e):
+            return LLMError(f"LLM 호출 타임아웃 (connect={timeout[0]}s, deadline={timeout[1]}s)")
+        return LLMError(f"LLM HTTP 호출 실패: {e}")
+
+    def post_json(
+        self,
+        path: str,
+        payload: Dict[str, Any],
+        *,
+        deadline: Optional[float] = None,
+    ) -> Dict[str, Any]:
+        """
+        JSON POST → JSON 응답 dict.
+        deadline 초 안에 응답 전체를 못 받으면 LLMError.
+        """
+        url = self.url(path)
+        timeout = self._timeout(deadline)
+        try:
+            resp = self.session.post(url, json=payload, timeout=timeout)
+            resp.raise_for_status()
+        except requests.RequestException as e:
+            raise self._request_error(e, timeout) from e
+
+        try:
+            return resp.json()
+        except ValueError as e:
+            raise LLMError(f"LLM 응답 JSON 파싱 실패: {e} | raw={resp.text[:200]}") from e
+
+    def _chat_payload(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        stream: bool,
+        options: Optional[Dict[str, Any]],
+        response_format: Any = None,
+    ) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt},
+            ],
+            "stream": stream,
+        }
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        merged = dict(options or {})
+        if self.num_ctx:
+            merged.setdefault("num_ctx", self.num_ctx)
+        if merged:
+            payload["options"] = merged
+        if response_format is not None:
+            payload["format"] = response_format
+        return payload
+
+    def chat_raw(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        deadline: Optional[float] = None,
+        options: Optional[Dict[str, Any]] = None,
+        response_format: Any = None,
+    ) -> Dict[str, Any]:
+        """/api/chat (stream=False) 응답 dict 전체 (eval_count / eval_duration 등 통계 포함)."""
+        payload = self._chat_payload(
+            system_prompt, user_prompt, stream=False, options=options, response_format=response_format
+        )
+        return self.post_json("/api/chat", payload, deadline=deadline)
+
+    def chat(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        deadline: Optional[float] = None,
+        options: Optional[Dict[str, Any]] = None,
+        response_format: Any = None,
+    ) -> str:
+        """/api/chat (stream=False) → assistant content 문자열."""
+        data = self.chat_raw(
+            system_prompt, user_prompt, deadline=deadline, options=options, response_format=response_format
+        )
+
+        # Ollama /api/chat 응답 형식: { message: { role, content, ... }, ... }
+        msg = data.get("message") or {}
+        content = (msg.get("content") or "").strip()
+        if not content:
+            raise LLMError(f"LLM 응답이 비어 있습니다: {data}")
+        return content
+
+    def chat_stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        *,
+        deadline: Optional[float] = None,
+        options: Optional[Dict[str, Any]] = None,
+        response_format: Any = None,
+        stop_when: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        on_progress: Optional[Callable[[int, str], None]] = None,
+        progress_interval: float = 0.5,
+    ) -> str:
+        """
+        /api/chat (stream=True) → assistant content 문자열.
+
+        - stop_when(obj) 가 True 인 JSON 객체가 완성되면 그 객체 문자열만 반환하고
+          바로 응답을 닫는다 (Ollama 는 연결이 끊기면 생성을 멈춤)
+        - on_progress(받은 글자 수, 지금까지의 텍스트) 는 progress_interval 초에 한 번만 호출
+        - deadline 은 스트림 전체 기준 (청크 사이에서 확인)
+        """
+        payload = self._chat_payload(
+            system_prompt, user_prompt, stream=True, options=options, response_format=response_format
+        )
+        url = self.url("/api/chat")
+        timeout = self._timeout(deadline)
+        t_end = time.monotonic() + timeout[1]
+
+        try:
+            resp = self.session.post(url, json=payload, timeout=timeout, stream=True)
+            resp.raise_for_status()
+        except requests.RequestException as e:
+            raise self._request_error(e, timeout) from e
+
+        parts: List[str] = []
+        n_chars = 0
+        scanner = JsonObjectScanner() if stop_when is not None else None
+        last_progress = 0.0
+        try:
+            # Ollama 는 chunked 전송이라 청크(=NDJSON 한 줄)가 오는 대로 바로 읽힌다.
+            for line in resp.iter_lines():
+                if time.monotonic() > t_end:
+                    raise LLMError(f"LLM 호출 타임아웃 (스트리밍, deadline={timeout[1]}s)")
+                if not line:
+                    continue
+                try:
+                    chunk = json.loads(line)
+                except ValueError:
+                    continue
+                if chunk.get("error"):
+                    raise LLMError(f"LLM 스트리밍 오류: {chunk['error']}")
+
+                piece = (chunk.get("message") or {}).get("content") or ""
+                if piece:
+                    parts.append(piece)
+                    n_chars += len(piece)
+
+                    if on_progress is not None:
+                        now = time.monotonic()
+                        if now - last_progress >= progress_interval:
+                            last_progress = now
+                            try:
+                                on_progress(n_chars, "".join(parts))
+                            except Exception:
+                                pass
+
+                    if scanner is not None:
+                        for obj_text in scanner.feed(piece):
+                            try:
+                                obj = json.loads(obj_text)
+                            except ValueError:
+                                continue
+                            if isinstance(obj, dict) and stop_when(obj):
+                                return obj_text
+
+                if chunk.get("done"):
+                    break
+        except requests.RequestException as e:
+            raise self._request_error(e, timeout) from e
+        finally:
+            resp.close()
+
+        content = "".join(parts).strip()
+        if not content:
+            raise LLMError("LLM 스트리밍 응답이 비어 있습니다.")
+        return content
+
+    def load_model(self, *, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """
+        모델만 메모리에 올린다 (messages 가 빈 /api/chat 요청).
+        keep_alive / num_ctx 는 이후 요청들과 같은 값으로 보내서 재로드가 없게 한다.
+        """
+        payload = self._chat_payload("", "", stream=False, options=None)
+        payload["messages"] = []
+        return self.post_json("/api/chat", payload, deadline=deadline)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_CLIENT: Optional[OllamaClient] = None
+_CLIENT_LOCK = threading.Lock()
+
+
+def get_ollama_client() -> OllamaClient:
+    """모듈 공용 OllamaClient (처음 호출 때 생성)."""
+    global _CLIENT
+    with _CLIENT_LOCK:
+        if _CLIENT is None:
+            _CLIENT = OllamaClient()
+        return _CLIENT
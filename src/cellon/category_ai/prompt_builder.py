@@ -0,0 +1,163 @@
+# cellon/category_ai/prompt_builder.py
+"""
+LLM 후보 카테고리 프롬프트 빌더 (토큰 예산 기반).
+
+- 후보를 "- id: 전체경로" 로 한 줄씩 나열하면 공통 접두어(주방용품>취사도구>...)가
+  후보 수만큼 반복돼서 CPU Ollama 의 prefill 시간이 대부분 여기서 나간다.
+- 후보 경로들로 CategoryTrie 를 만들고, 공통 접두어는 한 번만 찍는 들여쓰기 트리로 렌더링
+  (자식이 하나뿐인 중간 노드는 'A>B>' 처럼 한 줄로 합침)
+- 그래도 토큰 예산을 넘으면 키워드 포함 점수로 후보를 정렬해서 예산 안에 들어가는
+  최대 top-K 만 남긴다 (렌더링 순서는 원래 후보 순서 유지)
+- 토큰 수는 토크나이저 없이 대략 추정: 한글/CJK 1글자 ≈ 1토큰, 그 외 3.5글자 ≈ 1토큰
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from cellon.config import LLM_PROMPT_TOKEN_BUDGET
+from cellon.core.category_trie import CategoryTrie, TrieNode
+
+
+CANDIDATE_TREE_GUIDE = (
+    "(들여쓰기는 바로 위 줄 경로의 하위라는 뜻이고, 한 줄에 '>' 로 이어진 것은 여러 단계가 합쳐진 것이다.\n"
+    " [] 안 값이 category_id 이며, category_path 는 위 줄들의 경로를 '>' 로 이어 붙인 전체 경로다.)"
+)
+
+_KEYWORD_SEP_RE = re.compile(r"\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 대략적인 토큰 수 추정 (한글/CJK 는 글자당 1, 나머지는 3.5글자당 1)."""
+    if not text:
+        return 0
+    wide = sum(1 for ch in text if ord(ch) >= 0x1100)
+    return wide + math.ceil((len(text) - wide) / 3.5)
+
+
+def _norm(text: str) -> str:
+    return _KEYWORD_SEP_RE.sub(" ", (text or "").replace(">", " ")).strip().lower()
+
+
+def lexical_scores(paths: Sequence[str], keywords: Sequence[str]) -> List[float]:
+    """
+    후보 경로별 간단 점수:
+      - 경로에 키워드가 포함될 때마다 +1
+      - leaf(마지막 단계)에 포함되면 +0.5 추가 (더 구체적인 카테고리 우선)
+    """
+    kws = [k for k in (_norm(k) for k in keywords) if k]
+    scores: List[float] = []
+    for path in paths:
+        path_norm = _norm(path)
+        leaf_norm = _norm(str(path).split(">")[-1])
+        score = 0.0
+        for kw in kws:
+            if kw in path_norm:
+                score += 1.0
+                if kw in leaf_norm:
+                    score += 0.5
+        scores.append(score)
+    return scores
+
+
+def _render_node(node: TrieNode, trie: CategoryTrie, ids: Sequence[str], indent: int, out: List[str]) -> None:
+    label = node.label
+    # 자식이 하나뿐이고 이 단계에서 끝나는 후보가 없으면 한 줄로 합침
+    while node.own_end == node.start and len(node.children) == 1:
+        node = node.children[0]
+        label = f"{label}>{node.label}"
+
+    own_ids = [ids[i] for i in sorted(trie.order[node.start:node.own_end])]
+    id_text = f" [{', '.join(own_ids)}]" if own_ids else ""
+    pad = "  " * indent
+    if node.children:
+        out.append(f"{pad}{label}>{id_text}")
+        for child in node.children:
+            _render_node(child, trie, ids, indent + 1, out)
+    else:
+        out.append(f"{pad}{label}{id_text}")
+
+
+def render_candidate_tree(candidates: Sequence[Dict[str, str]]) -> str:
+    """후보 목록 → 공통 접두어를 한 번만 찍는 들여쓰기 트리 텍스트."""
+    if not candidates:
+        return ""
+    ids = [str(c.get("category_id", "")) for c in candidates]
+    trie = CategoryTrie(str(c.get("category_path", "")) for c in candidates)
+    lines: List[str] = []
+    for child in trie.root.children:
+        _render_node(child, trie, ids, 0, lines)
+    return "\n".join(lines)
+
+
+@dataclass
+class CandidateBlock:
+    text: str                                   # 프롬프트에 넣을 후보 트리 텍스트
+    candidates: List[Dict[str, str]]            # 실제로 프롬프트에 들어간 후보 (원래 순서)
+    total: int                                  # 원래 후보 수
+    est_tokens: int                             # text 의 추정 토큰 수
+    by_id: Dict[str, str] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        if not self.by_id:
+            self.by_id = {str(c["category_id"]): str(c["category_path"]) for c in self.candidates}
+
+    @property
+    def trimmed(self) -> bool:
+        return len(self.candidates) < self.total
+
+
+def build_candidate_block(
+    candidates: Sequence[Dict[str, str]],
+    keywords: Sequence[str] = (),
+    token_budget: Optional[int] = None,
+    scores: Optional[Sequence[float]] = None,
+) -> CandidateBlock:
+    """
+    후보 목록을 토큰 예산 안의 트리 텍스트로.
+    - 전체가 예산 안이면 그대로
+    - 넘치면 lexical_scores 순(동점은 원래 순서)으로 top-K 를 이분 탐색해서 예산에 맞는 최대 K
+    - scores 를 주면 lexical_scores 대신 그 점수로 정렬 (후보와 같은 길이)
+    """
+    budget = LLM_PROMPT_TOKEN_BUDGET if token_budget is None else int(token_budget)
+    cands = [
+        {"category_id": str(c.get("category_id", "")), "category_path": str(c.get("category_path", ""))}
+        for c in candidates
+    ]
+    total = len(cands)
+
+    text = render_candidate_tree(cands)
+    est = estimate_tokens(text)
+    if est <= budget or total <= 1:
+        return CandidateBlock(text=text, candidates=cands, total=total, est_tokens=est)
+
+    if scores is None:
+        scores = lexical_scores([c["category_path"] for c in cands], keywords)
+    ranked = sorted(range(total), key=lambda i: -scores[i])
+
+    def _render_top(k: int) -> tuple[str, List[Dict[str, str]]]:
+        keep = sorted(ranked[:k])
+        kept = [cands[i] for i in keep]
+        return render_candidate_tree(kept), kept
+
+    # 예산에 들어가는 최대 k (최소 1개는 남김)
+    lo, hi = 1, total - 1
+    best_text, best_kept = _render_top(1)
+    while lo <= hi:
+        mid = (lo + hi) // 2
+        mid_text, mid_kept = _render_top(mid)
+        if estimate_tokens(mid_text) <= budget:
+            best_text, best_kept = mid_text, mid_kept
+            lo = mid + 1
+        else:
+            hi = mid - 1
+
+    return CandidateBlock(
+        text=best_text,
+        candidates=best_kept,
+        total=total,
+        est_tokens=estimate_tokens(best_text),
+    )
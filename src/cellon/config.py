@@ -20,6 +20,11 @@ CATEGORY_EXCEL_DIR = ASSETS_DIR / "category_excels"
 # 예: Cellon_Project/assets/cache/category_master.pkl
 CACHE_DIR = ASSETS_DIR / "cache"
 
+# ====== 카테고리 매칭 결과 캐시 (SQLite) ======
+# 같은 (source, 원본 카테고리 경로, 정규화 상품명, 룰 버전) 이면 매칭을 다시 돌리지 않음
+MATCH_CACHE_DB = CACHE_DIR / "match_cache.sqlite3"
+MATCH_CACHE_MAX_ENTRIES = 20000
+
 # ====== 크롤링 / 이미지 / 업로드 관련 경로 ======
 # 예: Cellon_Project/assets/temp/crawling_temp/ ...
 CRAWLING_TEMP_DIR = ASSETS_DIR / "crawling_temp"
@@ -54,6 +59,13 @@ SELLERTOOL_WORKBOOK_NAME = "sellertool_upload_work.xlsm"
 
 SELLERTOOL_SHEET_NAME = "data"
 
+# ====== 셀러툴 엑셀 배치 쓰기 (SellertoolWriterSession) ======
+# workbook 을 열어 둔 채 행을 모았다가 N건 / N초마다 저장. 저장 전 행은 저널에 남겨 크래시 후 복구
+SELLERTOOL_FLUSH_EVERY = 20            # 이 건수가 쌓이면 저장
+SELLERTOOL_FLUSH_INTERVAL_SEC = 30.0   # 마지막 저장 후 이 시간이 지나면 저장
+SELLERTOOL_JOURNAL_DIR = CACHE_DIR / "sellertool_pending"
+SELLERTOOL_WRITE_ENGINE = "openpyxl"   # "xml": openpyxl 없이 data 시트 XML 에 행만 붙여 저장 (큰 템플릿에서 빠름)
+
 # === 로컬 LLM(Ollama) 설정 ===
 LOCAL_LLM_BASE_URL = "http://localhost:11434"
 #LOCAL_LLM_MODEL = "llama3:8b"
@@ -62,6 +74,29 @@ LOCAL_LLM_BASE_URL = "http://localhost:11434"
 LOCAL_LLM_MODEL = "qwen2.5:7b"
 #LOCAL_LLM_MODEL = "qwen2.5:7b-instruct"
 
+# Ollama HTTP 클라이언트 (category_ai/ollama_client.py)
+LOCAL_LLM_CONNECT_TIMEOUT_SEC = 10.0   # 접속 자체가 안 될 때 빨리 실패
+LOCAL_LLM_DEADLINE_SEC = 180.0         # 호출 1번의 기본 데드라인 (모델이 멈춰도 크롤링이 10분씩 막히지 않게)
+LOCAL_LLM_MAX_RETRIES = 2              # 접속 실패 / 502·503·504 재시도 횟수
+LOCAL_LLM_POOL_SIZE = 4                # keep-alive 커넥션 풀 크기
+LOCAL_LLM_NUM_PARALLEL = 2             # 동시 LLM 요청 수 (Ollama 서버의 OLLAMA_NUM_PARALLEL 과 맞출 것)
+LOCAL_LLM_QUEUE_SLACK_SEC = 60.0       # 동기 호출 대기 상한 = 데드라인 + 이 값 (동시 요청 제한에 걸려 기다리는 시간)
+LOCAL_LLM_KEEP_ALIVE = "30m"           # 요청마다 보내는 keep_alive (호출 간격이 길어도 모델을 메모리에 유지)
+LOCAL_LLM_NUM_CTX = 4096               # 모든 요청에 같은 num_ctx (값이 바뀌면 Ollama 가 모델을 다시 로드함)
+LOCAL_LLM_WARMUP_DEADLINE_SEC = 300.0  # 시작 시 워밍업(모델 로드) 데드라인
+LOCAL_LLM_STREAM = True                # /api/chat 스트리밍 (category_id JSON 이 완성되면 바로 끊음)
+LOCAL_LLM_STRUCTURED_OUTPUT = True     # format=JSON schema (category_id 를 후보 id enum 으로 제한, Ollama 0.5+)
+LLM_PROMPT_TOKEN_BUDGET = 1200         # 후보 카테고리 목록에 쓰는 추정 토큰 상한 (넘으면 키워드 점수 top-K 만)
+LLM_HIERARCHICAL = False               # 후보 없이 전체 마스터로 갈 때: 대분류>중분류 → 세부 카테고리 2단계 (LLM 2회, 측정 후 켤 것)
+LLM_STAGE1_TOKEN_BUDGET = 2500         # 2단계 모드 1단계(대분류>중분류 목록) 토큰 상한
+LLM_BATCH_SIZE = 8                     # suggest_categories_batch: 요청 1번에 묶는 상품 수
+LLM_BATCH_ITEM_TOKEN_BUDGET = 500      # 배치 안 상품 1개당 후보 목록 토큰 상한
+
+# LLM 응답 캐시 (같은 모델 + 같은 프롬프트면 Ollama 재호출 안 함)
+LLM_CACHE_DB = CACHE_DIR / "llm_cache.sqlite3"
+LLM_CACHE_TTL_SEC = 30 * 24 * 3600     # 30일
+LLM_CACHE_MAX_ENTRIES = 5000
+
 
 # =========================
 # Google Sheets 설정
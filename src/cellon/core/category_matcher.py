@@ -5,20 +5,33 @@ from __future__ import annotations
 from typing import Any, Dict, Optional, Callable, Optional
 
 import pandas as pd
-import difflib
 import re
 
+import copy
+import sqlite3
+import threading
 import time
 import traceback
 
-from cellon.category_ai.category_loader import load_category_master
+from cellon.category_ai.category_loader import (
+    MASTER_ID_COLUMNS,
+    category_master_version,
+    get_category_id_index,
+    load_category_master,
+)
 from cellon.core.rules_loader import (
     load_meta_rules,
     load_coupang_rules,
     list_available_groups,
     load_all_market_groups,
+    refresh_rules_version,
 )
 
+from cellon.core.rule_index import GroupRuleIndex, MetaRuleIndex, get_group_rule_index
+from cellon.core.leaf_similarity import best_leaf_match, normalize_leaf_text
+from cellon.core.category_trie import CategoryTrie, get_category_trie
+from cellon.core.match_cache import get_match_cache
+
 from cellon.category_ai.category_llm import (
     suggest_category_with_candidates,
     _extract_keywords,
@@ -57,13 +70,17 @@ class CategoryMatcher:
         # 수동 해결기 (디버깅/테스트용)
         self._manual_resolver = manual_resolver
 
-        # 1) 쿠팡 전체 카테고리 마스터 (엑셀 → pkl)
-        self.cat_master: pd.DataFrame = load_category_master()
+        # 1) 쿠팡 전체 카테고리 마스터 (엑셀 → 컬럼형 캐시, 매처는 id/경로 컬럼만 사용)
+        self.cat_master: pd.DataFrame = load_category_master(columns=MASTER_ID_COLUMNS)
 
         # 2) meta / coupang 룰 (group 기반 자동 로딩)
         self.meta_rules: Dict[str, Any] = load_meta_rules(group)
         self.coupang_rules: Dict[str, Any] = load_coupang_rules(group)
 
+        # 2-1) 룰 컴파일 (meta path 해시맵 + meta/strong/group 키워드 공용 오토마타)
+        self.rule_index: GroupRuleIndex = get_group_rule_index(group)
+        self.meta_index: MetaRuleIndex = self.rule_index.meta
+
         # 3) rules/<market>/<group>.json 전체 (디버깅/추가 로직용)
         #    예: self.market_trees["costco"]["kitchen"]["categories"] ...
         self.market_trees: Dict[str, Dict[str, Dict[str, Any]]] = load_all_market_groups()
@@ -73,6 +90,23 @@ class CategoryMatcher:
         self._log(f"  - coupang_rules: {len(self.coupang_rules)}개")
         self._log(f"  - market_trees: {list(self.market_trees.keys())}")
 
+    def bind(
+        self,
+        *,
+        logger: Optional[Callable[[str], None]] = None,
+        manual_resolver: Optional[
+            Callable[[str, str, pd.DataFrame, pd.DataFrame], Optional[Dict[str, Any]]]
+        ] = None,
+    ) -> "CategoryMatcher":
+        """
+        룰/마스터/인덱스는 그대로 공유하고 logger / manual_resolver 만 바꾼 얕은 복사본.
+        (get_category_matcher() 풀에서 호출 단위로 나눠줄 때 사용)
+        """
+        clone = copy.copy(self)
+        clone._logger = logger
+        clone._manual_resolver = manual_resolver
+        return clone
+
     # 내부용 로그 헬퍼
     def _log(self, msg: str) -> None:
         try:
@@ -82,6 +116,11 @@ class CategoryMatcher:
             # logger 쪽 문제로 매칭이 죽지 않도록 방어
             pass
 
+    def _log_llm_progress(self, n_chars: int, text: str) -> None:
+        """LLM 스트리밍 응답 진행 상황 (ollama_client 가 0.5초 간격으로 호출)."""
+        tail = text[-40:].replace("\n", " ")
+        self._log(f"    … LLM 응답 수신 중: {n_chars}자 | {tail}")
+
     def _build_manual_candidates_df(
         self,
         *,
@@ -117,8 +156,9 @@ class CategoryMatcher:
                 if rule.get("target_category_id")
             }
             if strong_ids:
+                strong_labels = get_category_id_index(self.cat_master).labels_of(strong_ids)
                 tmp = base_df.copy()
-                tmp["__is_strong__"] = tmp["category_id"].astype(str).isin(strong_ids).astype(int)
+                tmp["__is_strong__"] = tmp.index.isin(strong_labels).astype(int)
                 tmp = tmp.sort_values(["__is_strong__"], ascending=False).drop(columns=["__is_strong__"])
                 return tmp
         except Exception:
@@ -126,6 +166,11 @@ class CategoryMatcher:
 
         return base_df
 
+    @property
+    def category_trie(self) -> CategoryTrie:
+        """cat_master 의 category_path 트라이 (마스터 버전별로 1번만 빌드)."""
+        return get_category_trie(self.cat_master)
+
     # ------------------------------------------------------------------
     # 헬퍼: 사용 가능한 group 목록 확인
     # ------------------------------------------------------------------
@@ -160,41 +205,19 @@ class CategoryMatcher:
         self._log(f"  - path='{path}'")
         self._log(f"  - name='{name}'")
 
-        # 1) path 기준으로 먼저 매칭
-        self._log("  ▶ 1단계: path 완전 일치 매칭 시도")
-
-        for meta_key, rule in self.meta_rules.items():
-            if source == "costco":
-                paths = rule.get("source_costco_paths", [])
-            elif source == "domemae":
-                paths = rule.get("source_domemae_paths", [])
-            elif source == "owner":
-                paths = rule.get("source_owner_paths", [])
-            else:
-                paths = []
-
-            if paths:
-                self._log(f"    - meta_key={meta_key} / paths={paths}")
+        # 1) path 기준으로 먼저 매칭 (source 별 path 해시맵)
+        self._log(f"  ▶ 1단계: path 완전 일치 매칭 시도 (meta 룰 {len(self.meta_index.keys)}개)")
+        meta_key = self.meta_index.match_path(source, path)
+        if meta_key is not None:
+            self._log(f"  ✅ path 매칭 성공: meta_key={meta_key} (path='{path}')")
+            return meta_key
 
-            for p in paths:
-                if path == p:
-                    self._log(f"  ✅ path 매칭 성공: meta_key={meta_key} (path='{p}')")
-                    return meta_key
-
-        # 2) 키워드 기준 보조 매칭
+        # 2) 키워드 기준 보조 매칭 (공용 오토마타 1회 스캔 결과 사용)
         self._log("  ▶ 2단계: keywords_include / exclude 매칭 시도")
-        for meta_key, rule in self.meta_rules.items():
-            inc = rule.get("keywords_include", []) or []
-            exc = rule.get("keywords_exclude", []) or []
-
-            if not inc:
-                continue
-
-            self._log(f"    - meta_key={meta_key} / include={inc} / exclude={exc}")
-
-            if any(k in name_lower for k in inc) and not any(k in name_lower for k in exc):
-                self._log(f"  ✅ 키워드 매칭 성공: meta_key={meta_key}")
-                return meta_key
+        meta_key = self.rule_index.match_meta_keywords(self.rule_index.scan(name_lower))
+        if meta_key is not None:
+            self._log(f"  ✅ 키워드 매칭 성공: meta_key={meta_key}")
+            return meta_key
 
         self._log("  ❌ meta_key 추론 실패 (path/키워드 모두 불일치)")
         return None
@@ -217,15 +240,13 @@ class CategoryMatcher:
                 label = ""
 
             if label:
-                col = df["category_path"].astype(str)
-                subset = df[col.str.startswith(label)]
+                subset = df.iloc[self.category_trie.prefix_positions(label)]
                 if not subset.empty:
                     return subset
 
         # 2) group에 따라 대분류로 한 번 더 줄이기 (예: kitchen → '주방용품>')
         if self.group == "kitchen":
-            col = df["category_path"].astype(str)
-            subset = df[col.str.startswith("주방용품>")]
+            subset = df.iloc[self.category_trie.prefix_positions("주방용품>")]
             if not subset.empty:
                 return subset
 
@@ -283,9 +304,7 @@ class CategoryMatcher:
                 if rule.get("target_category_id")
             }
 
-            strong_candidates_df = self.cat_master[
-                self.cat_master["category_id"].astype(str).isin(strong_ids)
-            ]
+            strong_candidates_df = get_category_id_index(self.cat_master).take(strong_ids)
             self._log(f"  ▶ strong_name_rules 기반 후보 수: {len(strong_candidates_df)}")
 
             # 0-1) strong_name_rules 매칭 시도
@@ -414,6 +433,7 @@ class CategoryMatcher:
                 brand=brand,
                 extra_text=extra_text,
                 candidates_df=None,
+                progress_cb=self._log_llm_progress,
             )
             llm_result.setdefault("used_llm", True)
             llm_result.setdefault("meta_key", None)
@@ -467,15 +487,10 @@ class CategoryMatcher:
                 candidates_df = self.cat_master
 
                 if label:
-                    # 공백 제거 후 부분 포함으로 필터링
+                    # 공백 제거 후 부분 포함으로 필터링 (트라이에서 서브트리 구간으로 조회)
                     label_norm = label.replace(" ", "")
-                    cat_paths = (
-                        self.cat_master["category_path"]
-                        .astype(str)
-                        .str.replace(" ", "", regex=False)
-                    )
-                    candidates_df = self.cat_master[
-                        cat_paths.str.contains(label_norm)
+                    candidates_df = self.cat_master.iloc[
+                        self.category_trie.contains_positions(label_norm)
                     ]
 
                 # label 기반 필터 결과가 없으면, group 기반 fallback 사용
@@ -540,6 +555,7 @@ class CategoryMatcher:
                 brand=brand,
                 extra_text=extra_text,
                 candidates_df=None,
+                progress_cb=self._log_llm_progress,
             )
             llm_result.setdefault("used_llm", True)
             llm_result.setdefault("meta_key", meta_key)
@@ -550,9 +566,7 @@ class CategoryMatcher:
         # ---------------- candidate_ids 있는 경우 ----------------
 
         # 쿠팡 카테고리 마스터에서 후보 필터링
-        candidates_df = self.cat_master[
-            self.cat_master["category_id"].astype(str).isin([str(cid) for cid in candidate_ids])
-        ]
+        candidates_df = get_category_id_index(self.cat_master).take(candidate_ids)
         self._log(f"  ▶ 후보 cat_master 필터링 완료: {len(candidates_df)}개 행")
 
         # ✅ 0단계: strong_name_rules 먼저 시도
@@ -649,6 +663,7 @@ class CategoryMatcher:
             brand=brand,
             extra_text=source_category_path,
             candidates_df=candidates_df,
+            progress_cb=self._log_llm_progress,
         )
         llm_raw.update(
             {
@@ -668,20 +683,7 @@ class CategoryMatcher:
         - 공백/기호 제거
         - 한글/영문/숫자만 남기기
         """
-        text = text or ""
-        text = re.sub(r"[^0-9a-zA-Z가-힣]", "", text)
-        return text.lower()
-
-    @staticmethod
-    def _char_similarity(a: str, b: str) -> float:
-        """
-        문자 단위 유사도 (0.0 ~ 1.0)
-        - 1.0: 완전 동일
-        - 0.8 이상: 상당히 비슷
-        """
-        if not a or not b:
-            return 0.0
-        return difflib.SequenceMatcher(None, a, b).ratio()
+        return normalize_leaf_text(text)
 
     def _pick_by_leaf_keyword(
         self,
@@ -726,38 +728,20 @@ class CategoryMatcher:
             return None
 
         # 3) 각 후보 leaf와의 문자 유사도 계산
-        best = None
-        best_score = 0.0
-        second_best = 0.0
-
-        for _, row in candidates_df.iterrows():
-            cat_id = str(row["category_id"])
-            cat_path = str(row["category_path"])
+        #    (master 버전별로 정규화해 둔 leaf 인덱스에서 배열 상한으로 가지치기 후,
+        #     1·2등을 바꿀 수 있는 leaf 만 difflib 로 정확히 계산)
+        match = best_leaf_match(self.cat_master, candidates_df, all_tokens)
+        if match is None:
+            return None
 
-            # 마지막 뎁스 추출 (예: '주방용품>취사도구>냄비>편수냄비' → '편수냄비')
-            leaf = cat_path.split(">")[-1].strip()
-            leaf_norm = self._normalize_leaf_text(leaf)
-
-            if not leaf_norm:
-                continue
-
-            # 이 leaf에 대해 가장 잘 맞는 토큰의 유사도
-            leaf_best = 0.0
-            for token in all_tokens:
-                score = self._char_similarity(leaf_norm, token)
-                if score > leaf_best:
-                    leaf_best = score
-
-            if leaf_best > best_score:
-                second_best = best_score
-                best_score = leaf_best
-                best = {
-                    "category_id": cat_id,
-                    "category_path": cat_path,
-                    "leaf": leaf,
-                }
-            elif leaf_best > second_best:
-                second_best = leaf_best
+        row = candidates_df.iloc[match.offset]
+        best = {
+            "category_id": str(row["category_id"]),
+            "category_path": str(row["category_path"]),
+            "leaf": match.leaf,
+        }
+        best_score = match.score
+        second_best = match.second
 
         # 4) 최종 결정 조건
         # - threshold 이상: 꽤 확신 있는 경우만
@@ -810,41 +794,26 @@ class CategoryMatcher:
         if candidates_df is None or candidates_df.empty:
             return None
 
-        rules = self.coupang_rules.get("__strong_name_rules__", []) or []
-        if not rules:
+        if not self.rule_index.strong_rules:
             return None
 
         name_lower = (product_name or "").lower()
-        # 후보 ID 셋 (문자열 기준)
-        candidate_ids = set(candidates_df["category_id"].astype(str).tolist())
+        id_index = get_category_id_index(self.cat_master)
 
+        # 상품명 1회 스캔으로 키워드가 걸린 strong 룰만 추린 뒤, 현재 후보에 있는 것만 남김
+        # (후보 포함 여부는 id 인덱스로 후보 DF 안의 행 순번을 바로 찾음)
         matches: list[Dict[str, Any]] = []
-
-        for rule in rules:
-            keywords = rule.get("keywords") or []
-            target_id = str(rule.get("target_category_id") or "").strip()
-            if not target_id:
-                continue
-
-            # 현재 후보들 안에 target_id가 없으면 스킵
-            if target_id not in candidate_ids:
-                continue
-
-            # 키워드 중 하나라도 상품명에 포함되면 매칭
-            if any(kw.lower() in name_lower for kw in keywords):
-                matches.append(
-                    {
-                        "target_id": target_id,
-                        "rule": rule,
-                    }
-                )
+        for target_id, rule in self.rule_index.match_strong(self.rule_index.scan(name_lower)):
+            offset = id_index.locate(candidates_df, target_id)
+            if offset is not None:
+                matches.append({"target_id": target_id, "rule": rule, "offset": offset})
 
         if len(matches) == 1:
             m = matches[0]
             target_id = m["target_id"]
             rule = m["rule"]
 
-            row = candidates_df[candidates_df["category_id"].astype(str) == target_id].iloc[0]
+            row = candidates_df.iloc[m["offset"]]
             cat_path = str(row["category_path"])
 
             self._log(
@@ -883,7 +852,6 @@ class CategoryMatcher:
 # =============================================================================
 
 from dataclasses import dataclass
-from functools import lru_cache
 
 @dataclass
 class _GroupScore:
@@ -926,10 +894,47 @@ def _tokenize_hint(source_category_path: str, product_name: str) -> list[str]:
     return out
 
 
-@lru_cache(maxsize=128)
-def _cached_meta_rules(group: str) -> Dict[str, Any]:
-    # group별 meta 룰은 자주 재사용되므로 캐싱
-    return load_meta_rules(group)
+# =============================================================================
+# CategoryMatcher 풀
+# - 생성 비용(마스터/룰 로드, 로그)이 크므로 group 별로 한 번만 만들어 재사용합니다.
+# - 룰 파일(rules_version)이 바뀌거나 카테고리 마스터가 재생성되면 그 group만 다시 만듭니다.
+# =============================================================================
+
+# key: group -> (rules_version, matcher)
+_MATCHER_POOL: Dict[str, tuple[tuple, CategoryMatcher]] = {}
+_MATCHER_POOL_LOCK = threading.Lock()
+
+
+def get_category_matcher(
+    group: str,
+    *,
+    logger: Optional[Callable[[str], None]] = None,
+    manual_resolver: Optional[Callable] = None,
+) -> CategoryMatcher:
+    """
+    미리 만들어 둔 group 매처를 logger / manual_resolver 만 바꿔서 반환.
+    - 스레드 안전 (생성/교체는 lock 안에서만)
+    - 반환값은 호출마다 새 얕은 복사본이라 호출자끼리 콜백이 섞이지 않음
+    """
+    with _MATCHER_POOL_LOCK:
+        # 룰 JSON 이 디스크에서 바뀌었으면 여기서 rules_loader 캐시도 같이 비워짐
+        version = refresh_rules_version(group)
+        cached = _MATCHER_POOL.get(group)
+        stale = cached is None or cached[0] != (version, category_master_version())
+        if stale:
+            base = CategoryMatcher(group=group, logger=logger)
+            # 매처 생성 중 마스터가 처음 로드되면 버전이 바뀌므로 생성 후 버전으로 기록
+            _MATCHER_POOL[group] = ((version, category_master_version()), base)
+        else:
+            base = cached[1]
+
+    return base.bind(logger=logger, manual_resolver=manual_resolver)
+
+
+def clear_matcher_pool() -> None:
+    """풀을 비운다. (다음 get_category_matcher() 호출 때 다시 생성)"""
+    with _MATCHER_POOL_LOCK:
+        _MATCHER_POOL.clear()
 
 
 def _score_group(
@@ -939,46 +944,25 @@ def _score_group(
     source_category_path: str,
     product_name: str,
 ) -> _GroupScore:
-    meta_rules = _cached_meta_rules(group) or {}
+    index = get_group_rule_index(group)
     src = (source or "").lower()
     path = (source_category_path or "").strip()
     name_l = (product_name or "").lower()
 
     score = 0.0
 
-    # A) path 완전 일치면 큰 가산점
-    for _, rule in meta_rules.items():
-        try:
-            if src == "costco":
-                paths = rule.get("source_costco_paths", []) or []
-            elif src == "domemae":
-                paths = rule.get("source_domemae_paths", []) or []
-            elif src == "owner":
-                paths = rule.get("source_owner_paths", []) or []
-            else:
-                paths = []
-            if path and path in paths:
-                score += 100.0
-        except Exception:
-            continue
+    # A) path 완전 일치면 큰 가산점 (일치하는 룰 수만큼)
+    score += index.path_score_count(src, path) * 100.0
 
     # B) keywords_include / exclude 히트 수로 점수화
-    for _, rule in meta_rules.items():
-        inc = (rule.get("keywords_include") or [])
-        exc = (rule.get("keywords_exclude") or [])
-        try:
-            inc = [str(x).lower() for x in inc]
-            exc = [str(x).lower() for x in exc]
-        except Exception:
-            continue
-
-        hit_inc = sum(1 for k in inc if k and (k in name_l))
-        hit_path = sum(1 for k in inc if k and (k in path.lower()))
-        hit_exc = sum(1 for k in exc if k and (k in name_l))
-
-        score += hit_inc * 6.0
-        score += hit_path * 4.0
-        score -= hit_exc * 15.0
+    #    (상품명 스캔 결과는 이후 matcher 의 meta/strong 단계에서도 재사용됨)
+    hit_inc, hit_path, hit_exc = index.keyword_hit_counts(
+        index.scan(name_l),
+        index.scan_path(path.lower()),
+    )
+    score += hit_inc * 6.0
+    score += hit_path * 4.0
+    score -= hit_exc * 15.0
 
     return _GroupScore(group=group, score=score)
 
@@ -1094,13 +1078,67 @@ def match_category_auto(
     extra_text: Optional[str] = None,
     max_group_trials: int = 3,
     manual_cap: int = 800,
+    use_cache: bool = True,
 ) -> Dict[str, Any]:
     """CategoryMatcher.match_category() 호출 전에 group을 자동 선택하는 래퍼.
 
     - group 후보는 meta_rules 기반으로 점수화해 상위 N개만 시도합니다.
     - 수동 팝업은 manual_cap 만큼만 보여줍니다(성능/UX).
     - 각 group 시도 중 내부에서 LLM 전체 검색으로 들어가는 로직은 그대로 유지됩니다.
+    - use_cache=True 면 (source, 원본 경로, 정규화 상품명, 룰 버전) 이 같은 이전 결과를
+      디스크 캐시에서 바로 돌려줍니다 (결과에 cache_hit=True).
     """
+    cache = get_match_cache() if use_cache else None
+    if cache is not None:
+        try:
+            cached = cache.get(source, source_category_path, product_name)
+        except sqlite3.Error as e:
+            cached = None
+            if logger:
+                logger(f"⚠️ [match_category_auto] 매칭 캐시 조회 실패 (무시): {e}")
+        if cached is not None:
+            cached["cache_hit"] = True
+            if logger:
+                try:
+                    logger(f"♻️ [match_category_auto] 매칭 캐시 사용: {cached}")
+                except Exception:
+                    pass
+            return cached
+
+    result = _match_category_auto_uncached(
+        source=source,
+        source_category_path=source_category_path,
+        product_name=product_name,
+        logger=logger,
+        manual_resolver=manual_resolver,
+        brand=brand,
+        extra_text=extra_text,
+        max_group_trials=max_group_trials,
+        manual_cap=manual_cap,
+    )
+
+    if cache is not None:
+        try:
+            cache.put(source, source_category_path, product_name, result)
+        except sqlite3.Error as e:
+            if logger:
+                logger(f"⚠️ [match_category_auto] 매칭 캐시 저장 실패 (무시): {e}")
+    return result
+
+
+def _match_category_auto_uncached(
+    *,
+    source: str,
+    source_category_path: str,
+    product_name: str,
+    logger: Optional[Callable[[str], None]],
+    manual_resolver: Optional[Callable],
+    brand: Optional[str],
+    extra_text: Optional[str],
+    max_group_trials: int,
+    manual_cap: int,
+) -> Dict[str, Any]:
+    """match_category_auto 의 실제 group 순회 로직 (캐시 없이)."""
     groups = _rank_groups(
         source=source,
         source_category_path=source_category_path,
@@ -1124,7 +1162,7 @@ def match_category_auto(
             manual_cap=manual_cap,
             logger=logger,
         )
-        matcher = CategoryMatcher(group=g, logger=logger, manual_resolver=wrapped_manual)
+        matcher = get_category_matcher(g, logger=logger, manual_resolver=wrapped_manual)
 
         result = matcher.match_category(
             source=source,
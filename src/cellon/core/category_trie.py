@@ -0,0 +1,201 @@
+# cellon/core/category_trie.py
+"""
+카테고리 경로 트라이 (level1 > level2 > ... 세그먼트 단위).
+
+- 행들을 세그먼트 튜플 순서로 정렬해 두고(order), 각 노드는 그 정렬 순서에서의
+  서브트리 구간 [start, end) 만 들고 있다 → "주방용품>냄비/솥 아래 전부" 가 배열 슬라이스 하나.
+- prefix_positions(label)   : category_path.str.startswith(label) 와 같은 행
+- contains_positions(text)  : category_path 에서 공백을 뺀 문자열에 text 가 포함된 행
+                              (라벨별 결과는 트라이 안에 캐시)
+- 반환되는 위치 배열은 원래 DF 의 행 순서(오름차순)라 df.iloc[...] 결과가 불리언 필터와 같다.
+- 수동 선택 다이얼로그의 트리 탐색도 같은 노드 구조를 그대로 쓴다.
+"""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(eq=False)
+class TrieNode:
+    name: str                 # 원본 세그먼트 ('>' 로 다시 이으면 원래 경로 접두어)
+    depth: int
+    path: str                 # 루트부터 이 노드까지의 원본 경로 ('A>B')
+    start: int = 0            # 서브트리 구간 [start, end) (CategoryTrie.order 기준)
+    own_end: int = 0          # [start, own_end) : 경로가 정확히 이 노드에서 끝나는 행
+    end: int = 0
+    children: List["TrieNode"] = field(default_factory=list)   # name 정렬 순
+    _child_by_name: Dict[str, "TrieNode"] = field(default_factory=dict, repr=False)
+    _child_names: List[str] = field(default_factory=list, repr=False)
+
+    @property
+    def label(self) -> str:
+        """화면 표시용 이름 (앞뒤 공백 제거)."""
+        return self.name.strip()
+
+    @property
+    def size(self) -> int:
+        return self.end - self.start
+
+    def child(self, name: str) -> Optional["TrieNode"]:
+        return self._child_by_name.get(name)
+
+
+class CategoryTrie:
+    """category_path 목록(원래 DF 행 순서)으로 만든 세그먼트 트라이."""
+
+    CONTAINS_CACHE_SIZE = 256
+
+    def __init__(self, paths: Iterable[Any]) -> None:
+        segs: List[Tuple[str, ...]] = [tuple(str(p).split(">")) for p in paths]
+        self.order: np.ndarray = np.asarray(
+            sorted(range(len(segs)), key=segs.__getitem__), dtype=np.int64
+        )
+        self.order.setflags(write=False)
+        # rank_of[pos] = 그 행의 정렬 순위 (order 의 역순열, TrieNode.start/end 와 같은 좌표계)
+        self.rank_of: np.ndarray = np.empty_like(self.order)
+        self.rank_of[self.order] = np.arange(len(self.order), dtype=np.int64)
+        self.rank_of.setflags(write=False)
+        self.root = TrieNode(name="", depth=0, path="")
+        self._build(self.root, segs, 0, len(segs))
+
+        self._contains_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    # ---------- 빌드 ----------
+    def _build(self, node: TrieNode, segs: List[Tuple[str, ...]], lo: int, hi: int) -> None:
+        """order[lo:hi] 의 행들은 앞 node.depth 개 세그먼트가 모두 같다."""
+        order = self.order
+        depth = node.depth
+        node.start, node.end = lo, hi
+
+        i = lo
+        while i < hi and len(segs[order[i]]) == depth:
+            i += 1
+        node.own_end = i
+
+        while i < hi:
+            name = segs[order[i]][depth]
+            j = i + 1
+            while j < hi and segs[order[j]][depth] == name:
+                j += 1
+            child = TrieNode(
+                name=name,
+                depth=depth + 1,
+                path=name if depth == 0 else f"{node.path}>{name}",
+            )
+            node.children.append(child)
+            node._child_by_name[name] = child
+            node._child_names.append(name)
+            self._build(child, segs, i, j)
+            i = j
+
+    # ---------- 조회 ----------
+    def find(self, segments: Sequence[str]) -> Optional[TrieNode]:
+        """원본 세그먼트 목록으로 노드 찾기. 없으면 None."""
+        node = self.root
+        for name in segments:
+            node = node.child(name)
+            if node is None:
+                return None
+        return node
+
+    def iter_nodes(self, node: Optional[TrieNode] = None) -> Iterator[TrieNode]:
+        """node(기본: 루트) 아래 노드들을 전위 순회."""
+        stack = [node or self.root]
+        while stack:
+            cur = stack.pop()
+            yield cur
+            stack.extend(reversed(cur.children))
+
+    def subtree_positions(self, node: TrieNode, include_self: bool = True) -> np.ndarray:
+        """node 서브트리에 속한 행 위치 (원래 행 순서)."""
+        start = node.start if include_self else node.own_end
+        return np.sort(self.order[start:node.end])
+
+    def prefix_positions(self, prefix: str) -> np.ndarray:
+        """category_path.startswith(prefix) 인 행 위치 (원래 행 순서)."""
+        *full, last = str(prefix).split(">")
+        node = self.find(full)
+        if node is None:
+            return np.empty(0, dtype=np.int64)
+        if last == "":
+            # 'A>B>' : B 자신은 빼고 하위 전부 (빈 접두어면 전체)
+            return self.subtree_positions(node, include_self=(not full))
+
+        # 마지막 세그먼트는 부분 접두어 → 이름 정렬된 자식 중 연속 구간
+        names = node._child_names
+        lo = bisect_left(names, last)
+        hi = lo
+        while hi < len(names) and names[hi].startswith(last):
+            hi += 1
+        if lo == hi:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(self.order[node.children[lo].start:node.children[hi - 1].end])
+
+    def contains_positions(self, text: str) -> np.ndarray:
+        """
+        category_path 에서 공백을 뺀 문자열에 text(공백 제거된 라벨)가 포함된 행 위치.
+        어떤 노드 경로가 text 를 포함하면 그 서브트리 전체가 해당되므로 거기서 더 내려가지 않는다.
+        """
+        with self._lock:
+            cached = self._contains_cache.get(text)
+            if cached is not None:
+                self._contains_cache.move_to_end(text)
+                return cached
+
+        by_segment = ">" not in text
+        spans: List[Tuple[int, int]] = []
+        stack: List[Tuple[TrieNode, str]] = [(self.root, "")]
+        while stack:
+            node, path_ns = stack.pop()
+            haystack = node.name.replace(" ", "") if by_segment else path_ns
+            if text in haystack:
+                spans.append((node.start, node.end))
+                continue
+            for child in node.children:
+                child_ns = child.name.replace(" ", "")
+                stack.append((child, child_ns if node is self.root else f"{path_ns}>{child_ns}"))
+
+        if spans:
+            result = np.sort(np.concatenate([self.order[a:b] for a, b in spans]))
+        else:
+            result = np.empty(0, dtype=np.int64)
+        result.setflags(write=False)
+
+        with self._lock:
+            self._contains_cache[text] = result
+            while len(self._contains_cache) > self.CONTAINS_CACHE_SIZE:
+                self._contains_cache.popitem(last=False)
+        return result
+
+
+# =========================
+# cat_master 버전별 캐시
+# =========================
+
+_TRIE_CACHE: Optional[Tuple["weakref.ref[pd.DataFrame]", CategoryTrie]] = None
+_TRIE_LOCK = threading.Lock()
+
+
+def get_category_trie(master: pd.DataFrame) -> CategoryTrie:
+    """cat_master 객체가 바뀌지 않았으면 같은 CategoryTrie 를 재사용."""
+    global _TRIE_CACHE
+    with _TRIE_LOCK:
+        cached = _TRIE_CACHE
+        if cached is not None and cached[0]() is master:
+            return cached[1]
+        trie = CategoryTrie(master["category_path"].tolist())
+        _TRIE_CACHE = (weakref.ref(master), trie)
+        return trie
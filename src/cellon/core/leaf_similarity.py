@@ -0,0 +1,246 @@
+# cellon/core/leaf_similarity.py
+"""
+카테고리 leaf(마지막 뎁스) ↔ 상품명 토큰 문자 유사도 계산기.
+
+- 기존 _pick_by_leaf_keyword 는 후보 행마다 정규식 정규화 + 모든 (leaf, 토큰) 쌍에
+  difflib.SequenceMatcher 를 돌려서, 후보가 넓으면(전체 마스터 / '주방용품>' 폴백) 수 초씩 걸렸다.
+- 여기서는 cat_master 버전마다 정규화된 leaf 를 한 번만 만들어 두고(LeafSimilarityIndex),
+  토큰 × leaf 의 문자 겹침 수를 배열 연산으로 한꺼번에 구해
+  SequenceMatcher.quick_ratio() 와 같은 상한(2*겹침/(len(a)+len(b)))으로 가지치기한다.
+- 1·2등 결과를 바꿀 수 있는 leaf 에 대해서만 실제 difflib ratio 를 계산하므로
+  best / second-best / threshold 판정은 기존 루프와 같다.
+"""
+
+from __future__ import annotations
+
+import difflib
+import re
+import threading
+import weakref
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+_LEAF_NORM_RE = re.compile(r"[^0-9a-zA-Z가-힣]")
+
+
+def normalize_leaf_text(text: Optional[str]) -> str:
+    """공백/기호 제거 후 한글/영문/숫자만 남기고 소문자로."""
+    text = text or ""
+    return _LEAF_NORM_RE.sub("", text).lower()
+
+
+def leaf_of_path(path: Any) -> str:
+    """'주방용품>취사도구>냄비>편수냄비' → '편수냄비'"""
+    return str(path).split(">")[-1].strip()
+
+
+@dataclass(frozen=True)
+class LeafMatch:
+    offset: int      # 후보 목록(positions) 안에서의 순번 → candidates_df.iloc[offset]
+    leaf: str        # 정규화 전 leaf 이름
+    score: float     # 1등 유사도
+    second: float    # 2등 유사도 (같은 점수의 다른 행이 있으면 score 와 같음)
+
+
+class LeafSimilarityIndex:
+    """
+    category_path 목록으로부터 만든 leaf 유사도 인덱스.
+    - row_uid[i] : i 번째 행의 정규화 leaf id (정규화 결과가 빈 문자열이면 -1)
+    - norms      : 중복 제거된 정규화 leaf 목록
+    - _postings  : 문자 → (그 문자를 가진 leaf id 배열, 등장 횟수 배열)
+    """
+
+    def __init__(self, paths: Iterable[Any]) -> None:
+        self.leaves: List[str] = []
+        self.norms: List[str] = []
+        uid_of: Dict[str, int] = {}
+        row_uid: List[int] = []
+
+        for path in paths:
+            leaf = leaf_of_path(path)
+            norm = normalize_leaf_text(leaf)
+            self.leaves.append(leaf)
+            if not norm:
+                row_uid.append(-1)
+                continue
+            uid = uid_of.get(norm)
+            if uid is None:
+                uid = len(self.norms)
+                uid_of[norm] = uid
+                self.norms.append(norm)
+            row_uid.append(uid)
+
+        self.row_uid = np.asarray(row_uid, dtype=np.int64)
+        self._lens = np.asarray([len(n) for n in self.norms], dtype=np.float64)
+
+        postings: Dict[str, Tuple[List[int], List[int]]] = {}
+        for uid, norm in enumerate(self.norms):
+            for ch, cnt in Counter(norm).items():
+                ids, cnts = postings.setdefault(ch, ([], []))
+                ids.append(uid)
+                cnts.append(cnt)
+        self._postings: Dict[str, Tuple[np.ndarray, np.ndarray]] = {
+            ch: (np.asarray(ids, dtype=np.int64), np.asarray(cnts, dtype=np.float64))
+            for ch, (ids, cnts) in postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.row_uid)
+
+    def upper_bounds(self, uids: np.ndarray, tokens: Sequence[str]) -> np.ndarray:
+        """
+        (len(uids), len(tokens)) 배열. 각 칸은 SequenceMatcher(None, leaf, token).ratio() 의 상한.
+        """
+        out = np.zeros((len(uids), len(tokens)), dtype=np.float64)
+        if not len(uids):
+            return out
+
+        lens = self._lens[uids]
+        overlap = np.zeros(len(self.norms), dtype=np.float64)
+        for j, token in enumerate(tokens):
+            overlap.fill(0.0)
+            for ch, tc in Counter(token).items():
+                posting = self._postings.get(ch)
+                if posting is None:
+                    continue
+                ids, cnts = posting
+                # 한 posting 안의 id 는 중복이 없으므로 fancy-index 누적으로 충분
+                overlap[ids] += np.minimum(cnts, tc)
+            out[:, j] = 2.0 * overlap[uids] / (lens + len(token))
+        return out
+
+    def best_match(self, positions: np.ndarray, tokens: Sequence[str]) -> Optional[LeafMatch]:
+        """
+        positions(이 인덱스의 행 번호들, 후보 순서대로) 중 토큰과 가장 비슷한 leaf 를 찾는다.
+
+        기존 iterrows 루프와 같은 규칙:
+        - 행별 점수 = max(token) ratio(leaf_norm, token)
+        - 1등은 최고 점수를 처음 달성한 행, 2등은 행 점수들 중 두 번째로 큰 값
+        - 점수가 0 인 행만 있으면 None
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        tokens = list(dict.fromkeys(t for t in tokens if t))
+        if not len(positions) or not tokens:
+            return None
+
+        row_uids = self.row_uid[positions]
+        valid = np.flatnonzero(row_uids >= 0)
+        if not len(valid):
+            return None
+
+        uids, first, counts = np.unique(row_uids[valid], return_index=True, return_counts=True)
+        first = valid[first]
+
+        ub = self.upper_bounds(uids, tokens)
+        leaf_ub = ub.max(axis=1)
+        order = np.lexsort((first, -leaf_ub))
+
+        best_score = 0.0
+        second = 0.0
+        best_k = -1
+
+        for k in order:
+            bound = float(leaf_ub[k])
+            # 이 상한으로는 1등/2등을 바꿀 수 없으면 이후 leaf 도 마찬가지
+            if bound <= 0.0 or bound < second or (bound == second and second < best_score):
+                break
+
+            norm = self.norms[uids[k]]
+            row_ub = ub[k]
+            score = 0.0
+            for j in np.argsort(-row_ub, kind="stable"):
+                if row_ub[j] <= score:
+                    break
+                s = difflib.SequenceMatcher(None, norm, tokens[j]).ratio()
+                if s > score:
+                    score = s
+
+            if score <= 0.0:
+                continue
+            if score > best_score:
+                second = score if counts[k] > 1 else best_score
+                best_score = score
+                best_k = k
+            elif score == best_score:
+                second = score
+                if first[k] < first[best_k]:
+                    best_k = k
+            elif score > second:
+                second = score
+
+        if best_k < 0:
+            return None
+
+        offset = int(first[best_k])
+        return LeafMatch(
+            offset=offset,
+            leaf=self.leaves[int(positions[offset])],
+            score=best_score,
+            second=second,
+        )
+
+
+# =========================
+# cat_master 버전별 캐시
+# =========================
+
+_LEAF_INDEX_CACHE: Optional[Tuple["weakref.ref[pd.DataFrame]", LeafSimilarityIndex]] = None
+_LEAF_INDEX_LOCK = threading.Lock()
+
+
+def get_leaf_index(master: pd.DataFrame) -> LeafSimilarityIndex:
+    """cat_master 객체가 바뀌지 않았으면 같은 LeafSimilarityIndex 를 재사용."""
+    global _LEAF_INDEX_CACHE
+    with _LEAF_INDEX_LOCK:
+        cached = _LEAF_INDEX_CACHE
+        if cached is not None and cached[0]() is master:
+            return cached[1]
+        index = LeafSimilarityIndex(master["category_path"].tolist())
+        _LEAF_INDEX_CACHE = (weakref.ref(master), index)
+        return index
+
+
+def _master_positions(master: pd.DataFrame, candidates_df: pd.DataFrame) -> Optional[np.ndarray]:
+    """
+    candidates_df 가 master 의 행 슬라이스면 master 기준 행 번호 배열, 아니면 None.
+    (index 가 같아도 내용이 다르면 안 되므로 category_path 까지 확인)
+    """
+    if not master.index.is_unique:
+        return None
+    positions = master.index.get_indexer(candidates_df.index)
+    if len(positions) and positions.min() < 0:
+        return None
+    master_paths = master["category_path"].to_numpy()[positions]
+    if not np.array_equal(master_paths, candidates_df["category_path"].to_numpy()):
+        return None
+    return positions
+
+
+def best_leaf_match(
+    master: Optional[pd.DataFrame],
+    candidates_df: pd.DataFrame,
+    tokens: Sequence[str],
+) -> Optional[LeafMatch]:
+    """
+    candidates_df 의 leaf 중 tokens 와 가장 비슷한 것을 찾는다.
+    master 슬라이스면 미리 만든 인덱스를 쓰고, 아니면 후보만으로 임시 인덱스를 만든다.
+    """
+    if candidates_df is None or candidates_df.empty:
+        return None
+
+    positions = None
+    if master is not None and not master.empty:
+        positions = _master_positions(master, candidates_df)
+
+    if positions is not None:
+        index = get_leaf_index(master)
+    else:
+        index = LeafSimilarityIndex(candidates_df["category_path"].tolist())
+        positions = np.arange(len(candidates_df), dtype=np.int64)
+
+    return index.best_match(positions, tokens)
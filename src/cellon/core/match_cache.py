@@ -0,0 +1,182 @@
+# cellon/core/match_cache.py
+"""
+match_category_auto 결과 디스크 캐시 (SQLite).
+
+- 키: (source, source_category_path, 정규화 상품명, 룰/마스터 버전)
+  · 룰 버전 = rules 폴더 전체 JSON 의 (경로, 크기, mtime) 해시
+    → upsert_strong_name_rule / 룰 빌더가 파일을 바꾸면 이전 항목은 자동으로 안 맞게 됨
+  · 카테고리 마스터 스냅샷이 바뀌어도 마찬가지
+- category_id 가 확정된 결과만 저장 (스킵/실패 결과는 저장하지 않음)
+- 최대 개수를 넘으면 마지막 사용 시각이 오래된 것부터 삭제 (LRU),
+  버전이 바뀐 항목은 버전 변경을 처음 본 시점에 한 번에 정리
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from cellon.config import MATCH_CACHE_DB, MATCH_CACHE_MAX_ENTRIES
+from cellon.category_ai.category_loader import category_master_token
+from cellon.core.rules_loader import all_rules_version
+
+
+_NAME_SEP_RE = re.compile(r"[^0-9a-z가-힣]+")
+
+
+def normalize_product_name(name: Optional[str]) -> str:
+    """
+    상품명 정규화: 전각/반각 통일(NFKC) + 소문자 + 기호/공백 연속을 공백 하나로.
+    (재크롤링 / 띄어쓰기·기호만 다른 옵션 상품명이 같은 키가 되도록)
+    """
+    text = unicodedata.normalize("NFKC", name or "").lower()
+    return _NAME_SEP_RE.sub(" ", text).strip()
+
+
+def current_match_version() -> str:
+    """룰 파일 스냅샷 + 카테고리 마스터 스냅샷을 합친 버전 문자열."""
+    h = hashlib.sha1(repr(all_rules_version()).encode("utf-8")).hexdigest()[:16]
+    return f"{h}:{category_master_token()}"
+
+
+class MatchResultCache:
+    """
+    (source, path, name, version) → 매칭 결과 dict.
+    스레드 안전 (연결 1개 + lock).
+    """
+
+    def __init__(self, db_path: Path, max_entries: int = 20000) -> None:
+        self.db_path = Path(db_path)
+        self.max_entries = max(1, int(max_entries))
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pruned_version: Optional[str] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS match_cache (
+                    key         TEXT PRIMARY KEY,
+                    source      TEXT NOT NULL,
+                    source_path TEXT NOT NULL,
+                    name_norm   TEXT NOT NULL,
+                    version     TEXT NOT NULL,
+                    result      TEXT NOT NULL,
+                    created_at  REAL NOT NULL,
+                    last_used   REAL NOT NULL,
+                    hits        INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_match_cache_last_used ON match_cache(last_used)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def make_key(source: str, source_category_path: str, name_norm: str, version: str) -> str:
+        raw = "\x1f".join([source or "", (source_category_path or "").strip(), name_norm, version])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _prune_old_versions(self, conn: sqlite3.Connection, version: str) -> None:
+        if self._pruned_version == version:
+            return
+        conn.execute("DELETE FROM match_cache WHERE version != ?", (version,))
+        conn.commit()
+        self._pruned_version = version
+
+    def get(self, source: str, source_category_path: str, product_name: str) -> Optional[Dict[str, Any]]:
+        version = current_match_version()
+        name_norm = normalize_product_name(product_name)
+        key = self.make_key(source, source_category_path, name_norm, version)
+        with self._lock:
+            conn = self._connect()
+            self._prune_old_versions(conn, version)
+            row = conn.execute("SELECT result FROM match_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE match_cache SET last_used = ?, hits = hits + 1 WHERE key = ?",
+                (time.time(), key),
+            )
+            conn.commit()
+        try:
+            return json.loads(row[0])
+        except ValueError:
+            return None
+
+    def put(
+        self,
+        source: str,
+        source_category_path: str,
+        product_name: str,
+        result: Dict[str, Any],
+    ) -> bool:
+        """category_id 가 있고 스킵이 아닌 결과만 저장. 저장했으면 True."""
+        if not isinstance(result, dict) or not result.get("category_id") or result.get("skipped"):
+            return False
+        try:
+            payload = json.dumps(result, ensure_ascii=False, default=str)
+        except (TypeError, ValueError):
+            return False
+
+        version = current_match_version()
+        name_norm = normalize_product_name(product_name)
+        key = self.make_key(source, source_category_path, name_norm, version)
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            self._prune_old_versions(conn, version)
+            conn.execute(
+                """
+                INSERT INTO match_cache
+                    (key, source, source_path, name_norm, version, result, created_at, last_used, hits)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)
+                ON CONFLICT(key) DO UPDATE SET result = excluded.result, last_used = excluded.last_used
+                """,
+                (key, source or "", (source_category_path or "").strip(), name_norm, version, payload, now, now),
+            )
+            # LRU: 최대 개수를 넘은 만큼 오래 안 쓴 항목부터 삭제
+            (count,) = conn.execute("SELECT COUNT(*) FROM match_cache").fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                conn.execute(
+                    """
+                    DELETE FROM match_cache WHERE key IN (
+                        SELECT key FROM match_cache ORDER BY last_used ASC LIMIT ?
+                    )
+                    """,
+                    (overflow,),
+                )
+            conn.commit()
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM match_cache")
+            conn.commit()
+
+
+_MATCH_CACHE: Optional[MatchResultCache] = None
+_MATCH_CACHE_LOCK = threading.Lock()
+
+
+def get_match_cache() -> MatchResultCache:
+    """프로세스 공용 MatchResultCache (config 의 MATCH_CACHE_DB 사용)."""
+    global _MATCH_CACHE
+    with _MATCH_CACHE_LOCK:
+        if _MATCH_CACHE is None:
+            _MATCH_CACHE = MatchResultCache(MATCH_CACHE_DB, max_entries=MATCH_CACHE_MAX_ENTRIES)
+        return _MATCH_CACHE
@@ -0,0 +1,390 @@
+# cellon/core/rule_index.py
+"""
+룰 JSON 을 매칭하기 좋은 형태로 "컴파일" 해 두는 인덱스 모음.
+
+- KeywordAutomaton : 여러 키워드를 한 번의 스캔으로 찾는 Aho–Corasick 오토마타
+- MetaRuleIndex    : meta/coupang_<group>.json 을
+                     (1) source 별 path → meta_key 해시맵
+                     (2) keywords_include / exclude 오토마타
+                     로 미리 만들어 두고, _infer_meta_key 에서 규칙 수와 무관하게 조회한다.
+- GroupRuleIndex   : group 의 meta 룰 + __strong_name_rules__ + group 점수화 키워드를
+                     오토마타 하나로 합쳐, 상품명 1회 스캔 결과(RuleHits)를
+                     _infer_meta_key / _pick_by_strong_keyword / _score_group 이 같이 쓴다.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from .rules_loader import load_coupang_rules, load_meta_rules, refresh_rules_version
+
+
+# source 이름 → meta 룰의 path 목록 필드
+SOURCE_PATH_FIELDS: Dict[str, str] = {
+    "costco": "source_costco_paths",
+    "domemae": "source_domemae_paths",
+    "owner": "source_owner_paths",
+}
+
+
+# =========================
+# Aho–Corasick
+# =========================
+
+class KeywordAutomaton:
+    """
+    여러 키워드(부분 문자열)를 텍스트 한 번 스캔으로 모두 찾는다.
+    - 빌드: O(키워드 길이 합)
+    - 스캔: O(텍스트 길이 + 히트 수)
+    - 빈 문자열 키워드는 넣지 않는다(호출 쪽에서 "항상 포함"으로 따로 처리).
+    """
+
+    def __init__(self, patterns: Iterable[str]) -> None:
+        self.patterns: List[str] = []
+        self._pattern_ids: Dict[str, int] = {}
+
+        # 노드별 전이 / 실패 링크 / 출력(패턴 id 목록)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+
+        for p in patterns:
+            if not isinstance(p, str) or not p or p in self._pattern_ids:
+                continue
+            pid = len(self.patterns)
+            self._pattern_ids[p] = pid
+            self.patterns.append(p)
+            self._insert(p, pid)
+
+        self._build_fail_links()
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def _insert(self, pattern: str, pid: int) -> None:
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(pid)
+
+    def _build_fail_links(self) -> None:
+        queue: deque[int] = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            queue.append(child)
+
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                f = self._fail[node]
+                while f and ch not in self._goto[f]:
+                    f = self._fail[f]
+                self._fail[child] = self._goto[f].get(ch, 0)
+                # 실패 링크 쪽 출력도 물려받는다 (접미사 키워드)
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+
+    def scan(self, text: str) -> Counter:
+        """text 에 등장한 키워드별 등장 횟수. (겹치는 등장도 모두 센다)"""
+        hits: Counter = Counter()
+        if not text or not self.patterns:
+            return hits
+
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        patterns = self.patterns
+
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                for pid in out[node]:
+                    hits[patterns[pid]] += 1
+        return hits
+
+
+# =========================
+# meta 룰 인덱스
+# =========================
+
+@dataclass
+class MetaRuleIndex:
+    """
+    meta 룰(dict) → 조회용 인덱스.
+
+    - keys          : meta_key 목록 (JSON 순서 = 우선순위)
+    - path_map      : source → {path: meta_key} (같은 path 가 여러 룰에 있으면 앞 룰 우선)
+    - include/exclude : 키워드 → 그 키워드를 가진 룰 순번 목록
+    - automaton     : include/exclude 키워드 전체를 담은 오토마타
+    """
+
+    keys: List[str] = field(default_factory=list)
+    path_map: Dict[str, Dict[str, str]] = field(default_factory=dict)
+    include: Dict[str, List[int]] = field(default_factory=dict)
+    exclude: Dict[str, List[int]] = field(default_factory=dict)
+    # 빈 문자열 키워드("" in name 은 항상 True)를 가진 룰 순번
+    always_include: Set[int] = field(default_factory=set)
+    always_exclude: Set[int] = field(default_factory=set)
+    automaton: KeywordAutomaton = field(default_factory=lambda: KeywordAutomaton([]))
+
+    @classmethod
+    def from_rules(
+        cls,
+        meta_rules: Mapping[str, Any],
+        *,
+        compile_automaton: bool = True,
+    ) -> "MetaRuleIndex":
+        """
+        compile_automaton=False 면 오토마타는 만들지 않는다.
+        (GroupRuleIndex 처럼 바깥에서 공용 오토마타로 스캔한 hits 를 넘겨줄 때)
+        """
+        idx = cls()
+
+        for meta_key, rule in (meta_rules or {}).items():
+            if not isinstance(rule, dict):
+                continue
+            order = len(idx.keys)
+            idx.keys.append(meta_key)
+
+            # 1) source 별 path 해시맵
+            for source, field_name in SOURCE_PATH_FIELDS.items():
+                paths = rule.get(field_name) or []
+                bucket = idx.path_map.setdefault(source, {})
+                for p in paths:
+                    if isinstance(p, str):
+                        bucket.setdefault(p, meta_key)
+
+            # 2) 키워드 (include 가 비어 있는 룰은 키워드 매칭 대상이 아님)
+            inc = rule.get("keywords_include", []) or []
+            exc = rule.get("keywords_exclude", []) or []
+            if not inc:
+                continue
+
+            for k in inc:
+                if not isinstance(k, str):
+                    continue
+                if k == "":
+                    idx.always_include.add(order)
+                else:
+                    idx.include.setdefault(k, []).append(order)
+            for k in exc:
+                if not isinstance(k, str):
+                    continue
+                if k == "":
+                    idx.always_exclude.add(order)
+                else:
+                    idx.exclude.setdefault(k, []).append(order)
+
+        if compile_automaton:
+            idx.automaton = KeywordAutomaton(list(idx.include) + list(idx.exclude))
+        return idx
+
+    def patterns(self) -> List[str]:
+        """include/exclude 키워드 전체 (공용 오토마타 빌드용)."""
+        return list(self.include) + list(self.exclude)
+
+    def match_path(self, source: str, path: str) -> Optional[str]:
+        """source 카테고리 path 완전 일치 → meta_key. (O(1))"""
+        return self.path_map.get(source, {}).get(path)
+
+    def match_keywords(self, name_lower: str, hits: Optional[Counter] = None) -> Optional[str]:
+        """
+        include 중 하나라도 포함 & exclude 는 하나도 미포함인 룰 중
+        JSON 순서상 가장 앞선 meta_key.
+        hits 를 주면(이미 같은 텍스트를 스캔한 결과) 재스캔하지 않는다.
+        """
+        if hits is None:
+            hits = self.automaton.scan(name_lower)
+
+        candidates: Set[int] = set(self.always_include)
+        excluded: Set[int] = set(self.always_exclude)
+        for kw in hits:
+            candidates.update(self.include.get(kw, ()))
+            excluded.update(self.exclude.get(kw, ()))
+
+        ok = candidates - excluded
+        if not ok:
+            return None
+        return self.keys[min(ok)]
+
+
+# =========================
+# group 단위 공용 키워드 인덱스
+# =========================
+
+@dataclass(frozen=True)
+class RuleHits:
+    """상품명(소문자) 1회 스캔 결과. counts: 키워드 → 등장 횟수."""
+
+    text: str
+    counts: Counter
+
+    def __contains__(self, pattern: str) -> bool:
+        return pattern in self.counts
+
+
+@dataclass
+class _StrongRule:
+    order: int
+    target_id: str
+    rule: Dict[str, Any]
+    keywords: List[str]          # 소문자, 빈 문자열 제외
+    always: bool = False         # 빈 문자열 키워드가 있으면 항상 매칭
+
+
+class GroupRuleIndex:
+    """
+    group 하나의 룰(meta + coupang)을 키워드 오토마타 하나로 컴파일한 인덱스.
+
+    - meta        : MetaRuleIndex (path 해시맵 + include/exclude 매핑)
+    - strong 룰   : __strong_name_rules__ (키워드는 소문자로 비교)
+    - group 점수  : meta 룰 include/exclude 키워드(소문자) 히트 수 가중치
+
+    세 단계 모두 같은 상품명을 보므로 scan() 결과(RuleHits)를 재사용한다.
+    키워드 수가 늘어나도 스캔 비용은 상품명 길이에만 비례한다.
+    """
+
+    def __init__(self, meta_rules: Mapping[str, Any], coupang_rules: Mapping[str, Any]) -> None:
+        self.meta = MetaRuleIndex.from_rules(meta_rules, compile_automaton=False)
+
+        # --- group 점수화용 (소문자 키워드 → 전체 룰에서의 등장 횟수) ---
+        self.score_include: Counter = Counter()
+        self.score_exclude: Counter = Counter()
+        # source → path → 그 path 를 가진 룰 수
+        self.score_paths: Dict[str, Counter] = {}
+
+        for rule in (meta_rules or {}).values():
+            if not isinstance(rule, dict):
+                continue
+            for source, field_name in SOURCE_PATH_FIELDS.items():
+                paths = rule.get(field_name, []) or []
+                bucket = self.score_paths.setdefault(source, Counter())
+                for p in set(x for x in paths if isinstance(x, str)):
+                    bucket[p] += 1
+            try:
+                inc = [str(x).lower() for x in (rule.get("keywords_include") or [])]
+                exc = [str(x).lower() for x in (rule.get("keywords_exclude") or [])]
+            except Exception:
+                continue
+            self.score_include.update(k for k in inc if k)
+            self.score_exclude.update(k for k in exc if k)
+
+        # --- strong name 룰 ---
+        self.strong_rules: List[_StrongRule] = []
+        rules = (coupang_rules or {}).get("__strong_name_rules__", []) or []
+        for order, rule in enumerate(rules):
+            if not isinstance(rule, dict):
+                continue
+            target_id = str(rule.get("target_category_id") or "").strip()
+            if not target_id:
+                continue
+            kws = [str(k).lower() for k in (rule.get("keywords") or []) if k is not None]
+            self.strong_rules.append(
+                _StrongRule(
+                    order=order,
+                    target_id=target_id,
+                    rule=rule,
+                    keywords=[k for k in kws if k],
+                    always=any(k == "" for k in kws),
+                )
+            )
+
+        self._strong_by_kw: Dict[str, List[int]] = {}
+        for i, sr in enumerate(self.strong_rules):
+            for k in sr.keywords:
+                self._strong_by_kw.setdefault(k, []).append(i)
+
+        self.strong_ids: Set[str] = {sr.target_id for sr in self.strong_rules}
+
+        # --- 공용 오토마타 ---
+        self.automaton = KeywordAutomaton(
+            self.meta.patterns()
+            + list(self.score_include)
+            + list(self.score_exclude)
+            + list(self._strong_by_kw)
+        )
+
+        # 마지막 스캔 결과 1개 캐시 (같은 상품명을 세 단계가 연달아 조회)
+        self._last_hits: Optional[RuleHits] = None
+
+    # ---- 스캔 ----
+    def scan(self, text: str) -> RuleHits:
+        """text(보통 상품명 소문자)를 한 번 스캔. 직전과 같은 text 면 결과 재사용."""
+        text = text or ""
+        last = self._last_hits
+        if last is not None and last.text == text:
+            return last
+        hits = RuleHits(text=text, counts=self.automaton.scan(text))
+        self._last_hits = hits
+        return hits
+
+    # ---- 1) meta ----
+    def match_meta_keywords(self, hits: RuleHits) -> Optional[str]:
+        return self.meta.match_keywords(hits.text, hits=hits.counts)
+
+    # ---- 2) strong name 룰 ----
+    def match_strong(self, hits: RuleHits) -> List[Tuple[str, Dict[str, Any]]]:
+        """매칭된 strong 룰 (target_id, rule) 목록. JSON 순서 유지."""
+        matched: Set[int] = {i for i, sr in enumerate(self.strong_rules) if sr.always}
+        for kw in hits.counts:
+            matched.update(self._strong_by_kw.get(kw, ()))
+        return [
+            (self.strong_rules[i].target_id, self.strong_rules[i].rule)
+            for i in sorted(matched)
+        ]
+
+    # ---- 3) group 점수 ----
+    def path_score_count(self, source: str, path: str) -> int:
+        """source path 완전 일치 룰 수."""
+        if not path:
+            return 0
+        return self.score_paths.get(source, Counter()).get(path, 0)
+
+    def keyword_hit_counts(self, name_hits: RuleHits, path_hits: Optional[RuleHits] = None) -> Tuple[int, int, int]:
+        """
+        (include 히트 수, path 에서의 include 히트 수, exclude 히트 수)
+        - 룰마다 "포함된 키워드 개수"를 센 것의 합 (키워드 등장 횟수가 아니라 존재 여부)
+        """
+        hit_inc = sum(self.score_include[k] for k in name_hits.counts if k in self.score_include)
+        hit_exc = sum(self.score_exclude[k] for k in name_hits.counts if k in self.score_exclude)
+        hit_path = 0
+        if path_hits is not None:
+            hit_path = sum(self.score_include[k] for k in path_hits.counts if k in self.score_include)
+        return hit_inc, hit_path, hit_exc
+
+    def scan_path(self, path_lower: str) -> RuleHits:
+        """path 용 스캔 (상품명 캐시를 덮어쓰지 않음)."""
+        return RuleHits(text=path_lower or "", counts=self.automaton.scan(path_lower or ""))
+
+
+# group → (rules_version, index)
+_GROUP_INDEX_CACHE: Dict[str, Tuple[tuple, GroupRuleIndex]] = {}
+_GROUP_INDEX_LOCK = threading.Lock()
+
+
+def get_group_rule_index(group: str) -> GroupRuleIndex:
+    """
+    group 의 GroupRuleIndex 를 반환. 룰 버전(rules_version)이 같으면 재사용,
+    upsert_strong_name_rule / 룰 빌더가 파일을 바꾸면 다시 컴파일한다.
+    """
+    with _GROUP_INDEX_LOCK:
+        version = refresh_rules_version(group)
+        cached = _GROUP_INDEX_CACHE.get(group)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        index = GroupRuleIndex(load_meta_rules(group), load_coupang_rules(group))
+        _GROUP_INDEX_CACHE[group] = (version, index)
+        return index
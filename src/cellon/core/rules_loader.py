@@ -372,3 +372,78 @@ def load_all_market_groups() -> Dict[str, Dict[str, Dict[str, Any]]]:
         result[market] = groups
 
     return result
+
+
+# ----- 5. 룰 버전 (캐시 키 / 무효화용) -----
+
+def _file_stamp(path: Path) -> tuple:
+    """(경로, 크기, mtime_ns). 파일이 없으면 (경로, -1, -1)."""
+    try:
+        st = path.stat()
+    except OSError:
+        return (str(path), -1, -1)
+    return (str(path), st.st_size, st.st_mtime_ns)
+
+
+def rules_version(group: str) -> tuple:
+    """
+    group 매칭에 쓰이는 룰 파일들의 스냅샷을 반환.
+
+    - meta/coupang_<group>.json
+    - coupang/<group>_rules.json
+    - rules/<market>/*.json (CategoryMatcher.market_trees 로 전부 로드됨)
+
+    파일이 수정/추가/삭제되면 값이 달라지므로,
+    룰 기반으로 만든 객체(매처, 인덱스 등)의 캐시 키로 사용한다.
+    """
+    stamps = [
+        _file_stamp(META_DIR / f"coupang_{group}.json"),
+        _file_stamp(COUPANG_DIR / f"{group}_rules.json"),
+    ]
+    for d in sorted(_iter_market_dirs(), key=lambda p: p.name):
+        for p in sorted(d.glob("*.json")):
+            stamps.append(_file_stamp(p))
+    return tuple(stamps)
+
+
+def all_rules_version() -> tuple:
+    """
+    rules 폴더 전체(meta / coupang / market) JSON 스냅샷.
+    group 자동 선택(match_category_auto)처럼 모든 group 룰에 영향을 받는 결과의 캐시 키로 사용.
+    """
+    dirs = [META_DIR, COUPANG_DIR, *sorted(_iter_market_dirs(), key=lambda p: p.name)]
+    stamps = []
+    for d in dirs:
+        if d.exists():
+            for p in sorted(d.glob("*.json")):
+                stamps.append(_file_stamp(p))
+    return tuple(stamps)
+
+
+_SEEN_RULES_VERSIONS: Dict[str, tuple] = {}
+
+
+def refresh_rules_version(group: str) -> tuple:
+    """
+    rules_version(group) 을 계산하고, 지난 호출 때와 달라졌으면
+    lru 캐시를 비워서 다음 load_* 호출이 디스크의 새 JSON 을 읽도록 한다.
+    """
+    version = rules_version(group)
+    prev = _SEEN_RULES_VERSIONS.get(group)
+    if prev is not None and prev != version:
+        clear_rules_cache()
+    _SEEN_RULES_VERSIONS[group] = version
+    return version
+
+
+def clear_rules_cache() -> None:
+    """이 모듈의 lru_cache 를 모두 비운다. (룰 JSON 이 디스크에서 바뀐 경우)"""
+    load_meta_kitchen_rules.cache_clear()
+    load_coupang_kitchen_rules.cache_clear()
+    list_available_groups.cache_clear()
+    load_meta_rules.cache_clear()
+    load_coupang_rules.cache_clear()
+    list_markets.cache_clear()
+    list_market_groups.cache_clear()
+    load_market_group_json.cache_clear()
+    load_all_market_groups.cache_clear()
@@ -0,0 +1,7 @@
+# cellon/core/test/conftest.py
+"""
+pytest 설정.
+- manual_match_test.py / prodecut_test.py 는 직접 실행해서 눈으로 확인하는 수동 스크립트라 수집하지 않는다.
+"""
+
+collect_ignore = ["manual_match_test.py", "prodecut_test.py"]
@@ -0,0 +1,46 @@
+# cellon/core/test/test_category_id_index.py
+"""
+CategoryIdIndex.locate 확인.
+- 마스터 슬라이스(index 유지)는 라벨로 바로 찾는다
+- reset_index / 재정렬 등으로 라벨이 마스터와 달라진 df 도 id 비교로 찾는다
+
+실행: src 에서 `python -m pytest cellon/core/test`
+"""
+
+from __future__ import annotations
+
+import pandas as pd
+
+from cellon.category_ai.category_loader import CategoryIdIndex
+
+
+def _master() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "category_id": [100, 200, 300, 400, 500],
+            "category_path": ["a", "b", "c", "d", "e"],
+        },
+        index=[10, 11, 12, 13, 14],
+    )
+
+
+def test_locate_in_master_slice():
+    master = _master()
+    index = CategoryIdIndex(master)
+    sub = master.iloc[[1, 3, 4]]
+    assert index.locate(sub, "400") == 1
+    assert index.locate(sub, 100) is None
+    assert index.locate(sub, "999") is None
+    assert index.locate(sub.iloc[0:0], "200") is None
+
+
+def test_locate_in_reindexed_frame():
+    master = _master()
+    index = CategoryIdIndex(master)
+    sub = master.iloc[[3, 1, 4]].reset_index(drop=True)   # 라벨 0..2 → 마스터 라벨과 무관
+    assert index.locate(sub, "200") == 1
+    assert index.locate(sub, "500") == 2
+    assert index.locate(sub, "300") is None
+
+    shifted = master.set_index(master.index + 2)          # 라벨은 겹치지만 다른 행을 가리킴
+    assert index.locate(shifted, "300") == 2
@@ -0,0 +1,149 @@
+# cellon/core/test/test_category_store.py
+"""
+카테고리 마스터 컬럼형 스냅샷 확인.
+- write_columnar_master → ColumnarMaster.open_current 왕복 (NaN/None → "", 한글, 빈 DF / 빈 컬럼)
+- ColumnView 순회가 _DECODE_CHUNK_ROWS 경계를 넘어도 같은 값
+- frame(rows=...) 의 index / row()
+- _remove_old_snapshots: 직전 스냅샷 유지 + 유예 시간 안의 스냅샷은 지우지 않음
+
+실행: src 에서 `python -m pytest cellon/core/test`
+"""
+
+from __future__ import annotations
+
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cellon.category_ai import category_store
+from cellon.category_ai.category_store import ColumnarMaster, _remove_old_snapshots, write_columnar_master
+
+
+def _sample_df(n: int = 10) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "category_id": [str(1000 + i) for i in range(n)],
+            "category_path": [f"주방용품>냄비>편수냄비 {i} ✓" if i % 3 else None for i in range(n)],
+            "level4": [np.nan if i % 2 else f"leaf-{i}" for i in range(n)],
+            "count": list(range(n)),
+            "empty": [""] * n,                 # 데이터 배열 길이 0 → mmap 불가 → 일반 로드
+        }
+    )
+
+
+def _as_strings(df: pd.DataFrame) -> pd.DataFrame:
+    return df.apply(lambda col: [category_store._cell_str(v) for v in col]).astype(object)
+
+
+def test_round_trip(tmp_path):
+    df = _sample_df()
+    token = write_columnar_master(df, tmp_path)
+    store = ColumnarMaster.open_current(tmp_path)
+
+    assert store is not None and store.token == token
+    assert len(store) == len(df)
+    assert store.columns == list(df.columns)
+    assert store.has_columns(["category_id", "empty"]) and not store.has_columns(["nope"])
+
+    out = store.frame()
+    pd.testing.assert_frame_equal(out, _as_strings(df), check_dtype=False)
+    assert out.loc[0, "category_path"] == ""          # None → ""
+    assert out.loc[1, "level4"] == ""                 # NaN → ""
+    assert out.loc[1, "category_path"] == "주방용품>냄비>편수냄비 1 ✓"
+    assert out.loc[3, "count"] == "3"
+    assert store.value("category_path", 2) == "주방용품>냄비>편수냄비 2 ✓"
+
+
+def test_empty_frame_round_trip(tmp_path):
+    df = pd.DataFrame({"category_id": [], "category_path": []})
+    write_columnar_master(df, tmp_path)
+    store = ColumnarMaster.open_current(tmp_path)
+
+    assert len(store) == 0
+    assert list(store.column("category_id")) == []
+    out = store.frame()
+    assert list(out.columns) == ["category_id", "category_path"] and len(out) == 0
+
+
+def test_open_current_missing_or_broken(tmp_path):
+    assert ColumnarMaster.open_current(tmp_path) is None
+    (tmp_path / "CURRENT").write_text("deadbeef", encoding="utf-8")   # 없는 스냅샷
+    assert ColumnarMaster.open_current(tmp_path) is None
+
+
+def test_column_view_across_chunk_boundary(tmp_path, monkeypatch):
+    monkeypatch.setattr(category_store, "_DECODE_CHUNK_ROWS", 3)
+    df = _sample_df(10)
+    write_columnar_master(df, tmp_path)
+    view = ColumnarMaster.open_current(tmp_path).column("category_path")
+    expected = [category_store._cell_str(v) for v in df["category_path"]]
+
+    assert len(view) == 10
+    assert list(view) == expected
+    assert view[2:8] == expected[2:8]
+    assert view[::4] == expected[::4]
+    assert view[-1] == expected[-1]
+    assert view.take([9, 0, 4]) == [expected[9], expected[0], expected[4]]
+    with pytest.raises(IndexError):
+        view[10]
+
+
+def test_frame_rows_and_row(tmp_path):
+    df = _sample_df(10)
+    write_columnar_master(df, tmp_path)
+    store = ColumnarMaster.open_current(tmp_path)
+
+    sub = store.frame(columns=["category_id", "level4"], rows=[5, 2, 9])
+    assert list(sub.index) == [5, 2, 9]
+    assert list(sub.columns) == ["category_id", "level4"]
+    assert sub.loc[2, "level4"] == "leaf-2"
+    assert sub.loc[9, "category_id"] == "1009"
+
+    row = store.row(4, columns=["category_id", "category_path"])
+    assert row.name == 4
+    assert row.to_dict() == {"category_id": "1004", "category_path": "주방용품>냄비>편수냄비 4 ✓"}
+
+
+def _snapshot(root, created_ns: int):
+    p = root / f"{created_ns:x}"
+    p.mkdir()
+    (p / "meta.json").write_text("{}", encoding="utf-8")
+    return p
+
+
+def test_remove_old_snapshots_keeps_previous_and_grace(tmp_path):
+    now = time.time_ns()
+    grace_ns = int(category_store._SNAPSHOT_GRACE_SEC * 1e9)
+
+    very_old = _snapshot(tmp_path, now - 3 * grace_ns)
+    old = _snapshot(tmp_path, now - 2 * grace_ns)
+    recent = _snapshot(tmp_path, now - grace_ns // 2)      # 유예 시간 안
+    previous = _snapshot(tmp_path, now - grace_ns // 4)    # 직전 스냅샷
+    current = _snapshot(tmp_path, now)
+    leftover = tmp_path / f"{now - 4 * grace_ns:x}.trash"  # 지난번에 rename 까지만 된 것
+    leftover.mkdir()
+    other = tmp_path / "notes"                              # 스냅샷이 아닌 폴더
+    other.mkdir()
+
+    _remove_old_snapshots(tmp_path, keep=current.name)
+
+    assert not very_old.exists() and not old.exists()
+    assert recent.exists() and previous.exists() and current.exists()
+    assert not leftover.exists()
+    assert other.exists()
+
+
+def test_previous_snapshot_kept_even_when_old(tmp_path):
+    now = time.time_ns()
+    grace_ns = int(category_store._SNAPSHOT_GRACE_SEC * 1e9)
+    older = _snapshot(tmp_path, now - 3 * grace_ns)
+    previous = _snapshot(tmp_path, now - 2 * grace_ns)
+
+    token = write_columnar_master(_sample_df(3), tmp_path)
+
+    assert (tmp_path / token).exists()
+    assert previous.exists()                 # 리더가 아직 열고 있을 수 있는 직전 스냅샷
+    assert not older.exists()
+    assert ColumnarMaster.open_current(tmp_path).token == token
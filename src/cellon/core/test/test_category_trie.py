@@ -0,0 +1,84 @@
+# cellon/core/test/test_category_trie.py
+"""
+CategoryTrie 의 prefix / contains 조회가 DataFrame 전체 필터와 같은 행을 돌려주는지 확인.
+
+실행: src 에서 `python -m pytest cellon/core/test`
+"""
+
+from __future__ import annotations
+
+import random
+
+import numpy as np
+
+from cellon.core.category_trie import CategoryTrie
+
+
+_SEGMENTS = ["주방용품", "주방 용품", "냄비", "냄비/솥", "편수냄비", "팬", "프라이팬", "a", "ab", ""]
+
+
+def _random_paths(rng: random.Random, n: int):
+    return [
+        ">".join(rng.choice(_SEGMENTS) for _ in range(rng.randint(1, 4)))
+        for _ in range(n)
+    ]
+
+
+def _brute_prefix(paths, prefix):
+    return np.asarray([i for i, p in enumerate(paths) if p.startswith(prefix)], dtype=np.int64)
+
+
+def _brute_contains(paths, text):
+    return np.asarray(
+        [i for i, p in enumerate(paths) if text in p.replace(" ", "")], dtype=np.int64
+    )
+
+
+def _queries(rng: random.Random, paths):
+    """실제 경로의 접두어(세그먼트 중간에서 잘린 것 포함) + 없는 경로."""
+    out = ["", ">", "없는>경로", "주방용품>"]
+    for p in rng.sample(paths, min(len(paths), 20)):
+        out.append(p)
+        out.append(p[: rng.randint(0, len(p))])
+        out.append(p + ">")
+    return out
+
+
+def test_prefix_positions_match_startswith():
+    rng = random.Random(17)
+    for _ in range(50):
+        paths = _random_paths(rng, rng.randint(1, 80))
+        trie = CategoryTrie(paths)
+        for q in _queries(rng, paths):
+            np.testing.assert_array_equal(trie.prefix_positions(q), _brute_prefix(paths, q), err_msg=q)
+
+
+def test_contains_positions_match_substring_without_spaces():
+    rng = random.Random(19)
+    for _ in range(50):
+        paths = _random_paths(rng, rng.randint(1, 80))
+        trie = CategoryTrie(paths)
+        labels = [s.replace(" ", "") for s in _SEGMENTS] + ["냄", "용품>냄비", "품>", "없음"]
+        labels += [p.replace(" ", "") for p in rng.sample(paths, min(len(paths), 5))]
+        for text in labels:
+            expected = _brute_contains(paths, text)
+            np.testing.assert_array_equal(trie.contains_positions(text), expected, err_msg=text)
+            # 두 번째 호출은 캐시 결과
+            np.testing.assert_array_equal(trie.contains_positions(text), expected, err_msg=text)
+
+
+def test_rank_of_is_inverse_of_order():
+    rng = random.Random(29)
+    paths = _random_paths(rng, 100)
+    trie = CategoryTrie(paths)
+    np.testing.assert_array_equal(trie.order[trie.rank_of], np.arange(len(paths)))
+
+
+def test_find_and_subtree_positions():
+    paths = ["주방용품>냄비>편수냄비", "주방용품>냄비", "주방용품>팬", "생활>냄비"]
+    trie = CategoryTrie(paths)
+    node = trie.find(["주방용품", "냄비"])
+    assert node is not None and node.path == "주방용품>냄비"
+    np.testing.assert_array_equal(trie.subtree_positions(node), [0, 1])
+    np.testing.assert_array_equal(trie.subtree_positions(node, include_self=False), [0])
+    assert trie.find(["주방용품", "없음"]) is None
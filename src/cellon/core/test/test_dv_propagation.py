@@ -0,0 +1,82 @@
+# cellon/core/test/test_dv_propagation.py
+"""
+_DVPropagator(행 구간 늘리기)가 기존 "dst 셀마다 dv.add" 방식과 같은 셀을 덮는지,
+연속된 행을 쓰면 범위가 하나로 이어지는지 확인.
+
+실행: src 에서 `python -m pytest cellon/core/test`
+"""
+
+from __future__ import annotations
+
+import random
+
+from openpyxl import Workbook
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.datavalidation import DataValidation
+
+from cellon.sellertool_excel import _DVPropagator
+
+
+_TEMPLATE_ROWS = 30
+
+
+def _covered(dv) -> set:
+    return {
+        (r, c)
+        for rng in dv.sqref.ranges
+        for r in range(rng.min_row, rng.max_row + 1)
+        for c in range(rng.min_col, rng.max_col + 1)
+    }
+
+
+def _random_sheet(rng: random.Random):
+    wb = Workbook()
+    ws = wb.active
+    for _ in range(rng.randint(1, 5)):
+        dv = DataValidation(type="list", formula1='"a,b"')
+        for _ in range(rng.randint(1, 4)):
+            c1 = rng.randint(1, 10)
+            c2 = c1 + rng.randint(0, 2)
+            r1 = rng.randint(1, _TEMPLATE_ROWS)
+            r2 = rng.randint(r1, _TEMPLATE_ROWS)
+            dv.add(f"{get_column_letter(c1)}{r1}:{get_column_letter(c2)}{r2}")
+        ws.add_data_validation(dv)
+    return ws
+
+
+def test_propagation_matches_per_cell_add():
+    rng = random.Random(59)
+    for _ in range(100):
+        ws = _random_sheet(rng)
+        dvs = list(ws.data_validations.dataValidation)
+        # 기존 방식: src 행에 걸린 범위의 열들을 dst 행에 셀 단위로 추가
+        expected = [_covered(dv) for dv in dvs]
+        src_cols = {}
+
+        prop = _DVPropagator(ws)
+        dst = _TEMPLATE_ROWS + 1
+        for _ in range(rng.randint(1, 40)):
+            src = rng.randint(1, _TEMPLATE_ROWS)
+            dst += rng.choice((0, 1, 1, 1, 2))  # 같은 행 재전파 / 연속 / 건너뛰기
+            for i, dv in enumerate(dvs):
+                cols = src_cols.setdefault((i, src), {c for r, c in expected[i] if r == src})
+                expected[i] |= {(dst, c) for c in cols}
+            prop.propagate(src, dst)
+
+        assert [_covered(dv) for dv in dvs] == expected
+
+
+def test_consecutive_rows_extend_one_range():
+    wb = Workbook()
+    ws = wb.active
+    dv = DataValidation(type="list", formula1='"a,b"')
+    dv.add("J5:K30")
+    dv.add("M7")
+    ws.add_data_validation(dv)
+
+    prop = _DVPropagator(ws)
+    for dst in range(31, 131):
+        prop.propagate(10, dst)
+    prop.propagate(7, 131)
+
+    assert sorted(str(r) for r in dv.sqref.ranges) == ["J5:K131", "M131", "M7"]
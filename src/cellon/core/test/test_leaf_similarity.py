@@ -0,0 +1,109 @@
+# cellon/core/test/test_leaf_similarity.py
+"""
+LeafSimilarityIndex(상한 가지치기 + 중복 leaf 묶음)가 기존 iterrows + difflib 루프와
+같은 1등 행 / 1등 점수 / 2등 점수를 내는지 확인.
+
+실행: src 에서 `python -m pytest cellon/core/test`
+"""
+
+from __future__ import annotations
+
+import difflib
+import random
+
+import numpy as np
+import pandas as pd
+
+from cellon.core.leaf_similarity import LeafSimilarityIndex, best_leaf_match, normalize_leaf_text
+
+
+_LEAF_CHARS = "편수양냄비팬솥프라이웍ab1 -"
+
+
+def _old_best(paths, tokens):
+    """기존 CategoryMatcher 루프: (1등 행 번호, 1등 점수, 2등 점수) 또는 None."""
+    best = None
+    best_score = 0.0
+    second_best = 0.0
+    for i, path in enumerate(paths):
+        leaf_norm = normalize_leaf_text(str(path).split(">")[-1].strip())
+        if not leaf_norm:
+            continue
+        leaf_best = 0.0
+        for token in tokens:
+            if not leaf_norm or not token:
+                continue
+            score = difflib.SequenceMatcher(None, leaf_norm, token).ratio()
+            if score > leaf_best:
+                leaf_best = score
+        if leaf_best > best_score:
+            second_best = best_score
+            best_score = leaf_best
+            best = i
+        elif leaf_best > second_best:
+            second_best = leaf_best
+    if best is None:
+        return None
+    return best, best_score, second_best
+
+
+def _rand_text(rng: random.Random, lo: int, hi: int) -> str:
+    return "".join(rng.choice(_LEAF_CHARS) for _ in range(rng.randint(lo, hi)))
+
+
+def _random_paths(rng: random.Random, n: int):
+    leaves = [_rand_text(rng, 0, 5) for _ in range(max(1, n // 3))]  # 중복 leaf 가 자주 나오도록
+    return [f"주방>{_rand_text(rng, 1, 3)}>{rng.choice(leaves)}" for _ in range(n)]
+
+
+def test_best_match_equals_old_loop():
+    rng = random.Random(3)
+    for _ in range(300):
+        paths = _random_paths(rng, rng.randint(1, 30))
+        tokens = [normalize_leaf_text(_rand_text(rng, 0, 6)) for _ in range(rng.randint(0, 4))]
+        idx = LeafSimilarityIndex(paths)
+
+        expected = _old_best(paths, tokens)
+        got = idx.best_match(np.arange(len(paths)), tokens)
+        if expected is None:
+            assert got is None
+            continue
+        assert got is not None
+        assert (got.offset, got.score, got.second) == expected
+        assert got.leaf == paths[expected[0]].split(">")[-1].strip()
+
+
+def test_best_match_on_position_subset():
+    rng = random.Random(5)
+    paths = _random_paths(rng, 60)
+    idx = LeafSimilarityIndex(paths)
+    for _ in range(100):
+        positions = np.asarray(sorted(rng.sample(range(len(paths)), rng.randint(1, 20))))
+        tokens = [normalize_leaf_text(_rand_text(rng, 1, 5)) for _ in range(2)]
+        expected = _old_best([paths[p] for p in positions], tokens)
+        got = idx.best_match(positions, tokens)
+        if expected is None:
+            assert got is None
+        else:
+            assert (got.offset, got.score, got.second) == expected
+
+
+def test_tied_leaves_report_equal_second():
+    idx = LeafSimilarityIndex(["주방>냄비>편수냄비", "생활>편수냄비", "주방>프라이팬"])
+    got = idx.best_match(np.arange(3), ["편수냄비"])
+    assert got.offset == 0
+    assert got.score == 1.0 and got.second == 1.0
+
+
+def test_best_leaf_match_master_slice_and_adhoc():
+    master = pd.DataFrame(
+        {
+            "category_id": ["1", "2", "3", "4"],
+            "category_path": ["주방>냄비>양수냄비", "주방>냄비>편수냄비", "주방>팬>프라이팬", "주방>팬>웍"],
+        }
+    )
+    candidates = master.iloc[[1, 2, 3]]
+    from_master = best_leaf_match(master, candidates, ["편수냄비"])
+    adhoc = best_leaf_match(None, candidates.reset_index(drop=True), ["편수냄비"])
+    assert from_master == adhoc
+    assert candidates.iloc[from_master.offset]["category_id"] == "2"
@@ -0,0 +1,121 @@
+# cellon/core/test/test_llm_cache.py
+"""
+LLMResponseCache / call_ollama_chat_cached 확인 (tmp sqlite, 시계와 LLM 호출은 바꿔 끼움).
+- TTL 이 지난 항목은 miss + 삭제
+- 최대 개수 초과 시 last_used 가 오래된 것부터 삭제
+- call_ollama_chat_cached 의 llm_cache_hit / llm_saved_sec 플래그, JSON 이 아닌 응답은 저장하지 않음
+
+실행: src 에서 `python -m pytest cellon/core/test`
+"""
+
+from __future__ import annotations
+
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from cellon.category_ai import category_llm, llm_cache
+from cellon.category_ai.llm_cache import LLMResponseCache, llm_cache_key
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    state = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(llm_cache, "time", SimpleNamespace(time=lambda: state.now))
+    return state
+
+
+def _keys(db) -> list:
+    with sqlite3.connect(str(db)) as conn:
+        return sorted(r[0] for r in conn.execute("SELECT key FROM llm_cache"))
+
+
+def test_key_covers_model_prompts_and_extra():
+    base = llm_cache_key("m", "sys", "user")
+    assert base == llm_cache_key("m", "sys", "user")
+    assert base != llm_cache_key("m2", "sys", "user")
+    assert base != llm_cache_key("m", "sys", "user2")
+    assert base != llm_cache_key("m", "sys", "user", extra={"enum": ["1"]})
+    assert llm_cache_key("m", "s", "u", extra={"a": 1, "b": 2}) == llm_cache_key("m", "s", "u", extra={"b": 2, "a": 1})
+
+
+def test_ttl_expiry(tmp_path, clock):
+    db = tmp_path / "llm.sqlite3"
+    cache = LLMResponseCache(db, ttl_sec=60, max_entries=10)
+    cache.put("k", "m", '{"category_id": "1"}', 2.5)
+
+    clock.now += 59
+    assert cache.get("k") == ('{"category_id": "1"}', 2.5)
+
+    clock.now += 2                        # 저장 후 61초 → 만료
+    assert cache.get("k") is None
+    assert _keys(db) == []
+    assert cache.stats() == {"hits": 1, "misses": 1, "saved_sec": 2.5}
+
+
+def test_put_drops_expired_entries(tmp_path, clock):
+    db = tmp_path / "llm.sqlite3"
+    cache = LLMResponseCache(db, ttl_sec=60, max_entries=10)
+    cache.put("old", "m", "x", 1.0)
+    clock.now += 120
+    cache.put("new", "m", "y", 1.0)
+    assert _keys(db) == ["new"]
+
+
+def test_lru_eviction_by_last_used(tmp_path, clock):
+    db = tmp_path / "llm.sqlite3"
+    cache = LLMResponseCache(db, ttl_sec=3600, max_entries=3)
+    for k in ("a", "b", "c"):
+        clock.now += 1
+        cache.put(k, "m", k, 1.0)
+    clock.now += 1
+    assert cache.get("a") is not None     # a 를 최근 사용으로
+
+    clock.now += 1
+    cache.put("d", "m", "d", 1.0)         # 가장 오래 안 쓴 b 가 빠짐
+    assert _keys(db) == ["a", "c", "d"]
+    assert cache.get("b") is None
+
+
+@pytest.fixture
+def cached_env(tmp_path, monkeypatch):
+    """tmp 캐시 + 가짜 모델 호출로 바꾼 call_ollama_chat_cached 환경."""
+    cache = LLMResponseCache(tmp_path / "llm.sqlite3", ttl_sec=3600, max_entries=10)
+    state = SimpleNamespace(cache=cache, calls=0, reply='{"category_id": "123", "reason": "냄비"}')
+
+    def fake_call(system_prompt, user_prompt, **kwargs):
+        state.calls += 1
+        return state.reply
+
+    monkeypatch.setattr(category_llm, "get_llm_cache", lambda: cache)
+    monkeypatch.setattr(category_llm, "get_ollama_client", lambda: SimpleNamespace(model="fake-model"))
+    monkeypatch.setattr(category_llm, "call_ollama_chat", fake_call)
+    return state
+
+
+def test_cached_call_sets_hit_flags(cached_env):
+    raw, info = category_llm.call_ollama_chat_cached("sys", "스텐 냄비")
+    assert raw == cached_env.reply
+    assert info["llm_cache_hit"] is False and info["llm_saved_sec"] == 0.0
+    assert cached_env.calls == 1
+
+    raw2, info2 = category_llm.call_ollama_chat_cached("sys", "스텐 냄비")
+    assert raw2 == raw
+    assert info2["llm_cache_hit"] is True
+    assert info2["llm_elapsed_sec"] == 0.0
+    assert info2["llm_saved_sec"] == pytest.approx(info["llm_elapsed_sec"])
+    assert cached_env.calls == 1
+
+    # response_format 이 다르면 다른 키
+    _, info3 = category_llm.call_ollama_chat_cached("sys", "스텐 냄비", response_format={"type": "object"})
+    assert info3["llm_cache_hit"] is False
+    assert cached_env.calls == 2
+
+
+def test_cached_call_skips_unparseable_reply(cached_env):
+    cached_env.reply = "모르겠습니다"
+    for _ in range(2):
+        _, info = category_llm.call_ollama_chat_cached("sys", "스텐 냄비")
+        assert info["llm_cache_hit"] is False
+    assert cached_env.calls == 2
@@ -0,0 +1,126 @@
+# cellon/core/test/test_match_cache.py
+"""
+MatchResultCache 확인 (tmp sqlite + tmp rules 폴더, 마스터 토큰은 고정값으로 바꿔 끼움).
+- (source, path, 정규화 상품명) 키 hit / miss
+- 룰 파일 스탬프 / 마스터 토큰이 바뀌면 miss + 이전 버전 항목 정리
+- 최대 개수 초과 시 last_used 가 오래된 것부터 삭제
+- 스킵 / category_id 없는 결과는 저장하지 않음
+
+실행: src 에서 `python -m pytest cellon/core/test`
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from cellon.core import match_cache, rules_loader
+from cellon.core.match_cache import MatchResultCache, normalize_product_name
+
+
+RESULT = {"category_id": "123", "category_path": "주방용품>냄비", "group": "kitchen"}
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    """rules 폴더 / 마스터 토큰 / 시계를 테스트용으로 바꾼 환경."""
+    rules = tmp_path / "rules"
+    monkeypatch.setattr(rules_loader, "RULES_DIR", rules)
+    monkeypatch.setattr(rules_loader, "META_DIR", rules / "meta")
+    monkeypatch.setattr(rules_loader, "COUPANG_DIR", rules / "coupang")
+    (rules / "meta").mkdir(parents=True)
+    (rules / "meta" / "coupang_kitchen.json").write_text(json.dumps({"pot": {}}), encoding="utf-8")
+
+    state = SimpleNamespace(token="snap-1", now=1000.0)
+    monkeypatch.setattr(match_cache, "category_master_token", lambda: state.token)
+
+    def clock() -> float:
+        state.now += 1.0
+        return state.now
+
+    monkeypatch.setattr(match_cache, "time", SimpleNamespace(time=clock))
+    state.db = tmp_path / "cache" / "match.sqlite3"
+    return state
+
+
+def _rows(db) -> list:
+    with sqlite3.connect(str(db)) as conn:
+        return conn.execute("SELECT source, source_path, name_norm, version FROM match_cache").fetchall()
+
+
+def test_hit_and_miss_by_source_path_and_normalized_name(env):
+    cache = MatchResultCache(env.db)
+    assert cache.get("costco", "주방>냄비", "스텐 냄비 2P") is None
+    assert cache.put("costco", "주방>냄비", "스텐 냄비 2P", RESULT)
+
+    assert cache.get("costco", " 주방>냄비 ", "스텐-냄비   ２p") == RESULT   # 공백/기호/전각 차이
+    assert cache.get("domemae", "주방>냄비", "스텐 냄비 2P") is None
+    assert cache.get("costco", "주방>팬", "스텐 냄비 2P") is None
+    assert cache.get("costco", "주방>냄비", "스텐 냄비 3P") is None
+    assert normalize_product_name("스텐-냄비   ２P!") == "스텐 냄비 2p"
+
+
+def test_rules_change_invalidates(env):
+    cache = MatchResultCache(env.db)
+    cache.put("costco", "주방>냄비", "스텐 냄비", RESULT)
+    assert cache.get("costco", "주방>냄비", "스텐 냄비") == RESULT
+
+    rules_loader.upsert_strong_name_rule("kitchen", "999", ["냄비"])
+    assert cache.get("costco", "주방>냄비", "스텐 냄비") is None
+    # 버전 변경을 처음 본 시점에 이전 버전 항목은 정리된다
+    assert _rows(env.db) == []
+
+
+def test_rules_file_stamp_change_invalidates(env):
+    cache = MatchResultCache(env.db)
+    cache.put("costco", "", "스텐 냄비", RESULT)
+    (rules_loader.META_DIR / "coupang_kitchen.json").write_text(
+        json.dumps({"pot": {"keywords_include": ["냄비"]}}), encoding="utf-8"
+    )
+    assert cache.get("costco", "", "스텐 냄비") is None
+
+
+def test_master_token_change_invalidates_and_prunes(env):
+    cache = MatchResultCache(env.db)
+    cache.put("costco", "", "a", RESULT)
+    cache.put("costco", "", "b", RESULT)
+    old_version = _rows(env.db)[0][3]
+
+    env.token = "snap-2"
+    assert cache.get("costco", "", "a") is None
+    assert _rows(env.db) == []
+
+    cache.put("costco", "", "a", RESULT)
+    assert [r[3] for r in _rows(env.db)] != [old_version]
+    assert cache.get("costco", "", "a") == RESULT
+
+
+def test_lru_eviction_by_last_used(env):
+    cache = MatchResultCache(env.db, max_entries=3)
+    for name in ("a", "b", "c"):
+        cache.put("costco", "", name, RESULT)
+    assert cache.get("costco", "", "a") == RESULT        # a 를 최근 사용으로
+
+    cache.put("costco", "", "d", RESULT)                  # 가장 오래 안 쓴 b 가 빠짐
+    assert sorted(r[2] for r in _rows(env.db)) == ["a", "c", "d"]
+    assert cache.get("costco", "", "b") is None
+
+
+@pytest.mark.parametrize(
+    "result",
+    [
+        {"category_id": "", "category_path": "x"},
+        {"category_path": "x"},
+        {"category_id": "123", "skipped": True},
+        None,
+        "123",
+    ],
+)
+def test_skipped_or_idless_results_are_not_stored(env, result):
+    cache = MatchResultCache(env.db)
+    assert cache.put("costco", "", "a", result) is False
+    assert cache.get("costco", "", "a") is None
+    assert _rows(env.db) == []
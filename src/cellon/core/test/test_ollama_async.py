@@ -0,0 +1,117 @@
+# cellon/core/test/test_ollama_async.py
+"""
+AsyncOllamaClient 확인 (네트워크 없이 느린 가짜 OllamaClient 로).
+- 같은 요청 합치기: 먼저 보낸 쪽이 타임아웃으로 포기해도 같이 기다리던 쪽은 결과를 받는다
+- 진행 콜백은 chat_sync 를 부른 스레드에서 불린다
+- 호출 실패는 LLMError 로 나온다
+
+실행: src 에서 `python -m pytest cellon/core/test`
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from cellon.category_ai import ollama_async
+from cellon.category_ai.ollama_async import AsyncOllamaClient
+from cellon.category_ai.ollama_client import LLMError
+
+
+class _SlowClient:
+    """chat / chat_stream 이 delay 초 뒤에 응답하는 가짜 OllamaClient (deadline 은 무시)."""
+
+    model = "fake-model"
+    default_deadline = 5.0
+
+    def __init__(self, delay: float, fail: bool = False) -> None:
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def chat(self, system_prompt, user_prompt, **kwargs) -> str:
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise LLMError("backend down")
+        return f'{{"category_id": "{user_prompt}"}}'
+
+    def chat_stream(self, system_prompt, user_prompt, *, on_progress=None, **kwargs) -> str:
+        self.calls += 1
+        for i in range(3):
+            time.sleep(self.delay / 3)
+            if on_progress is not None:
+                on_progress(i + 1, "x" * (i + 1))
+        return "done"
+
+
+@pytest.fixture
+def no_queue_slack(monkeypatch):
+    monkeypatch.setattr(ollama_async, "LOCAL_LLM_QUEUE_SLACK_SEC", 0.0)
+
+
+def test_timeout_of_first_caller_does_not_cancel_coalesced_caller(no_queue_slack):
+    backend = _SlowClient(delay=1.0)
+    client = AsyncOllamaClient(backend, max_concurrency=2)
+    results = {}
+
+    def caller(name: str, deadline: float) -> None:
+        try:
+            results[name] = client.chat_sync("sys", "same prompt", deadline=deadline)
+        except BaseException as e:  # CancelledError 가 새어 나오는지도 잡아서 확인
+            results[name] = e
+
+    try:
+        a = threading.Thread(target=caller, args=("a", 0.2))
+        b = threading.Thread(target=caller, args=("b", 5.0))
+        a.start()
+        time.sleep(0.05)
+        b.start()
+        a.join()
+        b.join()
+    finally:
+        client.close()
+
+    assert isinstance(results["a"], LLMError)
+    assert results["b"] == '{"category_id": "same prompt"}'
+    assert backend.calls == 1
+    assert client.coalesced == 1
+
+
+def test_request_after_timeout_reuses_running_call(no_queue_slack):
+    backend = _SlowClient(delay=0.6)
+    client = AsyncOllamaClient(backend)
+    try:
+        with pytest.raises(LLMError):
+            client.chat_sync("sys", "p", deadline=0.1)
+        # 포기한 호출의 HTTP 는 계속 돌고 있으므로 같은 요청은 그 결과를 받는다
+        assert client.chat_sync("sys", "p", deadline=5.0) == '{"category_id": "p"}'
+        assert backend.calls == 1
+        assert client.stats()["in_flight"] == 0
+    finally:
+        client.close()
+
+
+def test_backend_error_is_llm_error():
+    client = AsyncOllamaClient(_SlowClient(delay=0.0, fail=True))
+    try:
+        with pytest.raises(LLMError):
+            client.chat_sync("sys", "p")
+    finally:
+        client.close()
+
+
+def test_progress_runs_on_calling_thread():
+    client = AsyncOllamaClient(_SlowClient(delay=0.6))
+    seen = []
+    try:
+        out = client.chat_sync(
+            "sys", "p", stream=True, on_progress=lambda n, text: seen.append((n, threading.current_thread()))
+        )
+    finally:
+        client.close()
+    assert out == "done"
+    assert [n for n, _ in seen] == [1, 2, 3]
+    assert all(t is threading.current_thread() for _, t in seen)
@@ -0,0 +1,113 @@
+# cellon/core/test/test_ollama_stream.py
+"""
+JsonObjectScanner 와 chat_stream(stop_when=...) 조기 종료 확인.
+네트워크 없이 session 을 NDJSON 줄을 내보내는 가짜 객체로 바꿔서 돌린다.
+
+실행: src 에서 `python -m pytest cellon/core/test`
+"""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from cellon.category_ai.category_llm import _has_category_id
+from cellon.category_ai.ollama_client import JsonObjectScanner, LLMError, OllamaClient
+
+
+class _FakeResponse:
+    def __init__(self, lines):
+        self._lines = lines
+        self.consumed = 0
+        self.closed = False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self):
+        for line in self._lines:
+            self.consumed += 1
+            yield line
+
+    def close(self):
+        self.closed = True
+
+
+class _FakeSession:
+    def __init__(self, lines):
+        self.resp = _FakeResponse(lines)
+        self.payloads = []
+
+    def post(self, url, json=None, timeout=None, stream=False):
+        self.payloads.append(json)
+        return self.resp
+
+
+def _ndjson(pieces, done=True):
+    lines = [json.dumps({"message": {"content": p}, "done": False}).encode() for p in pieces]
+    if done:
+        lines.append(json.dumps({"message": {"content": ""}, "done": True}).encode())
+    return lines
+
+
+def _client(lines) -> OllamaClient:
+    client = OllamaClient("http://127.0.0.1:1", "test-model", keep_alive=None, num_ctx=None)
+    client.session = _FakeSession(lines)
+    return client
+
+
+# ---------- JsonObjectScanner ----------
+def test_scanner_across_chunk_boundaries():
+    text = 'noise {"a": 1, "b": {"c": [1, 2]}} mid {"d": "x"} tail'
+    for step in (1, 2, 3, 7, len(text)):
+        scanner = JsonObjectScanner()
+        found = []
+        for i in range(0, len(text), step):
+            found.extend(scanner.feed(text[i:i + step]))
+        assert found == ['{"a": 1, "b": {"c": [1, 2]}}', '{"d": "x"}']
+
+
+def test_scanner_ignores_braces_and_escapes_in_strings():
+    obj = {"name": 'a } { " \\ b', "category_id": "123"}
+    text = json.dumps(obj, ensure_ascii=False)
+    scanner = JsonObjectScanner()
+    found = []
+    for ch in "```json\n" + text + "\n```":
+        found.extend(scanner.feed(ch))
+    assert len(found) == 1 and json.loads(found[0]) == obj
+
+
+def test_scanner_incomplete_object_is_not_returned():
+    scanner = JsonObjectScanner()
+    assert scanner.feed('{"category_id": "1"') == []
+    assert scanner.feed("}") == ['{"category_id": "1"}']
+
+
+# ---------- chat_stream(stop_when) ----------
+def test_stream_stops_at_first_object_with_category_id():
+    pieces = ['{"reason": "x"} ', '{"category_', 'id": "777", ', '"confidence": 0.9}', " extra", " more"]
+    client = _client(_ndjson(pieces))
+    out = client.chat_stream("sys", "user", stop_when=_has_category_id)
+
+    assert json.loads(out) == {"category_id": "777", "confidence": 0.9}
+    resp = client.session.resp
+    assert resp.closed
+    assert resp.consumed == 4  # 뒤쪽 청크는 읽지 않고 연결을 닫음
+    assert client.session.payloads[0]["stream"] is True
+
+
+def test_stream_without_match_returns_full_text():
+    pieces = ["hello ", '{"reason": "x"}']
+    client = _client(_ndjson(pieces))
+    out = client.chat_stream("sys", "user", stop_when=_has_category_id)
+    assert out == 'hello {"reason": "x"}'
+    assert client.session.resp.closed
+
+
+def test_stream_error_chunk_raises_and_closes():
+    lines = _ndjson(["{"], done=False) + [json.dumps({"error": "model not found"}).encode()]
+    client = _client(lines)
+    with pytest.raises(LLMError):
+        client.chat_stream("sys", "user", stop_when=_has_category_id)
+    assert client.session.resp.closed
@@ -0,0 +1,101 @@
+# cellon/core/test/test_prompt_builder.py
+"""
+후보 트리 렌더링이 (id, 전체경로) 를 잃지 않는지, 토큰 예산 trim 이
+"예산 안에 들어가는 최대 top-K" 를 고르는지 확인.
+
+실행: src 에서 `python -m pytest cellon/core/test`
+"""
+
+from __future__ import annotations
+
+import random
+import re
+
+from cellon.category_ai.prompt_builder import (
+    build_candidate_block,
+    estimate_tokens,
+    lexical_scores,
+    render_candidate_tree,
+)
+
+
+_SEGMENTS = ["주방용품", "취사도구", "냄비", "편수냄비", "양수냄비", "프라이팬", "Pot", "웍"]
+_LINE_RE = re.compile(r"^( *)(.*?)(?: \[(.*)\])?$")
+
+
+def _random_candidates(rng: random.Random, n: int):
+    paths = set()
+    while len(paths) < n:
+        paths.add(">".join(rng.choice(_SEGMENTS) for _ in range(rng.randint(1, 5))))
+    return [{"category_id": str(1000 + i), "category_path": p} for i, p in enumerate(sorted(paths))]
+
+
+def _parse_tree(text: str):
+    """렌더링된 트리 → {id: 전체경로} (들여쓰기 2칸 = 한 단계, 'A>B>' 는 합쳐진 단계)."""
+    out = {}
+    stack = []
+    for line in text.splitlines():
+        m = _LINE_RE.match(line)
+        depth = len(m.group(1)) // 2
+        label = m.group(2)
+        if label.endswith(">"):
+            label = label[:-1]
+        path = f"{stack[depth - 1]}>{label}" if depth else label
+        del stack[depth:]
+        stack.append(path)
+        for cid in (m.group(3) or "").split(", "):
+            if cid:
+                out[cid] = path
+    return out
+
+
+def test_tree_round_trip_is_lossless():
+    rng = random.Random(31)
+    for _ in range(100):
+        cands = _random_candidates(rng, rng.randint(1, 25))
+        rng.shuffle(cands)
+        text = render_candidate_tree(cands)
+        assert _parse_tree(text) == {c["category_id"]: c["category_path"] for c in cands}
+
+
+def test_tree_is_shorter_than_flat_list():
+    cands = [
+        {"category_id": str(i), "category_path": f"주방용품>취사도구>냄비>{leaf}"}
+        for i, leaf in enumerate(["편수냄비", "양수냄비", "곰솥", "찜기"])
+    ]
+    flat = "\n".join(f"- {c['category_id']}: {c['category_path']}" for c in cands)
+    assert estimate_tokens(render_candidate_tree(cands)) < estimate_tokens(flat)
+
+
+def test_budget_keeps_largest_top_k_in_original_order():
+    rng = random.Random(37)
+    for _ in range(40):
+        cands = _random_candidates(rng, rng.randint(2, 30))
+        keywords = [rng.choice(_SEGMENTS)]
+        full_tokens = estimate_tokens(render_candidate_tree(cands))
+        budget = rng.randint(1, full_tokens)
+
+        block = build_candidate_block(cands, keywords, token_budget=budget)
+        assert block.total == len(cands)
+
+        scores = lexical_scores([c["category_path"] for c in cands], keywords)
+        ranked = sorted(range(len(cands)), key=lambda i: -scores[i])
+
+        def _top(k):
+            return [cands[i] for i in sorted(ranked[:k])]
+
+        fits = [k for k in range(1, len(cands) + 1) if estimate_tokens(render_candidate_tree(_top(k))) <= budget]
+        expected_k = max(fits) if fits else 1
+        assert block.candidates == _top(expected_k)
+        assert block.est_tokens == estimate_tokens(block.text)
+        assert block.by_id == {c["category_id"]: c["category_path"] for c in block.candidates}
+        if expected_k < len(cands):
+            assert block.trimmed
+
+
+def test_within_budget_is_untouched():
+    cands = _random_candidates(random.Random(41), 10)
+    block = build_candidate_block(cands, ["냄비"], token_budget=10_000)
+    assert not block.trimmed
+    assert block.candidates == cands
+    assert block.text == render_candidate_tree(cands)
@@ -0,0 +1,178 @@
+# cellon/core/test/test_rule_index.py
+"""
+rule_index 의 오토마타 / 컴파일된 meta·strong·group 점수 조회가
+기존 "룰 전체 순회" 방식과 같은 결과를 내는지 확인.
+
+실행: src 에서 `python -m pytest cellon/core/test`
+"""
+
+from __future__ import annotations
+
+import random
+from collections import Counter
+
+from cellon.core.rule_index import (
+    SOURCE_PATH_FIELDS,
+    GroupRuleIndex,
+    KeywordAutomaton,
+    MetaRuleIndex,
+)
+
+
+_ALPHABET = "냄비팬솥칼도마ab"
+
+
+def _rand_word(rng: random.Random, lo: int = 1, hi: int = 3) -> str:
+    return "".join(rng.choice(_ALPHABET) for _ in range(rng.randint(lo, hi)))
+
+
+def _naive_counts(text: str, patterns) -> Counter:
+    """겹치는 등장까지 모두 센 패턴별 횟수."""
+    hits: Counter = Counter()
+    for p in set(patterns):
+        if not p:
+            continue
+        n = sum(1 for i in range(len(text) - len(p) + 1) if text.startswith(p, i))
+        if n:
+            hits[p] = n
+    return hits
+
+
+# ---------- 기존 CategoryMatcher._infer_meta_key 루프 (비교 기준) ----------
+def _old_match_path(meta_rules: dict, source: str, path: str):
+    for meta_key, rule in meta_rules.items():
+        field = SOURCE_PATH_FIELDS.get(source)
+        paths = rule.get(field, []) if field else []
+        for p in paths:
+            if path == p:
+                return meta_key
+    return None
+
+
+def _old_match_keywords(meta_rules: dict, name_lower: str):
+    for meta_key, rule in meta_rules.items():
+        inc = rule.get("keywords_include", []) or []
+        exc = rule.get("keywords_exclude", []) or []
+        if not inc:
+            continue
+        if any(k in name_lower for k in inc) and not any(k in name_lower for k in exc):
+            return meta_key
+    return None
+
+
+# ---------- 기존 _pick_by_strong_keyword / _score_group 루프 (비교 기준) ----------
+def _old_strong(coupang_rules: dict, name_lower: str):
+    out = []
+    for rule in coupang_rules.get("__strong_name_rules__", []) or []:
+        target_id = str(rule.get("target_category_id") or "").strip()
+        if not target_id:
+            continue
+        if any(kw.lower() in name_lower for kw in rule.get("keywords") or []):
+            out.append((target_id, rule))
+    return out
+
+
+def _old_group_score(meta_rules: dict, source: str, path: str, name_l: str) -> float:
+    score = 0.0
+    field = SOURCE_PATH_FIELDS.get(source)
+    for rule in meta_rules.values():
+        paths = (rule.get(field, []) or []) if field else []
+        if path and path in paths:
+            score += 100.0
+    for rule in meta_rules.values():
+        inc = [str(x).lower() for x in (rule.get("keywords_include") or [])]
+        exc = [str(x).lower() for x in (rule.get("keywords_exclude") or [])]
+        score += sum(1 for k in inc if k and (k in name_l)) * 6.0
+        score += sum(1 for k in inc if k and (k in path.lower())) * 4.0
+        score -= sum(1 for k in exc if k and (k in name_l)) * 15.0
+    return score
+
+
+def _new_group_score(idx: GroupRuleIndex, source: str, path: str, name_l: str) -> float:
+    hit_inc, hit_path, hit_exc = idx.keyword_hit_counts(idx.scan(name_l), idx.scan_path(path.lower()))
+    return idx.path_score_count(source, path) * 100.0 + hit_inc * 6.0 + hit_path * 4.0 - hit_exc * 15.0
+
+
+def _random_meta_rules(rng: random.Random, n_rules: int = 40) -> dict:
+    rules = {}
+    for i in range(n_rules):
+        rule = {
+            "keywords_include": [_rand_word(rng) for _ in range(rng.randint(0, 3))],
+            "keywords_exclude": [_rand_word(rng) for _ in range(rng.randint(0, 2))],
+        }
+        if rng.random() < 0.05:
+            rule["keywords_include"].append("")  # 빈 키워드 = 항상 포함
+        if rng.random() < 0.05:
+            rule["keywords_exclude"].append("")
+        for field in SOURCE_PATH_FIELDS.values():
+            rule[field] = [f"A>{_rand_word(rng, 1, 2)}" for _ in range(rng.randint(0, 2))]
+        if rng.random() < 0.3:
+            rule["keywords_include"] = [k.upper() for k in rule["keywords_include"]]
+        rules[f"meta_{i}"] = rule
+    return rules
+
+
+def test_automaton_counts_match_naive_scan():
+    rng = random.Random(7)
+    for _ in range(200):
+        patterns = [_rand_word(rng) for _ in range(rng.randint(0, 12))] + [""]
+        text = _rand_word(rng, 0, 30)
+        assert KeywordAutomaton(patterns).scan(text) == _naive_counts(text, patterns)
+
+
+def test_automaton_overlapping_and_suffix_patterns():
+    ac = KeywordAutomaton(["aa", "a", "양수냄비", "냄비", "비"])
+    assert ac.scan("aaa") == Counter({"a": 3, "aa": 2})
+    assert ac.scan("스텐 양수냄비") == Counter({"양수냄비": 1, "냄비": 1, "비": 1})
+    assert ac.scan("") == Counter()
+
+
+def test_meta_index_matches_old_loops():
+    rng = random.Random(11)
+    for _ in range(30):
+        meta_rules = _random_meta_rules(rng)
+        idx = MetaRuleIndex.from_rules(meta_rules)
+        for _ in range(50):
+            name = _rand_word(rng, 0, 12)
+            assert idx.match_keywords(name) == _old_match_keywords(meta_rules, name), name
+            source = rng.choice(list(SOURCE_PATH_FIELDS) + ["unknown"])
+            path = f"A>{_rand_word(rng, 1, 2)}"
+            assert idx.match_path(source, path) == _old_match_path(meta_rules, source, path)
+
+
+def test_meta_index_first_rule_wins():
+    meta_rules = {
+        "pot": {"keywords_include": ["냄비"], "source_costco_paths": ["주방>냄비"]},
+        "pot2": {"keywords_include": ["냄비"], "source_costco_paths": ["주방>냄비"]},
+        "pan": {"keywords_include": ["팬"], "keywords_exclude": ["냄비"]},
+    }
+    idx = MetaRuleIndex.from_rules(meta_rules)
+    assert idx.match_path("costco", "주방>냄비") == "pot"
+    assert idx.match_keywords("냄비 팬 세트") == "pot"
+    assert idx.match_keywords("프라이팬") == "pan"
+    assert idx.match_keywords("도마") is None
+
+
+def test_group_index_matches_old_strong_and_score_loops():
+    rng = random.Random(23)
+    for _ in range(20):
+        meta_rules = _random_meta_rules(rng)
+        strong = [
+            {
+                "target_category_id": rng.choice(["", "100", "200", "300"]),
+                "keywords": [_rand_word(rng) for _ in range(rng.randint(0, 3))]
+                + ([""] if rng.random() < 0.05 else []),
+            }
+            for _ in range(15)
+        ]
+        coupang_rules = {"__strong_name_rules__": strong}
+        idx = GroupRuleIndex(meta_rules, coupang_rules)
+        for _ in range(40):
+            name = _rand_word(rng, 0, 12).lower()
+            hits = idx.scan(name)
+            assert idx.match_meta_keywords(hits) == _old_match_keywords(meta_rules, name)
+            assert idx.match_strong(hits) == _old_strong(coupang_rules, name)
+
+            source = rng.choice(list(SOURCE_PATH_FIELDS))
+            path = rng.choice(["", f"A>{_rand_word(rng, 1, 2)}"])
+            assert _new_group_score(idx, source, path, name) == _old_group_score(meta_rules, source, path, name)
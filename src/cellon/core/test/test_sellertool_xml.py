@@ -0,0 +1,163 @@
+# cellon/core/test/test_sellertool_xml.py
+"""
+sellertool_xml 확인.
+- extend_sqref : 늘린 sqref 가 "원래 범위 + dst 행의 같은 열" 을 정확히 덮는지
+- XmlSheetWriter : 작게 만든 템플릿에 openpyxl 엔진 / xml 엔진으로 같은 행들을 쓰고
+  openpyxl 로 다시 읽어서 값 / 스타일 / 행 높이 / 데이터 유효성 / vba 파트가 같은지
+
+실행: src 에서 `python -m pytest cellon/core/test`
+"""
+
+from __future__ import annotations
+
+import random
+import shutil
+import warnings
+import zipfile
+
+import pytest
+from openpyxl import Workbook, load_workbook
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.cell_range import CellRange
+from openpyxl.worksheet.datavalidation import DataValidation
+
+from cellon.sellertool_excel import SellertoolWriterSession, detect_separator_row
+from cellon.sellertool_xml import extend_sqref
+
+
+_ROWS = 60   # 덮는 셀 비교 범위 (행)
+_COLS = 12   # 덮는 셀 비교 범위 (열)
+
+
+# ---------- extend_sqref ----------
+def _cells(sqref: str) -> set:
+    out = set()
+    for tok in sqref.split():
+        rng = CellRange(tok)
+        for r in range(rng.min_row, min(rng.max_row, _ROWS) + 1):
+            for c in range(rng.min_col, min(rng.max_col, _COLS) + 1):
+                out.add((r, c))
+    return out
+
+
+def _random_sqref(rng: random.Random) -> str:
+    toks = []
+    for _ in range(rng.randint(1, 4)):
+        c1 = rng.randint(1, 8)
+        c2 = c1 + rng.randint(0, 2)
+        r1 = rng.randint(1, 30)
+        r2 = r1 + rng.randint(0, 10)
+        cell = f"{get_column_letter(c1)}{r1}"
+        toks.append(cell if (c1, r1) == (c2, r2) else f"{cell}:{get_column_letter(c2)}{r2}")
+    return " ".join(toks)
+
+
+def test_extend_sqref_cases():
+    assert extend_sqref("J5:K400", 10, [401]) == "J5:K401"
+    assert extend_sqref("J5:K400", 10, [401, 402, 403]) == "J5:K403"
+    assert extend_sqref("J5:K400", 10, [200]) == "J5:K400"        # 이미 포함
+    assert extend_sqref("J5:K400", 500, [501]) == "J5:K400"       # src 행에 안 걸림
+    assert extend_sqref("M7", 7, [9]) == "M7 M9"
+    assert extend_sqref("5:5 J5:J6", 5, [7]) == "5:5 J5:J7"        # 행 전체 범위는 그대로
+
+
+def test_extend_sqref_covers_exactly_src_columns_on_dst_rows():
+    rng = random.Random(53)
+    for _ in range(500):
+        sqref = _random_sqref(rng)
+        src = rng.randint(1, 40)
+        dst_rows = sorted(rng.sample(range(20, _ROWS + 1), rng.randint(1, 4)))
+
+        before = _cells(sqref)
+        spans = [CellRange(t) for t in sqref.split()]
+        src_cols = {
+            c for t in spans if t.min_row <= src <= t.max_row for c in range(t.min_col, t.max_col + 1)
+        }
+        expected = before | {(r, c) for r in dst_rows for c in src_cols}
+
+        out = extend_sqref(sqref, src, dst_rows)
+        assert _cells(out) == expected, (sqref, src, dst_rows, out)
+
+
+# ---------- XmlSheetWriter vs openpyxl ----------
+def _make_template(path, *, n_rows: int, with_separator: bool) -> None:
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "data"
+    wb.create_sheet("other")["A1"] = "x"
+    for c in range(1, 100):
+        ws.cell(row=2, column=c).value = f"H{c}"
+    bold = Font(bold=True)
+    for r in range(5, n_rows):
+        ws.cell(row=r, column=1).value = f"[{r % 7}] 주방용품>취사도구>냄비 & <특가>"
+        ws.cell(row=r, column=89).value = "기타 재화" if r % 3 == 0 else "주방용품"
+        for c in range(4, 40, 7):
+            ws.cell(row=r, column=c).value = f"v{c}"
+            ws.cell(row=r, column=c).font = bold
+        ws.cell(row=r, column=42).value = r * 10
+        ws.row_dimensions[r].height = 22
+    if with_separator:
+        ws.cell(row=n_rows + 1, column=1).value = "------ 여기서부터 크롤링 데이터 등록 ------"
+    dv = DataValidation(type="list", formula1='"a,b,c"')
+    dv.add(f"J5:K{n_rows - 1}")
+    dv.add("M7")
+    ws.add_data_validation(dv)
+    wb.save(path)
+    with zipfile.ZipFile(path, "a") as zf:
+        zf.writestr("xl/vbaProject.bin", bytes(range(256)) * 8)
+
+
+def _write_rows(path, engine: str, journal_dir, n: int) -> list[int]:
+    session = SellertoolWriterSession(flush_every=4, journal_dir=journal_dir, engine=engine)
+    with session:
+        return [
+            session.append_row(
+                path, product_name=f"상품 {i} <&>", price=12345 + i, coupang_category_id=str(i % 7)
+            )
+            for i in range(n)
+        ]
+
+
+def _dv_covers(ws, row: int, col: int) -> bool:
+    return any(
+        rng.min_row <= row <= rng.max_row and rng.min_col <= col <= rng.max_col
+        for dv in ws.data_validations.dataValidation
+        for rng in dv.sqref.ranges
+    )
+
+
+@pytest.mark.parametrize("with_separator", [False, True])
+def test_xml_writer_matches_openpyxl(tmp_path, with_separator):
+    warnings.simplefilter("ignore")
+    src = tmp_path / f"sellertool_upload_99-{int(with_separator)}_테스트>라운드트립.xlsm"
+    _make_template(src, n_rows=40, with_separator=with_separator)
+
+    written = {}
+    for engine in ("openpyxl", "xml"):
+        dest = tmp_path / engine / src.name
+        dest.parent.mkdir()
+        shutil.copy2(src, dest)
+        written[engine] = (dest, _write_rows(dest, engine, tmp_path / f"journal_{engine}", 10))
+
+    (p1, rows1), (p2, rows2) = written["openpyxl"], written["xml"]
+    assert rows1 == rows2
+    ws1 = load_workbook(p1)["data"]
+    ws2 = load_workbook(p2)["data"]
+
+    sep = detect_separator_row(ws1)
+    assert sep is not None and sep == detect_separator_row(ws2)
+    for r in [sep] + rows1:
+        assert [c.value for c in ws1[r]][:100] == [c.value for c in ws2[r]][:100], r
+        assert ws1.cell(row=r, column=4).font.b == ws2.cell(row=r, column=4).font.b
+        assert ws1.row_dimensions[r].height == ws2.row_dimensions[r].height
+        for col in (10, 11):
+            assert _dv_covers(ws2, r, col) == _dv_covers(ws1, r, col), (r, col)
+
+    with zipfile.ZipFile(src) as a, zipfile.ZipFile(p2) as b:
+        assert a.read("xl/vbaProject.bin") == b.read("xl/vbaProject.bin")
+
+    # 두 번째 세션 (구분자가 이미 있는 파일) 에서도 다음 행에 이어서 쓴다
+    more = _write_rows(p2, "xml", tmp_path / "journal_xml2", 1)
+    assert more == [rows2[-1] + 1]
+    assert load_workbook(p2)["data"].cell(row=more[0], column=2).value == "상품 0 <&>"
@@ -0,0 +1,193 @@
+# cellon/core/test/test_sheet_layout.py
+"""
+SheetLayout(A/B/C/CK열 1회 스캔 인덱스)과 select_template_source_row 가
+기존의 "호출마다 A열/CK열을 다시 훑는" 함수들과 같은 행을 고르는지 확인.
+(메모리 상의 openpyxl Workbook 으로 랜덤 시트를 만들어 비교)
+
+실행: src 에서 `python -m pytest cellon/core/test`
+"""
+
+from __future__ import annotations
+
+import random
+
+from openpyxl import Workbook
+
+from cellon.sellertool_excel import (
+    SheetLayout,
+    find_next_input_row,
+    find_separator_row,
+    get_sheet_layout,
+    get_template_source_max_row,
+    invalidate_sheet_layout,
+    select_template_source_row,
+)
+
+
+_KEYWORD = "여기서부터"
+_CK = ["기타 재화", " 기타재화 ", "식품", None, None]
+_IDS = ["100", "200", "300", "4000"]
+
+
+# ---------- 기존 구현 (비교 기준) ----------
+def _old_a(ws, r):
+    return ws[f"A{r}"].value
+
+
+def _old_detect_separator(ws, scan_limit=5000):
+    for r in range(1, min(ws.max_row, scan_limit) + 1):
+        v = _old_a(ws, r)
+        if isinstance(v, str) and _KEYWORD in v:
+            return r
+    return None
+
+
+def _old_infer_max_row(ws, scan_limit=50000, blank_run_stop=200):
+    upper = min(ws.max_row if ws.max_row > 0 else scan_limit, scan_limit)
+    last_id_row, seen_any, blank_run = 0, False, 0
+    for r in range(1, upper + 1):
+        v = _old_a(ws, r)
+        s = v.strip() if isinstance(v, str) else ""
+        if any(ch.isdigit() for ch in s) and "[" in s and _has_id_token(s):
+            last_id_row, seen_any, blank_run = r, True, 0
+            continue
+        if seen_any and s == "":
+            blank_run += 1
+            if blank_run >= blank_run_stop:
+                break
+        elif seen_any:
+            blank_run = 0
+    return last_id_row if last_id_row > 0 else min(upper, 1000)
+
+
+def _has_id_token(s):
+    i = s.find("[")
+    while i >= 0:
+        j = s.find("]", i)
+        if j > i + 1 and s[i + 1:j].isdigit():
+            return True
+        i = s.find("[", i + 1)
+    return False
+
+
+def _old_template_max_row(ws):
+    sep = _old_detect_separator(ws)
+    if sep is not None and sep > 1:
+        return sep - 1
+    return _old_infer_max_row(ws)
+
+
+def _old_find_template_source_row(ws, category_id, category_path, ck_candidates=("기타 재화", "기타재화")):
+    upper = max(1, _old_template_max_row(ws))
+    if category_id:
+        token = f"[{category_id}]"
+        id_rows = [r for r in range(1, upper + 1) if isinstance(_old_a(ws, r), str) and token in _old_a(ws, r)]
+        if id_rows:
+            for r in reversed(id_rows):
+                ck = ws[f"CK{r}"].value
+                if isinstance(ck, str) and ck.strip() in ck_candidates:
+                    return r
+            return id_rows[-1]
+    if category_path:
+        rows = [r for r in range(1, upper + 1) if isinstance(_old_a(ws, r), str) and category_path in _old_a(ws, r)]
+        if rows:
+            return rows[-1]
+    ck_rows = [
+        r for r in range(1, upper + 1)
+        if isinstance(ws[f"CK{r}"].value, str) and ws[f"CK{r}"].value.strip() in ck_candidates
+    ]
+    if ck_rows:
+        return ck_rows[-1]
+    return upper
+
+
+def _old_next_input_row(ws, start_row):
+    r = start_row
+    while True:
+        vals = [ws.cell(row=r, column=c).value for c in (1, 2, 3)]
+        if sum(1 for v in vals if v is None or str(v).strip() == "") >= 2:
+            return r
+        r += 1
+
+
+def _old_separator_insert_row(ws):
+    for r in range(ws.max_row, 0, -1):
+        v = _old_a(ws, r)
+        if v is not None and str(v).strip() != "":
+            return r + 1
+    return 2
+
+
+# ---------- 랜덤 시트 ----------
+def _random_sheet(rng: random.Random):
+    wb = Workbook()
+    ws = wb.active
+    n_template = rng.randint(0, 40)
+    for r in range(1, n_template + 1):
+        kind = rng.random()
+        if kind < 0.6:
+            ws.cell(row=r, column=1).value = f"[{rng.choice(_IDS)}] 주방용품>냄비>{rng.choice('ABC')}"
+        elif kind < 0.7:
+            ws.cell(row=r, column=1).value = "설명 행"
+        elif kind < 0.75:
+            ws.cell(row=r, column=1).value = rng.randint(1, 9)  # 문자열이 아닌 A열
+        ck = rng.choice(_CK)
+        if ck is not None:
+            ws.cell(row=r, column=89).value = ck
+        if rng.random() < 0.5:
+            ws.cell(row=r, column=2).value = "b"
+        if rng.random() < 0.3:
+            ws.cell(row=r, column=3).value = " "
+
+    if rng.random() < 0.5:
+        sep = n_template + rng.randint(1, 3)
+        ws.cell(row=sep, column=1).value = f"---- {_KEYWORD} 크롤링 데이터 ----"
+        for r in range(sep + 1, sep + rng.randint(0, 10)):
+            ws.cell(row=r, column=1).value = f"상품 {r}"
+            if rng.random() < 0.7:
+                ws.cell(row=r, column=2).value = 1000
+    return wb, ws
+
+
+def test_layout_selection_matches_old_scans():
+    rng = random.Random(43)
+    for _ in range(150):
+        _wb, ws = _random_sheet(rng)
+        layout = SheetLayout.build(ws, keyword=_KEYWORD)
+
+        assert layout.sep_row == _old_detect_separator(ws)
+        assert layout.template_source_max_row == _old_template_max_row(ws)
+        assert get_template_source_max_row(ws) == _old_template_max_row(ws)
+
+        for cid in _IDS + ["999", None]:
+            for path in (None, "냄비>A", "없는경로"):
+                assert select_template_source_row(
+                    layout, coupang_category_id=cid, coupang_category_path=path
+                ) == _old_find_template_source_row(ws, cid, path), (cid, path)
+
+        for start in (1, 5, layout.template_source_max_row + 1):
+            assert find_next_input_row(ws, start) == _old_next_input_row(ws, start)
+
+
+def test_separator_insert_and_incremental_update():
+    rng = random.Random(47)
+    for _ in range(50):
+        _wb, ws = _random_sheet(rng)
+        expected_sep = _old_detect_separator(ws) or _old_separator_insert_row(ws)
+        assert find_separator_row(ws, keyword=_KEYWORD) == expected_sep
+
+        # 헬퍼로 몇 행 쓰고 나면 인덱스가 다시 스캔한 것과 같아야 한다
+        layout = get_sheet_layout(ws, keyword=_KEYWORD)
+        for _ in range(3):
+            row = layout.next_free_row_from(expected_sep + 1)
+            for col, value in ((1, f"상품 {row}"), (2, 1000), (3, "[100] 주방용품")):
+                ws.cell(row=row, column=col).value = value
+            layout.refresh_row(ws, row)
+
+        invalidate_sheet_layout(ws)
+        fresh = get_sheet_layout(ws, keyword=_KEYWORD)
+        assert fresh is not layout
+        assert fresh.sep_row == layout.sep_row
+        assert fresh.filled_rows == layout.filled_rows
+        assert fresh.last_a_row == layout.last_a_row
+        assert fresh.template_source_max_row == layout.template_source_max_row
@@ -0,0 +1,96 @@
+# cellon/core/test/test_template_meta.py
+"""
+인덱스 메타(scan_template_meta)로 만든 partial 레이아웃이 전체 스캔 레이아웃과 같은
+template source 행을 고르는지, 메타 일치 판정이 행을 쓴 뒤에도 유지되는지 확인.
+
+실행: src 에서 `python -m pytest cellon/core/test`
+"""
+
+from __future__ import annotations
+
+import random
+import warnings
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from cellon.sellertool_excel import (
+    SheetLayout,
+    find_separator_row,
+    scan_template_meta,
+    seed_sheet_layout,
+    select_template_source_row,
+)
+
+
+_IDS = ["100", "200", "300"]
+
+
+def _make_template(path, rng: random.Random, *, with_separator: bool) -> None:
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "data"
+    ws.cell(row=2, column=1).value = "카테고리"
+    ws.cell(row=2, column=2).value = "상품명"
+    n_rows = rng.randint(6, 40)
+    for r in range(5, n_rows):
+        if rng.random() < 0.8:
+            ws.cell(row=r, column=1).value = f"[{rng.choice(_IDS)}] 주방용품>냄비"
+        else:
+            ws.cell(row=r, column=1).value = "설명 행"
+        if rng.random() < 0.4:
+            ws.cell(row=r, column=89).value = rng.choice(["기타 재화", "식품"])
+    ws.cell(row=5, column=1).value = f"[{_IDS[0]}] 주방용품>냄비"   # id 행이 최소 1개는 있도록
+    if with_separator:
+        ws.cell(row=n_rows + rng.randint(0, 2), column=1).value = "---- 여기서부터 크롤링 데이터 ----"
+    wb.save(path)
+
+
+@pytest.mark.parametrize("with_separator", [False, True])
+def test_meta_layout_selects_same_rows_as_full_scan(tmp_path, with_separator):
+    warnings.simplefilter("ignore")
+    rng = random.Random(61 + with_separator)
+    for i in range(20):
+        path = tmp_path / f"template_{i}.xlsm"
+        _make_template(path, rng, with_separator=with_separator)
+        meta = scan_template_meta(path)
+
+        ws = load_workbook(path)["data"]
+        # write 때처럼 구분자를 먼저 확보한 뒤 (없으면 A열 마지막 값 아래에 삽입) 비교
+        sep = find_separator_row(ws)
+        for r in range(sep + 1, sep + 4):
+            ws.cell(row=r, column=1).value = f"상품 {r}"
+            ws.cell(row=r, column=2).value = 1000
+
+        full = SheetLayout.build(ws)
+        seeded = seed_sheet_layout(ws, meta)
+        assert seeded is not None and seeded.partial_template
+        assert seeded.sep_row == full.sep_row
+        assert seeded.template_source_max_row == full.template_source_max_row
+        assert seeded.next_free_row_from(sep + 1) == full.next_free_row_from(sep + 1)
+
+        for cid in _IDS:
+            if not seeded.covers_template_lookup(cid):
+                assert cid not in meta["id_source_rows"]
+                continue
+            assert select_template_source_row(seeded, coupang_category_id=cid) == select_template_source_row(
+                full, coupang_category_id=cid
+            ), cid
+
+
+def test_meta_rejected_when_template_rows_change(tmp_path):
+    warnings.simplefilter("ignore")
+    path = tmp_path / "template.xlsm"
+    _make_template(path, random.Random(67), with_separator=True)
+    meta = scan_template_meta(path)
+
+    ws = load_workbook(path)["data"]
+    assert seed_sheet_layout(ws, meta) is not None
+
+    first_row = min(int(r) for r in meta["id_source_rows"].values())
+    ws.cell(row=first_row, column=1).value = "바뀐 템플릿 행"
+    assert seed_sheet_layout(ws, meta) is None
+
+    ws = load_workbook(path)["data"]
+    ws.cell(row=meta["separator_row"], column=1).value = None
+    assert seed_sheet_layout(ws, meta) is None
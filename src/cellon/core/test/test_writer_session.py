@@ -0,0 +1,199 @@
+# cellon/core/test/test_writer_session.py
+"""
+SellertoolWriterSession 저널 확인 (openpyxl / xml 엔진 모두).
+- 저장 전 크래시 → 다음 세션이 저널에서 행을 복구
+- 저장 후 저널 삭제 전 크래시 → 이미 저장된 행은 건너뜀 (has_product)
+- 저널 재실행 / 행 쓰기 실패 → 열어 둔 workbook 을 버리고 저널은 유지
+- 중간 저장 실패 → 행 번호는 그대로 반환, 다음 저장 때 기록
+
+실행: src 에서 `python -m pytest cellon/core/test`
+"""
+
+from __future__ import annotations
+
+import warnings
+
+import pytest
+from openpyxl import Workbook, load_workbook
+
+from cellon import sellertool_excel
+from cellon.sellertool_excel import SellertoolWriterSession
+
+
+ENGINES = ["openpyxl", "xml"]
+
+
+@pytest.fixture(autouse=True)
+def _quiet():
+    warnings.simplefilter("ignore")
+
+
+def _make_template(path) -> None:
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "data"
+    for r in range(5, 15):
+        ws.cell(row=r, column=1).value = f"[{r % 3}] 주방용품>냄비"
+    wb.save(path)
+
+
+def _session(tmp_path, engine: str, **kwargs) -> SellertoolWriterSession:
+    kwargs.setdefault("flush_every", 100)
+    kwargs.setdefault("flush_interval_sec", 3600)
+    return SellertoolWriterSession(journal_dir=tmp_path / "journal", engine=engine, **kwargs)
+
+
+def _append(session, path, names) -> list[int]:
+    return [session.append_row(path, product_name=n, price=1000, coupang_category_id="1") for n in names]
+
+
+def _crash(session) -> None:
+    """저장 없이 workbook 만 닫고 세션을 버린다 (프로세스가 죽은 것과 같음)."""
+    for book in session._books.values():
+        book.writer.close()
+    session._books.clear()
+
+
+def _names_at(path, rows) -> list:
+    ws = load_workbook(path)["data"]
+    return [ws.cell(row=r, column=2).value for r in rows]
+
+
+def _journal(session, path):
+    return session._journal_path(path)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_crash_before_save_is_replayed(tmp_path, engine):
+    path = tmp_path / "upload.xlsm"
+    _make_template(path)
+
+    s1 = _session(tmp_path, engine)
+    rows = _append(s1, path, ["a", "b", "c"])
+    _crash(s1)
+    assert _names_at(path, rows) == [None, None, None]
+    assert _journal(s1, path).exists()
+
+    s2 = _session(tmp_path, engine)
+    more = _append(s2, path, ["d"])
+    s2.close()
+
+    assert more == [rows[-1] + 1]
+    assert _names_at(path, rows + more) == ["a", "b", "c", "d"]
+    assert not _journal(s2, path).exists()
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_crash_after_save_skips_saved_rows(tmp_path, engine):
+    path = tmp_path / "upload.xlsm"
+    _make_template(path)
+
+    s1 = _session(tmp_path, engine)
+    rows = _append(s1, path, ["a", "b"])
+    for book in s1._books.values():
+        book.writer.save()          # 저장은 됐지만 저널을 지우기 전에 죽음
+    _crash(s1)
+    assert _journal(s1, path).exists()
+
+    s2 = _session(tmp_path, engine)
+    more = _append(s2, path, ["c"])
+    s2.close()
+
+    assert more == [rows[-1] + 1]
+    assert _names_at(path, rows + more) == ["a", "b", "c"]
+    assert _names_at(path, [more[0] + 1]) == [None]  # 중복 행 없음
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_failed_replay_discards_book_and_keeps_journal(tmp_path, engine, monkeypatch):
+    path = tmp_path / "upload.xlsm"
+    _make_template(path)
+
+    s1 = _session(tmp_path, engine)
+    rows = _append(s1, path, ["a", "b", "c"])
+    _crash(s1)
+    journal_text = _journal(s1, path).read_text(encoding="utf-8")
+
+    real_open = sellertool_excel._open_row_writer
+
+    def failing_open(p, eng):
+        writer = real_open(p, eng)
+        real_append = writer.append
+        calls = {"n": 0}
+
+        def append(**kwargs):
+            calls["n"] += 1
+            if calls["n"] == 2:
+                raise RuntimeError("replay boom")
+            return real_append(**kwargs)
+
+        writer.append = append
+        return writer
+
+    s2 = _session(tmp_path, engine)
+    monkeypatch.setattr(sellertool_excel, "_open_row_writer", failing_open)
+    with pytest.raises(RuntimeError, match="replay boom"):
+        _append(s2, path, ["d"])
+    assert s2._books == {}
+    assert _journal(s2, path).read_text(encoding="utf-8") == journal_text
+    assert _names_at(path, rows) == [None, None, None]
+
+    # 다음 시도는 저널 전체를 다시 재실행
+    monkeypatch.setattr(sellertool_excel, "_open_row_writer", real_open)
+    more = _append(s2, path, ["d"])
+    s2.close()
+    assert _names_at(path, rows + more) == ["a", "b", "c", "d"]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_failed_row_write_discards_book(tmp_path, engine):
+    path = tmp_path / "upload.xlsm"
+    _make_template(path)
+
+    s = _session(tmp_path, engine)
+    rows = _append(s, path, ["a"])
+    book = next(iter(s._books.values()))
+    real_append = book.writer.append
+
+    def append(**kwargs):
+        real_append(**kwargs)
+        raise RuntimeError("write boom")     # 행을 쓰다 만 상태
+
+    book.writer.append = append
+    with pytest.raises(RuntimeError, match="write boom"):
+        _append(s, path, ["broken"])
+    assert s._books == {}
+
+    more = _append(s, path, ["b"])
+    s.close()
+    assert more == [rows[-1] + 1]
+    assert _names_at(path, rows + more) == ["a", "b"]
+    assert _names_at(path, [more[0] + 1]) == [None]
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_failed_flush_still_returns_row(tmp_path, engine):
+    path = tmp_path / "upload.xlsm"
+    _make_template(path)
+
+    s = _session(tmp_path, engine, flush_every=1)
+    rows = _append(s, path, ["a"])
+    book = next(iter(s._books.values()))
+    real_save = book.writer.save
+
+    def locked_save():
+        raise PermissionError("file is open in Excel")
+
+    book.writer.save = locked_save
+    more = _append(s, path, ["b", "c"])           # 저장 실패해도 행 번호는 반환
+    assert more == [rows[-1] + 1, rows[-1] + 2]
+    assert book.pending == 2 and book.flush_failed
+    assert _journal(s, path).exists()
+
+    with pytest.raises(PermissionError):
+        s.flush()                                  # 명시적 flush 는 실패를 알린다
+
+    book.writer.save = real_save
+    s.close()
+    assert _names_at(path, rows + more) == ["a", "b", "c"]
+    assert not _journal(s, path).exists()
@@ -12,6 +12,7 @@ from typing import Iterable, Optional
 
 from openpyxl import load_workbook
 from openpyxl.utils import get_column_letter, column_index_from_string
+from openpyxl.worksheet.cell_range import CellRange
 from openpyxl.worksheet.worksheet import Worksheet
 
 from .config import (
@@ -19,18 +20,27 @@ from .config import (
     UPLOAD_READY_DIR,
     SELLERTOOL_SHEET_NAME,
     COUPANG_UPLOAD_INDEX_JSON,
+    SELLERTOOL_FLUSH_EVERY,
+    SELLERTOOL_FLUSH_INTERVAL_SEC,
+    SELLERTOOL_JOURNAL_DIR,
+    SELLERTOOL_WRITE_ENGINE,
 )
 from .core.product import Product
 
 from openpyxl import load_workbook
 from openpyxl.workbook.workbook import Workbook
-from typing import Dict, Tuple
 
 from copy import copy
 from openpyxl.worksheet.worksheet import Worksheet
 
+import os
+import threading
+import time
+import weakref
 import zipfile
-from typing import Iterable, Optional
+from bisect import bisect_left, bisect_right, insort
+from itertools import chain, repeat
+from typing import Callable, Iterable, Optional
 
 # ===============================
 # 템플릿 파일명 접두어(prefix) 추출 + 이미지명 생성
@@ -42,10 +52,6 @@ from pathlib import Path
 _PREFIX_RE = re.compile(r"^sellertool_upload_(?P<prefix>\d{1,3}-\d{1,3})_", re.IGNORECASE)
 
 
-
-_WB_CACHE: Dict[str, Tuple[Workbook, float]] = {}
-# key: str(dest_path), value: (workbook, last_mtime)
-
 # ===============================
 # 입력 행 판별 (A/B/C 기준)
 # ===============================
@@ -74,9 +80,9 @@ def is_empty_row_abc(ws, row: int) -> bool:
 
 
 def find_next_input_row(ws, start_row: int, max_scan: int = 5000) -> int:
-    for r in range(start_row, start_row + max_scan):
-        if is_empty_row_abc(ws, r):
-            return r
+    r = get_sheet_layout(ws).next_free_row_from(start_row)
+    if r < start_row + max_scan:
+        return r
     raise RuntimeError("ABC 기준 입력 가능한 빈 행을 찾지 못했습니다.")
 
 # --- prefix 로 upload ready 에 들어갈 xlsm file 의 번호 관련 코드 ----
@@ -116,39 +122,10 @@ def find_separator_row(ws, keyword="여기서부터", max_scan: int = 5000) -> i
     이유:
     - 템플릿마다 구분자 존재 여부가 다름
     - 최초 기록 시 구분자가 없는 경우가 흔함
-    """
-    # 1) 기존 구분자 탐색 (A열)
-    for r in range(1, min(ws.max_row, max_scan) + 1):
-        v = ws.cell(row=r, column=1).value
-        if isinstance(v, str) and keyword in v:
-            return r
-
-    # 2) 없으면 자동 삽입: "템플릿 마지막(=A열 값이 있는 마지막 행)" 아래에 삽입
-    last_template_row = 0
-    for r in range(ws.max_row, 0, -1):
-        v = ws.cell(row=r, column=1).value
-        if v is not None and str(v).strip() != "":
-            last_template_row = r
-            break
-
-    # 템플릿이 비어있는 예외 케이스
-    if last_template_row <= 0:
-        last_template_row = 1
-
-    sep_row = last_template_row + 1
-
-    sep_text = "------------------ 여기서부터 크롤링 데이터 등록 ------------------"
-    ws.cell(row=sep_row, column=1).value = sep_text
-
-    # (선택) 구분자 강조(노란색)
-    try:
-        from openpyxl.styles import PatternFill
-        yellow_fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
-        ws.cell(row=sep_row, column=1).fill = yellow_fill
-    except Exception:
-        pass
 
-    return sep_row
+    (A열 재스캔 없이 SheetLayout 인덱스에서 바로 꺼냄)
+    """
+    return get_sheet_layout(ws, keyword=keyword).ensure_separator(ws)
 
 
 
@@ -173,9 +150,34 @@ def find_template_source_row(
        - 없으면 "마지막 id 행" 선택 (식품에서 농수산물=앞, 기타류=뒤 패턴 대응)
     2) (옵션) category_path 포함 행들 중 "마지막 매칭 행" 선택
     3) fallback: CK가 '기타 재화/기타재화'인 행들 중 "마지막" 선택
+
+    A열/CK열 값은 SheetLayout 인덱스(시트당 1회 스캔)에서 조회한다.
     """
+    layout = get_sheet_layout(ws)
+    if not layout.covers_template_lookup(coupang_category_id):
+        layout = get_sheet_layout(ws, refresh=True)
+    return select_template_source_row(
+        layout,
+        coupang_category_id=coupang_category_id,
+        coupang_category_path=coupang_category_path,
+        ck_candidates=ck_candidates,
+        template_source_max_row=template_source_max_row,
+        max_scan=max_scan,
+    )
+
+
+def select_template_source_row(
+    layout: "SheetLayout",
+    *,
+    coupang_category_id: str | None = None,
+    coupang_category_path: str | None = None,
+    ck_candidates=("기타 재화", "기타재화"),
+    template_source_max_row: int | None = None,
+    max_scan: int = 1000,
+) -> int:
+    """find_template_source_row 의 선택 정책을 SheetLayout 에 적용 (openpyxl / XML 쓰기 공용)."""
     if template_source_max_row is None:
-        template_source_max_row = get_template_source_max_row(ws)
+        template_source_max_row = layout.template_source_max_row
 
     # 안전장치: template_source_max_row가 비정상인 경우만 백업 제한
     upper = template_source_max_row if template_source_max_row and template_source_max_row > 0 else max_scan
@@ -186,18 +188,12 @@ def find_template_source_row(
 
     # 1) category_id 우선 (요청 정책 반영)
     if coupang_category_id:
-        token = f"[{coupang_category_id}]"
-        id_rows: list[int] = []
-        for r in range(1, upper + 1):
-            a_val = ws[f"A{r}"].value
-            if isinstance(a_val, str) and token in a_val:
-                id_rows.append(r)
+        id_rows = layout.rows_for_id(coupang_category_id, upper)
 
         if id_rows:
             # CK='기타 재화'가 있으면 우선(보통 뒤쪽에 있어서 reversed 탐색)
             for r in reversed(id_rows):
-                ck_val = ws[f"CK{r}"].value
-                if isinstance(ck_val, str) and ck_val.strip() in ck_candidates:
+                if layout.ck_by_row.get(r) in ck_candidates:
                     return r
 
             # 없으면 "마지막 id 행"
@@ -205,22 +201,14 @@ def find_template_source_row(
 
     # 2) category_path (보조): 여러 개면 "마지막 매칭 행"
     if coupang_category_path:
-        path_rows: list[int] = []
-        for r in range(1, upper + 1):
-            a_val = ws[f"A{r}"].value
-            if isinstance(a_val, str) and coupang_category_path in a_val:
-                path_rows.append(r)
-        if path_rows:
-            return path_rows[-1]
+        for r in range(min(upper, len(layout.a_text)), 0, -1):
+            if coupang_category_path in layout.a_text[r - 1]:
+                return r
 
     # 3) fallback: CK 기준으로 마지막 후보
-    ck_rows: list[int] = []
-    for r in range(1, upper + 1):
-        ck_val = ws[f"CK{r}"].value
-        if isinstance(ck_val, str) and ck_val.strip() in ck_candidates:
-            ck_rows.append(r)
+    ck_rows = [r for r, v in layout.ck_by_row.items() if r <= upper and v in ck_candidates]
     if ck_rows:
-        return ck_rows[-1]
+        return max(ck_rows)
 
     # 진짜 최후: 1행(또는 2행)을 반환하기보다는 upper의 마지막으로(오탐 최소화)
     return upper
@@ -236,33 +224,22 @@ def detect_separator_row(ws, keyword: str = "여기서부터", scan_limit: int =
     - A열에서 keyword 포함 문구를 찾으면 그 행 번호 반환
     - 없으면 None
     """
-    upper = min(getattr(ws, "max_row", scan_limit), scan_limit)
-    for r in range(1, upper + 1):
-        v = ws[f"A{r}"].value
-        if isinstance(v, str) and keyword in v:
-            return r
+    sep = get_sheet_layout(ws, keyword=keyword).sep_row
+    if sep is not None and sep <= scan_limit:
+        return sep
     return None
 
 
-def infer_template_source_max_row(ws, scan_limit: int = 50000, blank_run_stop: int = 200) -> int:
-    """
-    구분자가 없는 '템플릿 소스만 있는 파일'에서,
-    템플릿 소스 영역의 마지막 행을 추정합니다.
-
-    전략:
-    - A열에서 "[숫자]" 토큰이 등장하는 행들을 찾고, 마지막 발견 행을 max_row로 사용
-    - 템플릿이 시작된 이후 A열이 연속으로 blank_run_stop만큼 비면 종료(시트 끝까지 스캔 방지)
-    """
-    max_row = getattr(ws, "max_row", 0) or 0
-    upper = min(max_row if max_row > 0 else scan_limit, scan_limit)
+def _infer_template_source_max_row_from(a_text: list[str], scan_limit: int, blank_run_stop: int) -> int:
+    """infer_template_source_max_row 본체 (A열 값 목록 기준, 시트 접근 없음)"""
+    upper = min(len(a_text) if a_text else scan_limit, scan_limit)
 
     last_id_row = 0
     seen_any = False
     blank_run = 0
 
-    for r in range(1, upper + 1):
-        v = ws[f"A{r}"].value
-        s = v.strip() if isinstance(v, str) else ""
+    for r in range(1, min(upper, len(a_text)) + 1):
+        s = a_text[r - 1].strip()
 
         if _ID_TOKEN_RE.search(s):
             last_id_row = r
@@ -283,16 +260,390 @@ def infer_template_source_max_row(ws, scan_limit: int = 50000, blank_run_stop: i
     return last_id_row if last_id_row > 0 else min(upper, 1000)
 
 
+def infer_template_source_max_row(ws, scan_limit: int = 50000, blank_run_stop: int = 200) -> int:
+    """
+    구분자가 없는 '템플릿 소스만 있는 파일'에서,
+    템플릿 소스 영역의 마지막 행을 추정합니다.
+
+    전략:
+    - A열에서 "[숫자]" 토큰이 등장하는 행들을 찾고, 마지막 발견 행을 max_row로 사용
+    - 템플릿이 시작된 이후 A열이 연속으로 blank_run_stop만큼 비면 종료(시트 끝까지 스캔 방지)
+    """
+    return _infer_template_source_max_row_from(get_sheet_layout(ws).a_text, scan_limit, blank_run_stop)
+
+
 def get_template_source_max_row(ws, *, keyword: str = "여기서부터") -> int:
     """
     ✅ '끝까지 허용'의 끝 = template source 영역의 끝
     - 구분자 있으면: sep_row - 1
     - 구분자 없으면: infer_template_source_max_row()로 마지막 [id] 행까지
     """
-    sep = detect_separator_row(ws, keyword=keyword)
-    if sep is not None and sep > 1:
-        return sep - 1
-    return infer_template_source_max_row(ws)
+    return get_sheet_layout(ws, keyword=keyword).template_source_max_row
+
+
+# ===============================
+# 시트 레이아웃 인덱스 (A/B/C/CK열 1회 스캔)
+# ===============================
+# write 1건마다 구분자 탐색 / template source 탐색 / 빈 행 탐색이 각각 A열을 처음부터 다시 훑던 것을
+# 시트당 한 번의 iter_rows 로 모아 둔다. 이후 write 헬퍼들이 행을 추가할 때마다 인덱스를 같이 갱신한다.
+# ⚠️ 헬퍼(write_coupang_row / safe_set_cell)를 거치지 않고 A/B/C열을 직접 고쳤다면
+#    invalidate_sheet_layout(ws) 로 다시 스캔하게 해야 한다.
+
+_CK_COL = column_index_from_string("CK")
+_SEPARATOR_TEXT = "------------------ 여기서부터 크롤링 데이터 등록 ------------------"
+
+
+def _norm_cell_value(v) -> str:
+    if v is None:
+        return ""
+    if isinstance(v, str):
+        return v.strip()
+    return str(v).strip()
+
+
+@dataclass
+class SheetLayout:
+    keyword: str                                    # 구분자 판별 문구
+    sep_row: Optional[int]                          # 구분자 행 (없으면 None)
+    template_source_max_row: int                    # template source 영역의 끝
+    a_text: list[str]                               # A열 문자열 (r행 → a_text[r-1], 문자열 아닌 셀은 "")
+    id_rows: dict[str, list[int]]                   # "[73134]" 의 73134 → 행 목록(오름차순)
+    ck_by_row: dict[int, str]                       # CK열(상품고시정보 카테고리) 값 (strip, 빈 값 제외)
+    filled_rows: set[int]                           # A/B/C 중 2개 이상 채워진 행 (= 입력 불가 행)
+    last_a_row: int                                 # A열 값이 있는 마지막 행
+    max_col: int                                    # 스캔 시점 ws.max_column (행 복사 폭)
+    partial_template: bool = False                  # True: template source 영역은 인덱스 메타로 채움 (스캔 생략)
+    inferred_template_max: Optional[int] = None     # 메타의 template source 끝 (구분자 없을 때 추정값 대신 사용)
+
+    @classmethod
+    def build(cls, ws, keyword: str = "여기서부터") -> "SheetLayout":
+        n_rows = ws.max_row or 0
+        abc_iter = ws.iter_rows(min_row=1, max_row=n_rows, min_col=1, max_col=3, values_only=True)
+        ck_iter = ws.iter_rows(min_row=1, max_row=n_rows, min_col=_CK_COL, max_col=_CK_COL, values_only=True)
+        values = ((a, b, c, ck) for (a, b, c), (ck,) in zip(abc_iter, ck_iter))
+        return cls.from_values(values, keyword=keyword, max_col=ws.max_column)
+
+    @classmethod
+    def from_values(cls, rows: Iterable[tuple], keyword: str = "여기서부터", max_col: int = 0) -> "SheetLayout":
+        """1행부터 순서대로 (A, B, C, CK) 값 → SheetLayout (openpyxl / xlsm XML 직접 읽기 공용)."""
+        a_text: list[str] = []
+        id_rows: dict[str, list[int]] = {}
+        ck_by_row: dict[int, str] = {}
+        filled_rows: set[int] = set()
+        sep_row: Optional[int] = None
+        last_a_row = 0
+
+        for r, (a, b, c, ck) in enumerate(rows, start=1):
+            a_raw = a if isinstance(a, str) else ""
+            a_text.append(a_raw)
+
+            a_s = _norm_cell_value(a)
+            if a_s:
+                last_a_row = r
+            if sep_row is None and keyword in a_raw:
+                sep_row = r
+
+            for m in _ID_TOKEN_RE.finditer(a_raw):
+                rows_for = id_rows.setdefault(m.group(1), [])
+                if not rows_for or rows_for[-1] != r:
+                    rows_for.append(r)
+
+            empty_cnt = (a_s == "") + (_norm_cell_value(b) == "") + (_norm_cell_value(c) == "")
+            if empty_cnt < 2:
+                filled_rows.add(r)
+
+            if isinstance(ck, str) and ck.strip():
+                ck_by_row[r] = ck.strip()
+
+        layout = cls(
+            keyword=keyword,
+            sep_row=sep_row,
+            template_source_max_row=0,
+            a_text=a_text,
+            id_rows=id_rows,
+            ck_by_row=ck_by_row,
+            filled_rows=filled_rows,
+            last_a_row=last_a_row,
+            max_col=max_col,
+        )
+        layout._update_template_source_max_row()
+        return layout
+
+    @classmethod
+    def from_template_meta(
+        cls,
+        meta: dict,
+        tail_rows: Iterable[tuple],
+        keyword: str = "여기서부터",
+        max_col: int = 0,
+    ) -> "SheetLayout":
+        """
+        인덱스 메타(scan_template_meta) + template source 아래 행들의 (A, B, C, CK) 값 → SheetLayout.
+        template source 영역은 스캔하지 않으므로 category_id → 선택 행 조회만 가능 (covers_template_lookup 참고).
+        """
+        tail_start = int(meta["last_a_row"]) + 1
+        values = chain(repeat((None, None, None, None), tail_start - 1), tail_rows)
+        layout = cls.from_values(values, keyword=keyword, max_col=max_col)
+        layout.id_rows = {str(cid): [int(row)] for cid, row in (meta.get("id_source_rows") or {}).items()}
+        layout.last_a_row = max(layout.last_a_row, int(meta["last_a_row"]))
+        if layout.sep_row is None and meta.get("separator_row"):
+            layout.sep_row = int(meta["separator_row"])
+        layout.partial_template = True
+        layout.inferred_template_max = int(meta["template_source_max_row"])
+        layout._update_template_source_max_row()
+        return layout
+
+    def covers_template_lookup(self, category_id) -> bool:
+        """메타 기반(partial) 레이아웃은 인덱스에 있는 category_id 조회만 답할 수 있다 → 아니면 전체 스캔 필요."""
+        return not self.partial_template or (bool(category_id) and str(category_id) in self.id_rows)
+
+    def _update_template_source_max_row(self) -> None:
+        if self.sep_row is not None and self.sep_row > 1:
+            self.template_source_max_row = self.sep_row - 1
+        elif self.inferred_template_max is not None:
+            self.template_source_max_row = self.inferred_template_max
+        else:
+            self.template_source_max_row = _infer_template_source_max_row_from(self.a_text, 50000, 200)
+
+    # ---------- 조회 ----------
+    def rows_for_id(self, category_id: str, upper: int) -> list[int]:
+        """A열에 '[category_id]' 가 있는 행들 중 upper 이하 (오름차순)."""
+        cid = str(category_id)
+        if cid.isdigit():
+            rows = self.id_rows.get(cid, [])
+        else:
+            # 숫자가 아닌 id 는 토큰 인덱스에 없으므로 A열 값에서 직접 찾는다
+            token = f"[{cid}]"
+            rows = [r for r, v in enumerate(self.a_text, start=1) if token in v]
+        return rows[:bisect_right(rows, upper)]
+
+    def next_free_row_from(self, start_row: int) -> int:
+        """start_row 이상에서 ABC 기준 첫 빈 행 (is_empty_row_abc 와 같은 판정)."""
+        r = max(1, start_row)
+        while r in self.filled_rows:
+            r += 1
+        return r
+
+    def separator_insert_row(self) -> int:
+        """구분자가 없을 때 삽입할 행 (A열 값이 있는 마지막 행 바로 아래)."""
+        # 템플릿이 비어있는 예외 케이스
+        return max(self.last_a_row, 1) + 1
+
+    # ---------- 증분 갱신 ----------
+    def ensure_separator(self, ws) -> int:
+        """구분자 행 번호. 없으면 A열 마지막 값 아래에 삽입하고 인덱스도 갱신."""
+        if self.sep_row is not None:
+            return self.sep_row
+
+        sep_row = self.separator_insert_row()
+
+        ws.cell(row=sep_row, column=1).value = _SEPARATOR_TEXT
+
+        # (선택) 구분자 강조(노란색)
+        try:
+            from openpyxl.styles import PatternFill
+            yellow_fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
+            ws.cell(row=sep_row, column=1).fill = yellow_fill
+        except Exception:
+            pass
+
+        b, c = (ws.cell(row=sep_row, column=col).value for col in (2, 3))
+        self.set_separator(sep_row, _SEPARATOR_TEXT, b, c)
+        return sep_row
+
+    def set_separator(self, row: int, text: str, b=None, c=None) -> None:
+        """구분자 행을 (시트에 쓴 뒤) 인덱스에 반영. b/c 는 그 행에 원래 있던 B/C 값 (빈 행 판정용)."""
+        self.sep_row = row
+        self.note_row(row, text, b, c)
+        self._update_template_source_max_row()
+
+    def refresh_row(self, ws, row: int) -> None:
+        """row 의 A/B/C 를 다시 읽어 빈 행 판정 / A열 값을 갱신 (행 추가·수정 직후 호출)."""
+        a, b, c = (ws.cell(row=row, column=col).value for col in (1, 2, 3))
+        self.note_row(row, a, b, c)
+
+    def note_row(self, row: int, a, b, c) -> None:
+        """row 의 A/B/C 값이 바뀌었음을 인덱스에 반영."""
+        a_s = _norm_cell_value(a)
+
+        empty_cnt = (a_s == "") + (_norm_cell_value(b) == "") + (_norm_cell_value(c) == "")
+        if empty_cnt < 2:
+            self.filled_rows.add(row)
+        else:
+            self.filled_rows.discard(row)
+
+        if row > len(self.a_text):
+            self.a_text.extend([""] * (row - len(self.a_text)))
+        self.a_text[row - 1] = a if isinstance(a, str) else ""
+        if a_s and row > self.last_a_row:
+            self.last_a_row = row
+
+
+_LAYOUT_CACHE: "weakref.WeakKeyDictionary[Worksheet, SheetLayout]" = weakref.WeakKeyDictionary()
+_LAYOUT_LOCK = threading.Lock()
+
+
+def get_sheet_layout(ws, *, keyword: str = "여기서부터", refresh: bool = False) -> SheetLayout:
+    """
+    ws 의 SheetLayout (워크시트 객체당 1회 스캔, weakref 캐시).
+    - workbook 을 닫고 다시 열면 새 ws 객체이므로 자동으로 다시 스캔된다.
+    - keyword 가 다르면 다시 스캔한다.
+    """
+    with _LAYOUT_LOCK:
+        layout = None if refresh else _LAYOUT_CACHE.get(ws)
+        if layout is None or layout.keyword != keyword:
+            layout = SheetLayout.build(ws, keyword=keyword)
+            _LAYOUT_CACHE[ws] = layout
+        return layout
+
+
+def invalidate_sheet_layout(ws) -> None:
+    with _LAYOUT_LOCK:
+        _LAYOUT_CACHE.pop(ws, None)
+
+
+def seed_sheet_layout(ws, meta: dict, *, keyword: str = "여기서부터") -> Optional[SheetLayout]:
+    """
+    인덱스 메타로 template source 영역 스캔을 건너뛴 레이아웃을 ws 캐시에 미리 넣는다.
+    메타가 이 시트와 맞지 않으면(템플릿 영역이 바뀜) 아무것도 하지 않고 None.
+    """
+    if not _template_meta_matches(meta, lambda r: ws.cell(row=r, column=1).value, keyword):
+        return None
+    tail_start = int(meta["last_a_row"]) + 1
+    n_rows = max(ws.max_row or 0, tail_start - 1)
+    abc_iter = ws.iter_rows(min_row=tail_start, max_row=n_rows, min_col=1, max_col=3, values_only=True)
+    ck_iter = ws.iter_rows(min_row=tail_start, max_row=n_rows, min_col=_CK_COL, max_col=_CK_COL, values_only=True)
+    tail = ((a, b, c, ck) for (a, b, c), (ck,) in zip(abc_iter, ck_iter))
+    layout = SheetLayout.from_template_meta(meta, tail, keyword=keyword, max_col=ws.max_column)
+    with _LAYOUT_LOCK:
+        _LAYOUT_CACHE[ws] = layout
+    return layout
+
+
+# ===============================
+# 템플릿 메타 (coupang_upload_index.json 에 미리 계산해 둠)
+# ===============================
+# build_coupang_upload_index 가 템플릿마다 read-only 로 한 번 읽어서 저장:
+#   separator_row / last_a_row / template_source_max_row
+#   id_source_rows : category_id → write 때 고를 template source 행 ("기타 재화" CK 행 우선)
+#   header_columns : 2행 헤더 문구 → 열 번호
+
+TEMPLATE_META_VERSION = 1
+
+
+def scan_template_meta(xlsm_path: Path, *, keyword: str = "여기서부터") -> dict:
+    """템플릿 xlsm 을 read-only 로 한 번 훑어 메타 dict 생성 (프로세스 풀 워커에서도 호출)."""
+    wb = load_workbook(xlsm_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        if SELLERTOOL_SHEET_NAME not in wb.sheetnames:
+            raise RuntimeError(f"시트 '{SELLERTOOL_SHEET_NAME}' 를 찾지 못했습니다. 파일: {xlsm_path}")
+        ws = wb[SELLERTOOL_SHEET_NAME]
+
+        header_columns: dict[str, int] = {}
+        for header_row in ws.iter_rows(min_row=2, max_row=2, values_only=True):
+            for idx, v in enumerate(header_row, start=1):
+                text = _safe_str(v).strip()
+                if text and text not in header_columns:
+                    header_columns[text] = idx
+
+        def _values():
+            for row in ws.iter_rows(min_row=1, max_col=_CK_COL, values_only=True):
+                row = tuple(row) + (None,) * (_CK_COL - len(row))
+                yield row[0], row[1], row[2], row[_CK_COL - 1]
+
+        layout = SheetLayout.from_values(_values(), keyword=keyword)
+    finally:
+        wb.close()
+
+    # write 때 상한: 구분자가 있으면 그 위, 없으면 구분자가 들어갈 자리(A열 마지막 값) 까지
+    upper = (layout.sep_row or layout.separator_insert_row()) - 1
+    id_source_rows: dict[str, int] = {}
+    for cid in layout.id_rows:
+        if layout.rows_for_id(cid, upper):
+            id_source_rows[cid] = select_template_source_row(
+                layout, coupang_category_id=cid, template_source_max_row=upper
+            )
+
+    return {
+        "version": TEMPLATE_META_VERSION,
+        "sheet": SELLERTOOL_SHEET_NAME,
+        "separator_row": layout.sep_row,
+        "last_a_row": layout.last_a_row,
+        "template_source_max_row": layout.template_source_max_row,
+        "id_source_rows": id_source_rows,
+        "header_columns": header_columns,
+    }
+
+
+def _template_meta_matches(meta: dict, get_a: Callable[[int], object], keyword: str = "여기서부터") -> bool:
+    """
+    메타가 지금 파일의 template source 영역과 맞는지 가볍게 확인.
+    - id 행 몇 개(처음/중간/끝)의 A열에 '[id]' 가 그대로 있는지
+    - 템플릿에 구분자가 있었으면: 그 행(separator_row)의 A열이 아직 구분자인지
+      (last_a_row 가 구분자 행이고, 그 아래는 추가된 상품 행이라 검사하면 안 됨)
+    - 없었으면: A열 마지막 값 행이 비어 있지 않고, 그 아래 행은 비었거나 (write 때 넣은) 구분자인지
+    """
+    try:
+        if meta.get("version") != TEMPLATE_META_VERSION:
+            return False
+        last_a_row = int(meta["last_a_row"])
+        items = sorted((int(row), str(cid)) for cid, row in (meta.get("id_source_rows") or {}).items())
+    except (KeyError, TypeError, ValueError):
+        return False
+    if last_a_row <= 0 or not items:
+        return False
+
+    for row, cid in {items[0], items[len(items) // 2], items[-1]}:
+        if f"[{cid}]" not in _safe_str(get_a(row)):
+            return False
+    separator_row = meta.get("separator_row")
+    if separator_row:
+        return keyword in _safe_str(get_a(int(separator_row)))
+
+    if not _norm_cell_value(get_a(last_a_row)):
+        return False
+    below = _safe_str(get_a(last_a_row + 1))
+    return below.strip() == "" or keyword in below
+
+
+_TEMPLATE_META_CACHE: dict = {"mtime_ns": None, "by_name": {}}
+_TEMPLATE_META_LOCK = threading.Lock()
+
+
+def get_template_meta(xlsm_path: Path) -> Optional[dict]:
+    """
+    파일명(upload_ready 복사본도 템플릿과 같은 이름)으로 인덱스 JSON 의 템플릿 메타 조회.
+    인덱스가 없거나, 원본 템플릿이 인덱스 생성 뒤에 바뀌었으면 None.
+    """
+    try:
+        st = COUPANG_UPLOAD_INDEX_JSON.stat()
+    except OSError:
+        return None
+
+    with _TEMPLATE_META_LOCK:
+        if _TEMPLATE_META_CACHE["mtime_ns"] != st.st_mtime_ns:
+            by_name: dict[str, dict] = {}
+            try:
+                with COUPANG_UPLOAD_INDEX_JSON.open("r", encoding="utf-8") as f:
+                    data = json.load(f)
+                for item in data.get("templates", []):
+                    if item.get("meta") and item.get("relative_path"):
+                        by_name[Path(item["relative_path"]).name] = item
+            except (OSError, ValueError, AttributeError) as e:
+                print(f"[WARN] 템플릿 메타 로드 실패 (전체 스캔으로 진행): {e}")
+            _TEMPLATE_META_CACHE["mtime_ns"] = st.st_mtime_ns
+            _TEMPLATE_META_CACHE["by_name"] = by_name
+        entry = _TEMPLATE_META_CACHE["by_name"].get(Path(xlsm_path).name)
+
+    if entry is None:
+        return None
+    try:
+        tst = (COUPANG_UPLOAD_FORM_DIR / entry["relative_path"]).stat()
+    except OSError:
+        return None
+    if tst.st_size != entry.get("size") or tst.st_mtime_ns != entry.get("mtime_ns"):
+        return None
+    return entry["meta"]
 
 # ===============================
 # Template source 보호 write
@@ -305,6 +656,12 @@ def safe_set_cell(ws, row: int, col: str, value, template_source_max_row: int):
         )
     ws[f"{col}{row}"].value = value
 
+    # A/B/C 는 빈 행 판정에 쓰이므로 레이아웃 인덱스가 있으면 같이 갱신
+    if col in ("A", "B", "C"):
+        layout = _LAYOUT_CACHE.get(ws)
+        if layout is not None:
+            layout.refresh_row(ws, row)
+
 
 
 # =========================
@@ -775,7 +1132,10 @@ def _pick_template_row(
     return candidates[0]
 
 
-# ===== DataValidation (드롭다운) 캐시: src_row에 걸린 DV만 추출해서 재사용 =====
+# ===== DataValidation (드롭다운) 전파: src_row에 걸린 DV를 dst_row까지 "범위 확장"으로 =====
+# 예전 방식(셀 주소 1개씩 dv.add + sqref 문자열 split 으로 중복 확인)은
+# 행을 추가할수록 확인 비용이 커지고, 저장된 XML 에 한 칸짜리 범위가 수천 개 쌓였다.
+# 지금은 (DV, 열 범위) 별로 행 구간을 관리해서 J401:J401 + J402:J402 ... 대신 J401:J500 하나로 늘린다.
 
 @dataclass(frozen=True)
 class _DVSpan:
@@ -783,43 +1143,146 @@ class _DVSpan:
     min_col: int
     max_col: int
 
-# key: id(ws) -> (src_row, spans)
-_DV_TEMPLATE_CACHE: dict[int, tuple[int, list[_DVSpan]]] = {}
-
-
-def _get_dv_template_for_src_row(ws: Worksheet, src_row: int) -> list[_DVSpan]:
-    """
-    src_row에 걸린 DV만 추려서 캐싱합니다.
-    - 템플릿 DV가 수천개여도, src_row에 걸린 건 보통 10~20개대라서
-      write가 반복될수록 성능이 크게 좋아집니다.
-    """
-    key = id(ws)
-    cached = _DV_TEMPLATE_CACHE.get(key)
-    if cached and cached[0] == src_row:
-        return cached[1]
-
-    spans: list[_DVSpan] = []
-    dvs = list(ws.data_validations.dataValidation) if ws.data_validations else []
-    for dv in dvs:
-        try:
-            ranges = list(dv.sqref.ranges)  # 스냅샷
-        except Exception:
-            continue
-
-        for r in ranges:
-            if r.min_row <= src_row <= r.max_row:
-                spans.append(_DVSpan(dv=dv, min_col=r.min_col, max_col=r.max_col))
 
-    _DV_TEMPLATE_CACHE[key] = (src_row, spans)
-    return spans
+class _DVSpanTrack:
+    """DV 1개 안에서 열 범위가 (min_col, max_col) 인 CellRange 들을 행 구간으로 관리."""
+
+    def __init__(self, dv, min_col: int, max_col: int) -> None:
+        self.dv = dv
+        self.min_col = min_col
+        self.max_col = max_col
+        self.starts: list[int] = []                 # 구간 시작 행 (정렬)
+        self.by_start: dict[int, CellRange] = {}
+        self.by_end: dict[int, CellRange] = {}
+
+    def load(self, ranges: list[CellRange]) -> None:
+        """
+        템플릿의 기존 범위들을 등록. 겹치거나 맞닿은 범위(J5:J30 + J10:J12 등)는 하나로 합친다.
+        (구간이 서로 떨어져 있어야 contains / add_row 가 시작 행 하나만 보고 판단할 수 있다)
+        """
+        merged: list[list[int]] = []
+        for rng in sorted(ranges, key=lambda x: (x.min_row, x.max_row)):
+            if merged and rng.min_row <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], rng.max_row)
+            else:
+                merged.append([rng.min_row, rng.max_row])
+
+        if len(merged) < len(ranges):
+            for rng in ranges:
+                self.dv.sqref.ranges.discard(rng)
+            ranges = [
+                CellRange(min_col=self.min_col, min_row=lo, max_col=self.max_col, max_row=hi)
+                for lo, hi in merged
+            ]
+            for rng in ranges:
+                self.dv.sqref.ranges.add(rng)
+
+        for rng in ranges:
+            self._insert(rng)
+
+    def _insert(self, rng: CellRange) -> None:
+        insort(self.starts, rng.min_row)
+        self.by_start[rng.min_row] = rng
+        self.by_end[rng.max_row] = rng
+
+    def _remove(self, rng: CellRange) -> None:
+        self.starts.pop(bisect_left(self.starts, rng.min_row))
+        self.by_start.pop(rng.min_row, None)
+        self.by_end.pop(rng.max_row, None)
+        # CellRange 는 좌표로 hash 되므로 제자리 수정하지 않고 빼고 새로 넣는다
+        self.dv.sqref.ranges.discard(rng)
+
+    def contains(self, row: int) -> bool:
+        i = bisect_right(self.starts, row) - 1
+        return i >= 0 and self.by_start[self.starts[i]].max_row >= row
+
+    def add_row(self, row: int) -> None:
+        if self.contains(row):
+            return
+        min_row, max_row = row, row
+        above = self.by_end.get(row - 1)
+        if above is not None:
+            min_row = above.min_row
+            self._remove(above)
+        below = self.by_start.get(row + 1)
+        if below is not None:
+            max_row = below.max_row
+            self._remove(below)
+        rng = CellRange(min_col=self.min_col, min_row=min_row, max_col=self.max_col, max_row=max_row)
+        self.dv.sqref.ranges.add(rng)
+        self._insert(rng)
+
+
+class _DVPropagator:
+    """워크시트 1개의 DV 전파 상태 (src_row 별 DV 목록 + (DV, 열 범위) 별 행 구간)."""
+
+    def __init__(self, ws: Worksheet) -> None:
+        self.dvs = list(ws.data_validations.dataValidation) if ws.data_validations else []
+        self._spans_by_src: dict[int, list[_DVSpan]] = {}
+        self._tracks: dict[tuple[int, int, int], _DVSpanTrack] = {}
+
+        for dv in self.dvs:
+            try:
+                ranges = list(dv.sqref.ranges)  # 스냅샷
+            except Exception:
+                continue
+            by_cols: dict[tuple[int, int], list[CellRange]] = {}
+            for r in ranges:
+                by_cols.setdefault((r.min_col, r.max_col), []).append(r)
+            for (min_col, max_col), group in by_cols.items():
+                track = _DVSpanTrack(dv, min_col, max_col)
+                track.load(group)
+                self._tracks[(id(dv), min_col, max_col)] = track
+
+    def spans_for_src_row(self, src_row: int) -> list[_DVSpan]:
+        """
+        src_row에 걸린 DV만 추려서 캐싱합니다.
+        - 템플릿 DV가 수천개여도, src_row에 걸린 건 보통 10~20개대라서
+          write가 반복될수록 성능이 크게 좋아집니다.
+        """
+        spans = self._spans_by_src.get(src_row)
+        if spans is None:
+            spans = [
+                _DVSpan(dv=t.dv, min_col=t.min_col, max_col=t.max_col)
+                for t in self._tracks.values()
+                if t.contains(src_row)
+            ]
+            self._spans_by_src[src_row] = spans
+        return spans
+
+    def propagate(self, src_row: int, dst_row: int) -> None:
+        for span in self.spans_for_src_row(src_row):
+            self._tracks[(id(span.dv), span.min_col, span.max_col)].add_row(dst_row)
+
+
+# workbook → {id(ws): (ws weakref, DV 개수, _DVPropagator)}
+# - workbook 이 닫혀 사라지면 같이 사라지고(weakref), 동시에 최대 _DV_CACHE_MAX_WORKBOOKS 개만 유지
+_DV_CACHE_MAX_WORKBOOKS = 8
+_DV_TEMPLATE_CACHE: "weakref.WeakKeyDictionary[Workbook, dict[int, tuple]]" = weakref.WeakKeyDictionary()
+_DV_CACHE_LOCK = threading.Lock()
+
+
+def _get_dv_propagator(ws: Worksheet) -> _DVPropagator:
+    wb = ws.parent
+    n_dv = len(ws.data_validations.dataValidation) if ws.data_validations else 0
+    with _DV_CACHE_LOCK:
+        per_wb = _DV_TEMPLATE_CACHE.get(wb)
+        if per_wb is None:
+            while len(_DV_TEMPLATE_CACHE) >= _DV_CACHE_MAX_WORKBOOKS:
+                _DV_TEMPLATE_CACHE.pop(next(iter(_DV_TEMPLATE_CACHE.keys())), None)
+            per_wb = _DV_TEMPLATE_CACHE[wb] = {}
+
+        cached = per_wb.get(id(ws))
+        # 시트가 바뀌었거나(같은 id 재사용) DV 가 새로 추가/삭제됐으면 다시 구성
+        if cached is None or cached[0]() is not ws or cached[1] != n_dv:
+            cached = (weakref.ref(ws), n_dv, _DVPropagator(ws))
+            per_wb[id(ws)] = cached
+        return cached[2]
 
 
-def _dv_has_addr(dv, addr: str) -> bool:
-    """중복 add 방지용(가벼운 체크)"""
-    try:
-        return addr in str(dv.sqref).split()
-    except Exception:
-        return False
+def _get_dv_template_for_src_row(ws: Worksheet, src_row: int) -> list[_DVSpan]:
+    """src_row에 걸린 (DV, 열 범위) 목록 (워크북 단위 캐시)."""
+    return _get_dv_propagator(ws).spans_for_src_row(src_row)
 
 
 def _copy_row_full(ws: Worksheet, src_row: int, dst_row: int, max_col: int = 120) -> None:
@@ -827,8 +1290,7 @@ def _copy_row_full(ws: Worksheet, src_row: int, dst_row: int, max_col: int = 120
     src_row → dst_row 로 값, 스타일, 데이터 유효성(드롭다운)까지 복사.
     - row height 복사 (있을 때만)
     - 스타일은 _style 전체 복사로 누락 최소화
-    - DV는 src_row에 걸린 것만 캐싱하여 성능 개선
-    - DV add 중복 방지
+    - DV는 src_row에 걸린 것만 캐싱하고, dst_row는 기존 범위를 늘려서 추가 (연속 행 → 범위 1개)
     """
 
     # 0) row height 복사(지정된 경우만)
@@ -856,18 +1318,8 @@ def _copy_row_full(ws: Worksheet, src_row: int, dst_row: int, max_col: int = 120
         if src_cell.comment:
             dst_cell.comment = copy(src_cell.comment)
 
-    # 2) 데이터 유효성(드롭다운) 복사: src_row에 걸린 것만 캐싱해서 적용
-    spans = _get_dv_template_for_src_row(ws, src_row)
-    for span in spans:
-        dv = span.dv
-        for col in range(span.min_col, span.max_col + 1):
-            addr = f"{get_column_letter(col)}{dst_row}"
-            if _dv_has_addr(dv, addr):
-                continue
-            try:
-                dv.add(addr)
-            except Exception:
-                pass
+    # 2) 데이터 유효성(드롭다운) 복사: src_row에 걸린 DV 범위를 dst_row까지 확장 (연속 행은 한 범위로)
+    _get_dv_propagator(ws).propagate(src_row, dst_row)
 
 
 def _fill_product_data(
@@ -908,16 +1360,6 @@ def _fill_product_data(
 
 
 
-def _get_cached_workbook(xlsm_path: Path) -> Workbook:
-    """
-    ✅ 안정성 우선 정책:
-    - 크롤링 1건(또는 저장 1회)마다 workbook을 새로 열고, 저장 후 닫는다.
-    - openpyxl workbook 객체 재사용(캐시)은 xlsm zip 깨짐/닫힌 핸들 이슈를 유발할 수 있어
-      당분간 비활성화한다.
-    """
-    return load_workbook(xlsm_path, keep_vba=True)
-
-
 def _validate_xlsm_zip(xlsm_path: Path) -> None:
     """
     저장 직후 xlsm(zip) 기본 구조가 유지되는지 빠르게 검증.
@@ -932,23 +1374,6 @@ def _validate_xlsm_zip(xlsm_path: Path) -> None:
                 f"엑셀 파일이 손상되었습니다. 필수 엔트리 누락: {missing} (file={xlsm_path})"
             )
 
-def _save_cached_workbook(xlsm_path: Path, wb: Workbook) -> None:
-    """
-    ✅ 안정성 우선 정책:
-    - save → 유효성 검사 → close
-    - 캐시 유지하지 않음(다음 크롤링에서 다시 open)
-    """
-    try:
-        wb.save(xlsm_path)
-        _validate_xlsm_zip(xlsm_path)
-    finally:
-        # openpyxl workbook 재사용을 막기 위해 항상 close
-        try:
-            wb.close()
-        except Exception:
-            pass
-        _WB_CACHE.pop(str(xlsm_path), None)
-
 
 def prepare_sellertool_workbook_copy(
     template_xlsm_path: Path,
@@ -997,8 +1422,14 @@ def write_coupang_row(
     - 구분자 아래, ABC 기준 빈 행에만 append
     """
 
+    # 0. 시트 레이아웃 (시트당 1회 스캔, 이후 write 마다 증분 갱신)
+    #    인덱스 메타로 만든 레이아웃에 이 category_id 가 없으면 전체 스캔으로 다시 만든다
+    layout = get_sheet_layout(ws)
+    if not layout.covers_template_lookup(coupang_category_id):
+        layout = get_sheet_layout(ws, refresh=True)
+
     # 1. 구분자 / Template source 영역
-    sep_row = find_separator_row(ws)
+    sep_row = layout.ensure_separator(ws)
     template_source_max_row = sep_row - 1
 
     # 2. Template source 행 (CK 기준)
@@ -1013,37 +1444,61 @@ def write_coupang_row(
     dst_row = find_next_input_row(ws, sep_row + 1)
 
     # 4. Template source → 입력 행 복사
+    #    (ws.max_column 은 호출마다 전체 셀을 훑으므로 스캔 때 잡아 둔 폭 사용)
     _copy_row_full(
         ws,
         src_row=src_row,
         dst_row=dst_row,
-        max_col=ws.max_column,
+        max_col=layout.max_col,
     )
+    layout.refresh_row(ws, dst_row)
 
     # 5. 값 쓰기 (dst_row ONLY)
-    today = datetime.now().strftime("%Y-%m-%d")
-
-    safe_set_cell(ws, dst_row, "B", product_name, template_source_max_row)
-    safe_set_cell(ws, dst_row, "C", today, template_source_max_row)
+    values = coupang_row_values(
+        product_name,
+        calculated_price,
+        discount_base_price,
+        stock_qty,
+        lead_time,
+        main_image_name,
+        spec_image_name,
+    )
+    for col, value in values.items():
+        safe_set_cell(ws, dst_row, col, value, template_source_max_row)
 
-    # G/H: 등록상품명의 첫 단어(예: "AMT")
-    first_word = (product_name.split()[0] if product_name and product_name.split() else "")
-    safe_set_cell(ws, dst_row, "G", first_word, template_source_max_row)
-    safe_set_cell(ws, dst_row, "H", first_word, template_source_max_row)
+    return dst_row
 
-    # 가격
-    safe_set_cell(ws, dst_row, "BJ", calculated_price, template_source_max_row)
-    safe_set_cell(ws, dst_row, "BL", discount_base_price, template_source_max_row)
 
-    # 사용자 지정값
-    safe_set_cell(ws, dst_row, "BM", stock_qty, template_source_max_row)
-    safe_set_cell(ws, dst_row, "BN", lead_time, template_source_max_row)
+def coupang_row_values(
+    product_name: str,
+    calculated_price: int,
+    discount_base_price: int,
+    stock_qty: int,
+    lead_time: int,
+    main_image_name: str,
+    spec_image_name: str,
+) -> dict[str, object]:
+    """write_coupang_row 가 복사된 행에 덮어쓰는 값 {열: 값} (openpyxl / XML 쓰기 공용)."""
+    today = datetime.now().strftime("%Y-%m-%d")
 
-    # 이미지명
-    safe_set_cell(ws, dst_row, "CZ", main_image_name, template_source_max_row)
-    safe_set_cell(ws, dst_row, "DF", spec_image_name, template_source_max_row)
+    # G/H: 등록상품명의 첫 단어(예: "AMT")
+    first_word = (product_name.split()[0] if product_name and product_name.split() else "")
 
-    return dst_row
+    return {
+        "B": product_name,
+        "C": today,
+        "G": first_word,
+        "H": first_word,
+        # 가격
+        "BJ": calculated_price,
+        "BL": discount_base_price,
+        # 사용자 지정값
+        "BM": stock_qty,
+        "BN": lead_time,
+        # 이미지명
+        "CZ": main_image_name,
+        "DF": spec_image_name,
+    }
 
 
 
@@ -1074,11 +1529,7 @@ def copy_row_with_style(ws: Worksheet, src_row: int, dst_row: int, max_col: int=
             c2.comment = c1.comment  # 필요하면 copy()로
     
     # 데이터 유효성(드롭다운) 복사
-    for dv in ws.data_validations.dataValidation:
-        for rng in dv.ranges:
-            if rng.min_row <= src_row <= rng.max_row:
-                for col in range(rng.min_col, rng.max_col + 1):
-                    dv.add(f"{get_column_letter(col)}{dst_row}")
+    _get_dv_propagator(ws).propagate(src_row, dst_row)
 
 
 # =========================
@@ -1092,6 +1543,7 @@ def prepare_and_fill_sellertool(
     coupang_category_path: str,
     price: Optional[int] = None,
     search_keywords: Optional[Iterable[str]] = None,
+    session: Optional["SellertoolWriterSession"] = None,
 ) -> tuple[Path, int]:
 
     """
@@ -1103,6 +1555,9 @@ def prepare_and_fill_sellertool(
 
     최종적으로 수정된 upload_ready 안의 파일 Path 와,
     실제로 데이터가 기록된 행 번호(dst_row)를 함께 반환.
+
+    session 을 주면 그 세션의 열린 workbook 에 행만 추가하고 저장은 세션 정책(건수/시간/commit)에 맡긴다.
+    없으면 이번 1건만을 위한 세션으로 열기 → 쓰기 → 저장까지 한 번에 한다.
     """
     #for test
     
@@ -1124,79 +1579,412 @@ def prepare_and_fill_sellertool(
             "우선 백업 탐색(rglob)으로 템플릿 선택을 시도합니다."
         )
 
-    
-        
-    # ---- 1) 템플릿 선택 ----
-    template_path = find_template_for_category_path(coupang_category_path)
+    if session is not None:
+        dest_path, dst_row = session.append_product(
+            product=product,
+            coupang_category_id=coupang_category_id,
+            coupang_category_path=coupang_category_path,
+            price=price,
+        )
+    else:
+        with SellertoolWriterSession(flush_every=1) as one_shot:
+            dest_path, dst_row = one_shot.append_product(
+                product=product,
+                coupang_category_id=coupang_category_id,
+                coupang_category_path=coupang_category_path,
+                price=price,
+            )
 
-    # ---- 2) upload_ready 폴더로 '원래 파일명' 그대로 복사 ----
-    UPLOAD_READY_DIR.mkdir(parents=True, exist_ok=True)
-    dest_name = template_path.name
-    dest_path = UPLOAD_READY_DIR / dest_name
+    print("[DEBUG] dest_path =", dest_path)
+    print("[DEBUG] dest exists? =", dest_path.exists())
 
-    # 같은 템플릿을 여러 번 쓰는 경우:
-    # 이미 dest_path 가 있으면 복사하지 않고 기존 파일에 행만 추가
-    if not dest_path.exists():
-        shutil.copy2(template_path, dest_path)
+    return dest_path, dst_row
 
-    # ---- 3) 엑셀 열기 ----
-    wb = _get_cached_workbook(dest_path)
-    try:
-        if SELLERTOOL_SHEET_NAME not in wb.sheetnames:
-            raise RuntimeError(
-                f"시트 '{SELLERTOOL_SHEET_NAME}' 를 찾지 못했습니다. "
-             f"파일: {dest_path}"
-            )
 
-        ws = wb[SELLERTOOL_SHEET_NAME]
+def _write_product_row(
+    ws: Worksheet,
+    dest_path: Path,
+    *,
+    product_name: str,
+    price,
+    coupang_category_id: str,
+    coupang_category_path: str,
+) -> int:
+    """상품 1건을 data 시트에 추가하고 기록된 행 번호를 반환 (세션 append / 저널 재실행 공용)."""
+    # ---- 가격 정책 계산 (기존 ui_main.py 로직 재사용) ----
+    base_price = int(price) if price not in (None, "") else 0
+
+    bj_price, bl_price, stock_qty, lead_time = calculate_pricing_from_base(base_price)
+
+    # ---- 데이터 행 추가 (Template source 보호 로직 사용) ----
+    dst_row = write_coupang_row(
+        ws=ws,
+        product_name=product_name,
+        calculated_price=bj_price,        # BJ
+        discount_base_price=bl_price,     # BL
+        stock_qty=stock_qty,              # BM
+        lead_time=lead_time,              # BN
+        main_image_name="",               # 일단 빈 값(아래에서 채움)
+        spec_image_name="",
+        coupang_category_id=coupang_category_id,
+        coupang_category_path=coupang_category_path,
+    )
+    # ✅ prefix 기반 이미지명 확정 → CZ/DF에 실제로 기록
+    prefix = extract_template_prefix_from_filename(dest_path) or "no-prefix"
+    main_img, spec_img = build_prefixed_image_names(prefix, dst_row)
+
+    # template source 보호를 위해 구분선 기반으로 상한만 계산 (write_coupang_row 가 만든 인덱스 재사용)
+    sep_row = find_separator_row(ws)
+    template_source_max_row = sep_row - 1
+    safe_set_cell(ws, dst_row, "CZ", main_img, template_source_max_row)
+    safe_set_cell(ws, dst_row, "DF", spec_img, template_source_max_row)
+    return dst_row
+
+
+# =========================
+# 4) 배치 쓰기 세션
+# =========================
+# 상품 1건마다 load_workbook(keep_vba) → 1행 → save 를 반복하면 큰 템플릿에서는 열고 닫는 데만 수 초가 걸린다.
+# 세션은 목적지 xlsm 마다 workbook 을 한 번만 열어 두고 행을 쌓은 뒤 건수/시간/commit() 때 저장한다.
+#
+# 크래시 대비 저널:
+# - 행을 workbook(메모리)에 쓴 직후, 재실행에 필요한 입력값 + 기록된 행 번호를
+#   SELLERTOOL_JOURNAL_DIR/<파일명>.pending.jsonl 에 한 줄 추가(fsync)한다.
+# - 저장이 성공하면 저널을 비운다.
+# - 다음에 같은 파일을 열 때 저널이 남아 있으면(= 저장 전에 죽음) 그 행들을 다시 써 넣고 바로 저장한다.
+#   이미 저장된 행(같은 행 B열에 같은 상품명)은 건너뛴다 → 저장 직후/저널 삭제 전 크래시에도 중복 없음.
+# - 저장은 임시 파일 → zip 검증 → os.replace 순서라서 저장 도중 죽어도 기존 파일은 그대로다.
+#
+# ⚠️ 같은 목적지 파일을 세션 두 개가 동시에 열면 나중 저장이 앞의 것을 덮는다 → 앱에서는 세션 하나만 쓴다.
+
+def _save_atomically(dest_path: Path, write: Callable[[Path], None]) -> None:
+    """write(임시 경로) → zip 검증 → os.replace. 중간에 실패/크래시해도 dest_path 는 이전 상태 그대로."""
+    tmp_path = dest_path.with_name(dest_path.name + ".saving")
+    try:
+        write(tmp_path)
+        _validate_xlsm_zip(tmp_path)
+        os.replace(tmp_path, dest_path)
+    finally:
+        if tmp_path.exists():
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
 
-        # ---- 4) 가격 정책 계산 (기존 ui_main.py 로직 재사용) ----
-        base_price = int(price) if price is not None else 0
 
-        bj_price, bl_price, stock_qty, lead_time = calculate_pricing_from_base(base_price)
+class _OpenpyxlRowWriter:
+    """openpyxl 엔진: workbook 을 열어 둔 채 write_coupang_row 로 행 추가."""
 
-        # ---- 5) 데이터 행 추가 (Template source 보호 로직 사용) ----
-        dst_row = write_coupang_row(
-            ws=ws,
-            product_name=product.display_name,
-            calculated_price=bj_price,        # BJ
-            discount_base_price=bl_price,     # BL
-            stock_qty=stock_qty,              # BM
-            lead_time=lead_time,              # BN
-            main_image_name="",               # 일단 빈 값(아래에서 채움)
-            spec_image_name="",
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.wb = load_workbook(self.path, keep_vba=True)
+        if SELLERTOOL_SHEET_NAME not in self.wb.sheetnames:
+            self.wb.close()
+            raise RuntimeError(
+                f"시트 '{SELLERTOOL_SHEET_NAME}' 를 찾지 못했습니다. "
+                f"파일: {self.path}"
+            )
+        self.ws = self.wb[SELLERTOOL_SHEET_NAME]
+
+        # 인덱스 메타가 있으면 template source 영역 스캔 생략
+        meta = get_template_meta(self.path)
+        if meta is not None:
+            seed_sheet_layout(self.ws, meta)
+
+    def append(self, *, product_name: str, price, coupang_category_id: str, coupang_category_path: str) -> int:
+        return _write_product_row(
+            self.ws,
+            self.path,
+            product_name=product_name,
+            price=price,
             coupang_category_id=coupang_category_id,
             coupang_category_path=coupang_category_path,
         )
-        # ✅ prefix 기반 이미지명 확정 → CZ/DF에 실제로 기록
-        prefix = extract_template_prefix_from_filename(dest_path) or "no-prefix"
-        main_img, spec_img = build_prefixed_image_names(prefix, dst_row)
-
-        template_source_row = find_template_source_row(ws)
-        template_source_max_row = find_template_source_row(ws)
-        sep_row = find_separator_row(ws)
-        template_source_max_row = sep_row - 1
-        # template source 보호를 위해 구분선 기반으로 상한만 계산
-        sep_row = find_separator_row(ws)
-        template_source_max_row = sep_row - 1
-        safe_set_cell(ws, dst_row, "CZ", main_img, template_source_max_row)
-        safe_set_cell(ws, dst_row, "DF", spec_img, template_source_max_row)
-
-    # ---- 7) 저장 ----
-        _save_cached_workbook(dest_path, wb)
-    finally:
-        # _save_cached_workbook에서 close를 하더라도,
-        # 중간 예외로 save까지 못 가는 경우를 대비한 2중 안전장치
+
+    def has_product(self, row: int, product_name: str) -> bool:
+        return _cell_str(self.ws, row, "B") == product_name
+
+    def save(self) -> None:
+        _save_atomically(self.path, self.wb.save)
+
+    def close(self) -> None:
         try:
-            wb.close()
+            self.wb.close()
         except Exception:
-            pass    
-    
-    print("[DEBUG] template_path =", template_path)
-    print("[DEBUG] template_path.name =", template_path.name)
-    print("[DEBUG] dest_path =", dest_path)
-    print("[DEBUG] dest exists? =", dest_path.exists())
+            pass
 
-    return dest_path, dst_row
 
+def _open_row_writer(path: Path, engine: str):
+    if engine == "xml":
+        from .sellertool_xml import XmlSheetWriter
+        return XmlSheetWriter(path)
+    return _OpenpyxlRowWriter(path)
+
+
+@dataclass
+class _OpenWorkbook:
+    path: Path
+    writer: object                 # _OpenpyxlRowWriter | XmlSheetWriter
+    journal_path: Path
+    pending: int = 0
+    last_flush: float = 0.0
+    flush_failed: bool = False     # 마지막 중간 저장 실패 → 건수 기준 저장은 시간 기준이 지날 때까지 쉼
+
+
+class SellertoolWriterSession:
+    """
+    upload_ready xlsm 들에 행을 모아 쓰는 세션.
+
+        with SellertoolWriterSession() as session:
+            for p in products:
+                dest_path, row = session.append_product(product=p, ...)
+        # 빠져나올 때 commit() (남은 행 저장) + close()
+
+    - flush_every 건이 쌓이거나, 마지막 저장 후 flush_interval_sec 가 지나면 해당 파일을 저장
+      (시간 기준은 append 때 확인 / UI 타이머 등에서 flush_if_due() 로도 확인 가능)
+    - 반환되는 행 번호는 저장 전이라도 확정값 (이미지 파일명 등에 바로 써도 됨)
+    - engine: "openpyxl" (workbook 전체를 읽고 씀) / "xml" (data 시트 XML 에 행만 붙임, sellertool_xml 참고)
+    """
+
+    def __init__(
+        self,
+        *,
+        flush_every: int = SELLERTOOL_FLUSH_EVERY,
+        flush_interval_sec: float = SELLERTOOL_FLUSH_INTERVAL_SEC,
+        journal_dir: Path = SELLERTOOL_JOURNAL_DIR,
+        engine: str = SELLERTOOL_WRITE_ENGINE,
+    ) -> None:
+        self.engine = engine
+        self.flush_every = max(1, int(flush_every))
+        self.flush_interval_sec = float(flush_interval_sec)
+        self.journal_dir = Path(journal_dir)
+        self._books: dict[str, _OpenWorkbook] = {}
+        self._lock = threading.RLock()
+
+    # ---------- context ----------
+    def __enter__(self) -> "SellertoolWriterSession":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        # 예외로 빠져나와도 이미 쓴 행은 정상 행이므로 저장한다 (저장 실패 시 저널이 남음)
+        self.close()
+
+    # ---------- 열기 / 저널 ----------
+    def _journal_path(self, dest_path: Path) -> Path:
+        return self.journal_dir / f"{Path(dest_path).name}.pending.jsonl"
+
+    def _open(self, dest_path: Path) -> _OpenWorkbook:
+        key = str(Path(dest_path).resolve())
+        book = self._books.get(key)
+        if book is not None:
+            return book
+
+        book = _OpenWorkbook(
+            path=Path(dest_path),
+            writer=_open_row_writer(Path(dest_path), self.engine),
+            journal_path=self._journal_path(dest_path),
+            last_flush=time.monotonic(),
+        )
+        self._books[key] = book
+
+        if book.journal_path.exists():
+            # 재실행 도중 실패하면 반쯤 복구된 workbook 이 다음 저장에 쓰이지 않게 버린다 (저널은 그대로)
+            try:
+                replayed = self._replay_journal(book)
+                if replayed:
+                    self._flush_book(book)
+                else:
+                    self._clear_journal(book)
+            except Exception:
+                self._discard_book(book)
+                raise
+        return book
+
+    def _replay_journal(self, book: _OpenWorkbook) -> int:
+        entries = []
+        with book.journal_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # 마지막 줄이 쓰다 만 상태로 끊긴 경우
+                    print(f"[WARN] 셀러툴 저널의 깨진 줄을 건너뜁니다: {book.journal_path}")
+
+        replayed = 0
+        for e in entries:
+            row = int(e.get("row") or 0)
+            name = _safe_str(e.get("product_name"))
+            if row > 0 and book.writer.has_product(row, name):
+                continue  # 저장은 됐는데 저널을 못 지운 경우
+            dst_row = book.writer.append(
+                product_name=name,
+                price=e.get("price"),
+                coupang_category_id=e.get("category_id") or "",
+                coupang_category_path=e.get("category_path") or "",
+            )
+            if row and dst_row != row:
+                print(f"[WARN] 저널 재실행 행 번호가 다릅니다: 기록 {row} → 재실행 {dst_row} ({name})")
+            replayed += 1
+
+        if replayed:
+            print(f"[INFO] 저장되지 않았던 {replayed}행을 저널에서 복구했습니다: {book.path.name}")
+        return replayed
+
+    def _append_journal(self, book: _OpenWorkbook, entry: dict) -> None:
+        book.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        with book.journal_path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _discard_book(self, book: _OpenWorkbook) -> None:
+        """저장하지 않고 닫기 (저널은 그대로 → 다음 _open 때 재실행)."""
+        self._books.pop(str(book.path.resolve()), None)
+        ws = getattr(book.writer, "ws", None)
+        if ws is not None:
+            invalidate_sheet_layout(ws)
+        book.writer.close()
+        print(f"[WARN] 행 쓰기/저널 복구 실패 → 저장하지 않은 변경을 버리고 다음 쓰기 때 다시 엽니다: {book.path.name}")
+
+    def _clear_journal(self, book: _OpenWorkbook) -> None:
+        try:
+            book.journal_path.unlink()
+        except FileNotFoundError:
+            pass
 
+    # ---------- 쓰기 ----------
+    def append_row(
+        self,
+        dest_path: Path,
+        *,
+        product_name: str,
+        price=None,
+        coupang_category_id: str | None = None,
+        coupang_category_path: str | None = None,
+    ) -> int:
+        """
+        dest_path(upload_ready 의 xlsm)에 1행 추가 → 기록된 행 번호.
+        행 쓰기/저널 기록 중 예외가 나면 열어 둔 workbook 을 저장 없이 버린다
+        (쓰다 만 행이 다음 저장에 섞이지 않게 / 앞서 쌓인 행은 다음 _open 때 저널에서 복구).
+        중간 저장(flush) 실패는 로그만 남기고 행 번호를 그대로 반환한다
+        (행은 이미 workbook + 저널에 있어 다음 flush / close 때 저장됨 → 호출부가 이미지 캡처를 건너뛰지 않게).
+        """
+        with self._lock:
+            book = self._open(Path(dest_path))
+            try:
+                dst_row = book.writer.append(
+                    product_name=product_name,
+                    price=price,
+                    coupang_category_id=coupang_category_id or "",
+                    coupang_category_path=coupang_category_path or "",
+                )
+                self._append_journal(
+                    book,
+                    {
+                        "row": dst_row,
+                        "product_name": product_name,
+                        "price": price,
+                        "category_id": coupang_category_id,
+                        "category_path": coupang_category_path,
+                        "ts": datetime.now().isoformat(timespec="seconds"),
+                    },
+                )
+            except Exception:
+                self._discard_book(book)
+                raise
+            book.pending += 1
+
+            if (book.pending >= self.flush_every and not book.flush_failed) or self._is_due(book):
+                try:
+                    self._flush_book(book)
+                except Exception as e:
+                    # 엑셀에서 파일을 열어 둔 경우 등: 다음 저장은 flush_interval_sec 뒤 / flush / close 때 다시 시도
+                    book.flush_failed = True
+                    book.last_flush = time.monotonic()
+                    print(f"[WARN] 셀러툴 엑셀 중간 저장 실패 (행은 저널에 보존, 나중에 다시 저장): {book.path.name} / {e}")
+            return dst_row
+
+    def append_product(
+        self,
+        *,
+        product: Product,
+        coupang_category_id: str,
+        coupang_category_path: str,
+        price: Optional[int] = None,
+    ) -> tuple[Path, int]:
+        """템플릿 선택 → upload_ready 복사(없을 때만) → 1행 추가. (dest_path, dst_row) 반환."""
+        # ---- 1) 템플릿 선택 ----
+        template_path = find_template_for_category_path(coupang_category_path)
+
+        # ---- 2) upload_ready 폴더로 '원래 파일명' 그대로 복사 ----
+        # 같은 템플릿을 여러 번 쓰는 경우:
+        # 이미 dest_path 가 있으면 복사하지 않고 기존 파일에 행만 추가
+        UPLOAD_READY_DIR.mkdir(parents=True, exist_ok=True)
+        dest_path = UPLOAD_READY_DIR / template_path.name
+        if not dest_path.exists():
+            shutil.copy2(template_path, dest_path)
+
+        dst_row = self.append_row(
+            dest_path,
+            product_name=product.display_name,
+            price=price,
+            coupang_category_id=coupang_category_id,
+            coupang_category_path=coupang_category_path,
+        )
+        return dest_path, dst_row
+
+    # ---------- 저장 ----------
+    def _is_due(self, book: _OpenWorkbook) -> bool:
+        return book.pending > 0 and time.monotonic() - book.last_flush >= self.flush_interval_sec
+
+    def _flush_book(self, book: _OpenWorkbook) -> None:
+        book.writer.save()
+        self._clear_journal(book)
+        book.pending = 0
+        book.flush_failed = False
+        book.last_flush = time.monotonic()
+
+    def flush(self, dest_path: Optional[Path] = None) -> None:
+        """dest_path(없으면 전체)의 쌓인 행을 저장."""
+        with self._lock:
+            books = list(self._books.values())
+            if dest_path is not None:
+                key = str(Path(dest_path).resolve())
+                books = [b for b in books if str(b.path.resolve()) == key]
+            for book in books:
+                if book.pending:
+                    self._flush_book(book)
+
+    def flush_if_due(self) -> None:
+        """시간 기준이 지난 파일만 저장 (UI 타이머 등에서 주기적으로 호출)."""
+        with self._lock:
+            for book in list(self._books.values()):
+                if self._is_due(book):
+                    self._flush_book(book)
+
+    def commit(self) -> None:
+        self.flush()
+
+    @property
+    def pending_count(self) -> int:
+        with self._lock:
+            return sum(b.pending for b in self._books.values())
+
+    def close(self) -> None:
+        """남은 행 저장 후 workbook 들을 닫는다. 저장 실패한 파일은 저널이 남아 다음에 복구된다."""
+        with self._lock:
+            errors = []
+            for book in list(self._books.values()):
+                try:
+                    if book.pending:
+                        self._flush_book(book)
+                except Exception as e:
+                    errors.append(f"{book.path.name}: {e}")
+                finally:
+                    book.writer.close()
+            self._books.clear()
+        if errors:
+            raise RuntimeError("셀러툴 엑셀 저장 실패 (저널에 보존됨, 다음 실행 때 복구): " + "; ".join(errors))
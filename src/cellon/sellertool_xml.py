@@ -0,0 +1,589 @@
+# cellon/sellertool_xml.py
+"""
+upload_ready xlsm 에 행을 추가하는 XML 직접 쓰기 엔진 (openpyxl 없이).
+
+- openpyxl 은 행 몇 개를 추가할 때도 data 시트의 모든 행/스타일/데이터 유효성을 객체로 읽고
+  다시 직렬화한다 → 큰 카테고리 템플릿일수록 저장 1번이 느려진다.
+- 이 엔진은 xlsm 을 zip 으로 보고 data 시트 XML 만 문자열로 다룬다.
+  · Template source 행의 <row> 를 그대로 복사해서 행 번호 / 셀 참조(r="A5" → r="A812")만 바꾸고
+    B/C/G/H/BJ/BL/BM/BN/CZ/DF 값은 inline string / 숫자로 덮어쓴다 (sharedStrings.xml 은 건드리지 않음)
+  · Template source 행에 걸린 데이터 유효성(드롭다운)의 sqref 를 새 행까지 늘린다
+    (<dataValidation sqref=...> 와 x14 확장 <xm:sqref> 모두, 연속 행이면 J5:J400 → J5:J401 처럼 범위 확장)
+  · 구분자 행이 없으면 노란 배경 스타일을 styles.xml 에 하나 추가해서 구분자를 넣는다
+- 저장 때는 바뀐 시트(와 styles.xml) 외의 zip 항목은 내용 그대로 옮겨 쓴다 (vbaProject.bin 포함).
+  압축은 원래 항목의 방식대로 다시 하므로 압축 바이트는 달라질 수 있어도 풀었을 때 내용은 바이트 단위로 같다.
+- 행/구분자/Template source 선택 규칙은 sellertool_excel 의 SheetLayout / select_template_source_row 를 그대로 쓴다.
+  coupang_upload_index.json 에 템플릿 메타가 있으면 template source 영역은 스캔하지 않고 그 아래 행만 읽는다.
+
+전제: Excel / openpyxl 이 쓰는 형태처럼 <row>, <c> 의 첫 속성이 r 이다.
+"""
+
+from __future__ import annotations
+
+import html
+import posixpath
+import re
+import zipfile
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from xml.etree import ElementTree as ET
+from xml.sax.saxutils import escape
+
+from openpyxl.utils import column_index_from_string, get_column_letter, range_boundaries
+
+from .config import SELLERTOOL_SHEET_NAME
+from .sellertool_excel import (
+    _SEPARATOR_TEXT,
+    SheetLayout,
+    _save_atomically,
+    _template_meta_matches,
+    build_prefixed_image_names,
+    calculate_pricing_from_base,
+    coupang_row_values,
+    extract_template_prefix_from_filename,
+    get_template_meta,
+    select_template_source_row,
+)
+
+
+_NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+_NS_DOC_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+_NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+_REL_OFFICE_DOCUMENT = _NS_DOC_REL + "/officeDocument"
+_REL_SHARED_STRINGS = _NS_DOC_REL + "/sharedStrings"
+_REL_STYLES = _NS_DOC_REL + "/styles"
+
+_ROW_NUM_RE = re.compile(r'<row r="(\d+)"')
+_ROW_OPEN_RE = re.compile(r"<row\b([^>]*?)(/?)>")
+_CELL_RE = re.compile(r'<c r="([A-Z]{1,3})(\d+)"([^>]*?)(?:/>|>(.*?)</c>)', re.S)
+_LAYOUT_CELL_RE = re.compile(r'<c r="(A|B|C|CK)(\d+)"([^>]*?)(?:/>|>(.*?)</c>)', re.S)
+_TYPE_RE = re.compile(r'\bt="(\w+)"')
+_STYLE_RE = re.compile(r'\bs="(\d+)"')
+_V_RE = re.compile(r"<v>(.*?)</v>", re.S)
+_T_RE = re.compile(r"<t(?:\s[^>]*)?>(.*?)</t>", re.S)
+_SPANS_RE = re.compile(r'\s+spans="[^"]*"')
+_FORMULA_RE = re.compile(r"<f\b[^>]*?(?:/>|>.*?</f>)", re.S)
+_DIMENSION_RE = re.compile(r'(<dimension ref=")([^"]*)(")')
+_DV_SQREF_RE = re.compile(r'(<dataValidation\b[^>]*?\bsqref=")([^"]*)(")')
+_X14_SQREF_RE = re.compile(r"(<xm:sqref>)([^<]*)(</xm:sqref>)")
+_ILLEGAL_XML_CHARS_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_LAYOUT_SLOT = {"A": 0, "B": 1, "C": 2, "CK": 3}
+_MAX_SHEET_ROW = 1048576
+
+
+# ===== 1) zip 안의 파트 찾기 / 읽기 =====
+
+def _rels_path(part: str) -> str:
+    folder, name = posixpath.split(part)
+    return posixpath.join(folder, "_rels", name + ".rels")
+
+
+def _resolve_target(source_part: str, target: str) -> str:
+    if target.startswith("/"):
+        return target.lstrip("/")
+    return posixpath.normpath(posixpath.join(posixpath.dirname(source_part), target))
+
+
+def _read_rels(zf: zipfile.ZipFile, part: str) -> List[ET.Element]:
+    try:
+        data = zf.read(_rels_path(part))
+    except KeyError:
+        return []
+    return list(ET.fromstring(data).iter(f"{{{_NS_PKG_REL}}}Relationship"))
+
+
+def _find_parts(zf: zipfile.ZipFile, sheet_name: str) -> Tuple[str, Optional[str], Optional[str]]:
+    """(시트 파트, sharedStrings 파트, styles 파트) 경로."""
+    wb_part = "xl/workbook.xml"
+    for rel in _read_rels(zf, ""):
+        if rel.get("Type") == _REL_OFFICE_DOCUMENT:
+            wb_part = _resolve_target("", rel.get("Target", wb_part))
+
+    rid = None
+    for sheet in ET.fromstring(zf.read(wb_part)).iter(f"{{{_NS_MAIN}}}sheet"):
+        if sheet.get("name") == sheet_name:
+            rid = sheet.get(f"{{{_NS_DOC_REL}}}id")
+            break
+    if rid is None:
+        raise RuntimeError(f"시트 '{sheet_name}' 를 찾지 못했습니다.")
+
+    sheet_part = shared_part = styles_part = None
+    for rel in _read_rels(zf, wb_part):
+        target = _resolve_target(wb_part, rel.get("Target", ""))
+        if rel.get("Id") == rid:
+            sheet_part = target
+        elif rel.get("Type") == _REL_SHARED_STRINGS:
+            shared_part = target
+        elif rel.get("Type") == _REL_STYLES:
+            styles_part = target
+    if sheet_part is None:
+        raise RuntimeError(f"시트 '{sheet_name}' 의 XML 파트를 찾지 못했습니다.")
+    return sheet_part, shared_part, styles_part
+
+
+def _read_shared_strings(data: bytes) -> List[str]:
+    out: List[str] = []
+    t_tag, r_tag = f"{{{_NS_MAIN}}}t", f"{{{_NS_MAIN}}}r"
+    for si in ET.fromstring(data).iter(f"{{{_NS_MAIN}}}si"):
+        parts: List[str] = []
+        for child in si:
+            if child.tag == t_tag:
+                parts.append(child.text or "")
+            elif child.tag == r_tag:
+                t = child.find(t_tag)
+                parts.append((t.text or "") if t is not None else "")
+            # rPh(읽는 법) 등은 셀 값이 아님
+        out.append("".join(parts))
+    return out
+
+
+def _cell_value(attrs: str, inner: Optional[str], shared: List[str]):
+    """<c> 의 속성/본문 → 값 (openpyxl 이 읽는 것과 같은 타입: 문자열 / 숫자 / None)."""
+    if not inner:
+        return None
+    tm = _TYPE_RE.search(attrs)
+    cell_type = tm.group(1) if tm else "n"
+    if cell_type == "inlineStr":
+        return html.unescape("".join(_T_RE.findall(inner)))
+    vm = _V_RE.search(inner)
+    if vm is None:
+        return None
+    v = html.unescape(vm.group(1))
+    if cell_type == "s":
+        try:
+            return shared[int(v)]
+        except (ValueError, IndexError):
+            return None
+    if cell_type in ("str", "e", "b"):
+        return v
+    try:
+        f = float(v)
+    except ValueError:
+        return v
+    return int(f) if f.is_integer() else f
+
+
+# ===== 2) 셀 / 행 XML 만들기 =====
+
+def _xml_text(value) -> str:
+    return escape(_ILLEGAL_XML_CHARS_RE.sub("", str(value)))
+
+
+def _value_cell_xml(ref: str, value, style_attr: str) -> str:
+    if value is None or value == "":
+        return f'<c r="{ref}"{style_attr}/>'
+    if isinstance(value, bool):
+        return f'<c r="{ref}"{style_attr} t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        return f'<c r="{ref}"{style_attr}><v>{value}</v></c>'
+    return f'<c r="{ref}"{style_attr} t="inlineStr"><is><t xml:space="preserve">{_xml_text(value)}</t></is></c>'
+
+
+def _split_row(row_xml: str) -> Tuple[str, Dict[int, Tuple[str, str, Optional[str]]]]:
+    """<row> → (row 속성 문자열, {열 번호: (열 문자, 셀 속성, 셀 본문)})."""
+    m = _ROW_OPEN_RE.match(row_xml)
+    attrs = m.group(1) if m else ""
+    cells: Dict[int, Tuple[str, str, Optional[str]]] = {}
+    if m and not m.group(2):
+        inner = row_xml[m.end(): row_xml.rfind("</row>")]
+        for cm in _CELL_RE.finditer(inner):
+            cells[column_index_from_string(cm.group(1))] = (cm.group(1), cm.group(3), cm.group(4))
+    return attrs, cells
+
+
+def _build_row_xml(
+    base_row_xml: Optional[str],
+    row: int,
+    overrides: Dict[str, object],
+    *,
+    extra_style: Dict[str, int] | None = None,
+) -> str:
+    """
+    base_row_xml(복사할 원본 <row>, 없으면 빈 행)을 row 번호로 옮기고 overrides {열: 값} 을 덮어쓴 <row>.
+    - 셀 참조는 모두 새 행 번호로 바뀐다
+    - 공유/배열 수식(<f t="shared">)은 다른 행으로 옮기면 깨지므로 빼고 계산값만 남긴다
+    - extra_style {열: 스타일 index} 는 해당 셀 스타일을 바꾼다 (구분자 노란 배경)
+    """
+    attrs, cells = _split_row(base_row_xml) if base_row_xml else (f' r="{row}"', {})
+    attrs = re.sub(r'\br="\d+"', f'r="{row}"', attrs, count=1)
+    attrs = _SPANS_RE.sub("", attrs)  # 열 범위 힌트: 값이 늘어날 수 있으니 빼 둔다
+
+    out: Dict[int, str] = {}
+    for col_idx, (col, c_attrs, body) in cells.items():
+        if body:
+            body = _FORMULA_RE.sub(
+                lambda fm: "" if ('t="shared"' in fm.group(0) or 't="array"' in fm.group(0)) else fm.group(0),
+                body,
+            )
+        ref = f"{col}{row}"
+        out[col_idx] = f'<c r="{ref}"{c_attrs}>{body}</c>' if body else f'<c r="{ref}"{c_attrs}/>'
+
+    for col, value in overrides.items():
+        col_idx = column_index_from_string(col)
+        style_attr = ""
+        if col_idx in cells:
+            sm = _STYLE_RE.search(cells[col_idx][1])
+            if sm:
+                style_attr = f' s="{sm.group(1)}"'
+        if extra_style and col in extra_style:
+            style_attr = f' s="{extra_style[col]}"'
+        out[col_idx] = _value_cell_xml(f"{col}{row}", value, style_attr)
+
+    body = "".join(out[c] for c in sorted(out))
+    return f"<row{attrs}>{body}</row>"
+
+
+def _add_fill_style(styles_xml: str, rgb: str = "FFFFFF00") -> Tuple[str, Optional[int]]:
+    """styles.xml 에 단색 배경 fill + 그 fill 을 쓰는 cellXfs 항목을 추가 → (새 XML, 스타일 index)."""
+    fm = re.search(r"<fills\b[^>]*>", styles_xml)
+    fend = styles_xml.find("</fills>", fm.end()) if fm else -1
+    if fend < 0:
+        return styles_xml, None
+    fill_id = len(re.findall(r"<fill\b", styles_xml[fm.end():fend]))
+    fill_xml = (
+        f'<fill><patternFill patternType="solid"><fgColor rgb="{rgb}"/><bgColor rgb="{rgb}"/></patternFill></fill>'
+    )
+    styles_xml = styles_xml[:fend] + fill_xml + styles_xml[fend:]
+    styles_xml = styles_xml[:fm.start()] + re.sub(
+        r'\bcount="\d+"', f'count="{fill_id + 1}"', fm.group(0)
+    ) + styles_xml[fm.end():]
+
+    xm = re.search(r"<cellXfs\b[^>]*>", styles_xml)
+    xend = styles_xml.find("</cellXfs>", xm.end()) if xm else -1
+    if xend < 0:
+        return styles_xml, None
+    xf_id = len(re.findall(r"<xf\b", styles_xml[xm.end():xend]))
+    xf_xml = f'<xf numFmtId="0" fontId="0" fillId="{fill_id}" borderId="0" xfId="0" applyFill="1"/>'
+    styles_xml = styles_xml[:xend] + xf_xml + styles_xml[xend:]
+    styles_xml = styles_xml[:xm.start()] + re.sub(
+        r'\bcount="\d+"', f'count="{xf_id + 1}"', xm.group(0)
+    ) + styles_xml[xm.end():]
+    return styles_xml, xf_id
+
+
+# ===== 3) 데이터 유효성 sqref 확장 =====
+
+def _format_range(c1: int, r1: int, c2: int, r2: int) -> str:
+    a = f"{get_column_letter(c1)}{r1}"
+    return a if (c1, r1) == (c2, r2) else f"{a}:{get_column_letter(c2)}{r2}"
+
+
+def extend_sqref(sqref: str, src_row: int, dst_rows: List[int]) -> str:
+    """
+    src_row 에 걸린 범위의 열들을 dst_rows 에도 걸리게 sqref 를 늘린다.
+    - 바로 윗행까지 이어진 같은 열 범위가 있으면 그 범위를 한 행 늘리고 (J5:J400 → J5:J401)
+    - 이미 포함된 셀이면 그대로, 아니면 새 범위를 붙인다
+    """
+    tokens = sqref.split()
+    ranges: List[Optional[List[int]]] = []
+    for tok in tokens:
+        try:
+            c1, r1, c2, r2 = range_boundaries(tok)
+        except (ValueError, TypeError):
+            ranges.append(None)
+            continue
+        if c1 is None or c2 is None:
+            ranges.append(None)  # 행 전체(5:5) 범위는 그대로 둔다
+            continue
+        ranges.append([c1, r1 or 1, c2, r2 or _MAX_SHEET_ROW])
+
+    spans = [(r[0], r[2]) for r in ranges if r is not None and r[1] <= src_row <= r[3]]
+    if not spans:
+        return sqref
+
+    changed = False
+    for dst in sorted(dst_rows):
+        for c1, c2 in spans:
+            if any(r is not None and r[1] <= dst <= r[3] and r[0] <= c1 and c2 <= r[2] for r in ranges):
+                continue
+            ext = next((r for r in ranges if r is not None and r[0] == c1 and r[2] == c2 and r[3] == dst - 1), None)
+            if ext is not None:
+                ext[3] = dst
+            else:
+                ranges.append([c1, dst, c2, dst])
+                tokens.append("")
+            changed = True
+
+    if not changed:
+        return sqref
+    return " ".join(
+        tok if r is None else _format_range(*r)
+        for tok, r in zip(tokens, ranges)
+    )
+
+
+# ===== 4) 쓰기 엔진 =====
+
+class XmlSheetWriter:
+    """
+    xlsm 1개의 data 시트에 행을 쌓았다가 save() 때 zip 을 한 번 다시 쓴다.
+    SellertoolWriterSession 의 "xml" 엔진 (openpyxl 엔진과 같은 append / has_product / save / close).
+    """
+
+    def __init__(self, path: Path, *, sheet_name: str = SELLERTOOL_SHEET_NAME) -> None:
+        self.path = Path(path)
+        with zipfile.ZipFile(self.path, "r") as zf:
+            self._sheet_part, shared_part, self._styles_part = _find_parts(zf, sheet_name)
+            self._sheet_xml = zf.read(self._sheet_part).decode("utf-8")
+            self._shared = _read_shared_strings(zf.read(shared_part)) if shared_part else []
+            self._styles_xml: Optional[str] = None
+        self._stat = self._file_stat()
+
+        self._row_nums = [int(m.group(1)) for m in _ROW_NUM_RE.finditer(self._sheet_xml)]
+        self._row_set = set(self._row_nums)
+        self._row_cache: Dict[int, Optional[str]] = {}
+
+        # save() 전까지 쌓아 두는 행: {행 번호: <row> XML}, {행 번호: (template source 행)}, {행 번호: (A, B, C)}
+        self._pending: Dict[int, str] = {}
+        self._pending_src: Dict[int, int] = {}
+        self._pending_abc: Dict[int, Tuple[object, object, object]] = {}
+        self._separator_style: Optional[int] = None
+
+        self.layout = self._build_layout(get_template_meta(self.path))
+
+    def _file_stat(self) -> Tuple[int, int]:
+        st = self.path.stat()
+        return st.st_mtime_ns, st.st_size
+
+    # ---------- 읽기 ----------
+    def _build_layout(self, meta: Optional[dict] = None) -> SheetLayout:
+        """meta(인덱스의 템플릿 메타)가 이 시트와 맞으면 template source 아래 행만 스캔."""
+        start_row, pos = 1, 0
+        if meta is not None and _template_meta_matches(meta, self._cell_a):
+            start_row = int(meta["last_a_row"]) + 1
+            i = bisect_left(self._row_nums, start_row)
+            pos = self._sheet_xml.find(f'<row r="{self._row_nums[i]}"') if i < len(self._row_nums) else -1
+            if pos < 0:
+                pos = len(self._sheet_xml)
+        else:
+            meta = None
+
+        rows: Dict[int, List[object]] = {}
+        for m in _LAYOUT_CELL_RE.finditer(self._sheet_xml, pos):
+            r = int(m.group(2))
+            slot = rows.setdefault(r, [None, None, None, None])
+            slot[_LAYOUT_SLOT[m.group(1)]] = _cell_value(m.group(3), m.group(4), self._shared)
+        n_rows = max(self._row_nums, default=0)
+        empty = (None, None, None, None)
+        values = (tuple(rows.get(r, empty)) for r in range(start_row, n_rows + 1))
+        if meta is not None:
+            return SheetLayout.from_template_meta(meta, values)
+        return SheetLayout.from_values(values)
+
+    def _rebuild_full_layout(self) -> SheetLayout:
+        """메타 기반 레이아웃으로 답할 수 없는 조회 → 전체 스캔 + 아직 save 안 한 행/구분자 다시 반영."""
+        old = self.layout
+        layout = self._build_layout()
+        if old.sep_row is not None and layout.sep_row is None:
+            layout.set_separator(old.sep_row, _SEPARATOR_TEXT, *self._row_values(old.sep_row, (2, 3)))
+        for r, (a, b, c) in sorted(self._pending_abc.items()):
+            layout.note_row(r, a, b, c)
+        self.layout = layout
+        return layout
+
+    def _cell_a(self, row: int):
+        row_xml = self._row_xml(row)
+        if not row_xml:
+            return None
+        cell = _split_row(row_xml)[1].get(1)
+        return _cell_value(cell[1], cell[2], self._shared) if cell is not None else None
+
+    def _row_values(self, row: int, cols: Sequence[int]) -> List[object]:
+        """row 의 cols 열 값 (아직 save 안 한 행이면 그 내용 기준)."""
+        row_xml = self._pending.get(row) or self._row_xml(row)
+        cells = _split_row(row_xml)[1] if row_xml else {}
+        return [
+            _cell_value(cells[col][1], cells[col][2], self._shared) if col in cells else None
+            for col in cols
+        ]
+
+    def _row_xml(self, row: int) -> Optional[str]:
+        if row not in self._row_set:
+            return None
+        if row not in self._row_cache:
+            m = re.compile(rf'<row r="{row}"[^>]*?(?:/>|>.*?</row>)', re.S).search(self._sheet_xml)
+            self._row_cache[row] = m.group(0) if m else None
+        return self._row_cache[row]
+
+    def has_product(self, row: int, product_name: str) -> bool:
+        """row 의 B열이 product_name 인지 (저널 재실행 때 이미 저장된 행 건너뛰기용)."""
+        if row in self._pending_abc:
+            return self._pending_abc[row][1] == product_name
+        row_xml = self._row_xml(row)
+        if not row_xml:
+            return False
+        _, cells = _split_row(row_xml)
+        cell = cells.get(2)
+        if cell is None:
+            return False
+        value = _cell_value(cell[1], cell[2], self._shared)
+        return str(value if value is not None else "").strip() == product_name
+
+    # ---------- 쓰기 ----------
+    def _ensure_separator(self) -> int:
+        layout = self.layout
+        if layout.sep_row is not None:
+            return layout.sep_row
+
+        sep_row = layout.separator_insert_row()
+        if self._separator_style is None and self._styles_part:
+            if self._styles_xml is None:
+                with zipfile.ZipFile(self.path, "r") as zf:
+                    self._styles_xml = zf.read(self._styles_part).decode("utf-8")
+            self._styles_xml, self._separator_style = _add_fill_style(self._styles_xml)
+        extra = {"A": self._separator_style} if self._separator_style is not None else None
+
+        self._pending[sep_row] = _build_row_xml(
+            self._pending.get(sep_row) or self._row_xml(sep_row), sep_row, {"A": _SEPARATOR_TEXT}, extra_style=extra
+        )
+        layout.set_separator(sep_row, _SEPARATOR_TEXT, *self._row_values(sep_row, (2, 3)))
+        return sep_row
+
+    def append(
+        self,
+        *,
+        product_name: str,
+        price,
+        coupang_category_id: str,
+        coupang_category_path: str,
+    ) -> int:
+        """write_coupang_row + 이미지명 기록과 같은 규칙으로 1행 추가 (save 전까지 메모리) → 행 번호."""
+        layout = self.layout
+        if not layout.covers_template_lookup(coupang_category_id):
+            layout = self._rebuild_full_layout()
+
+        # 1. 구분자 / Template source 영역
+        sep_row = self._ensure_separator()
+        template_source_max_row = sep_row - 1
+
+        # 2. Template source 행 (CK 기준)
+        src_row = select_template_source_row(
+            layout,
+            coupang_category_id=coupang_category_id,
+            coupang_category_path=coupang_category_path,
+            template_source_max_row=template_source_max_row,
+        )
+
+        # 3. 입력 대상 행
+        dst_row = layout.next_free_row_from(sep_row + 1)
+        if dst_row <= template_source_max_row:
+            raise RuntimeError(f"Template source 영역({dst_row})에 write 시도 차단")
+
+        # 4. 값 (가격 정책 / prefix 기반 이미지명은 openpyxl 경로와 같음)
+        base_price = int(price) if price not in (None, "") else 0
+        bj_price, bl_price, stock_qty, lead_time = calculate_pricing_from_base(base_price)
+        prefix = extract_template_prefix_from_filename(self.path) or "no-prefix"
+        main_img, spec_img = build_prefixed_image_names(prefix, dst_row)
+        values = coupang_row_values(
+            product_name, bj_price, bl_price, stock_qty, lead_time, main_img, spec_img
+        )
+
+        # 5. Template source 행 복사 + 값 덮어쓰기
+        src_xml = self._row_xml(src_row)
+        self._pending[dst_row] = _build_row_xml(src_xml, dst_row, values)
+        self._pending_src[dst_row] = src_row
+
+        a_val = None
+        if src_xml:
+            a_cell = _split_row(src_xml)[1].get(1)
+            if a_cell is not None:
+                a_val = _cell_value(a_cell[1], a_cell[2], self._shared)
+        self._pending_abc[dst_row] = (a_val, values["B"], values["C"])
+        layout.note_row(dst_row, a_val, values["B"], values["C"])
+        return dst_row
+
+    # ---------- 저장 ----------
+    def _merge_rows(self, data: str) -> str:
+        out: List[str] = []
+        pos = 0
+        for r in sorted(self._pending):
+            new_xml = self._pending[r]
+            if r in self._row_set:
+                m = re.compile(rf'<row r="{r}"[^>]*?(?:/>|>.*?</row>)', re.S).search(data, pos)
+                out.append(data[pos:m.start()])
+                out.append(new_xml)
+                pos = m.end()
+                continue
+            i = bisect_right(self._row_nums, r)
+            idx = data.find(f'<row r="{self._row_nums[i]}"', pos) if i < len(self._row_nums) else -1
+            if idx < 0:
+                out.append(data[pos:])
+                pos = len(data)
+            else:
+                out.append(data[pos:idx])
+                pos = idx
+            out.append(new_xml)
+        out.append(data[pos:])
+        return "".join(out)
+
+    def _extend_validations(self, tail: str) -> str:
+        by_src: Dict[int, List[int]] = {}
+        for dst, src in self._pending_src.items():
+            by_src.setdefault(src, []).append(dst)
+        for src, dsts in by_src.items():
+            def _sub(m: "re.Match[str]") -> str:
+                return m.group(1) + extend_sqref(m.group(2), src, dsts) + m.group(3)
+            tail = _DV_SQREF_RE.sub(_sub, tail)
+            tail = _X14_SQREF_RE.sub(_sub, tail)
+        return tail
+
+    def _update_dimension(self, head: str) -> str:
+        def _sub(m: "re.Match[str]") -> str:
+            try:
+                c1, r1, c2, r2 = range_boundaries(m.group(2))
+            except (ValueError, TypeError):
+                return m.group(0)
+            r2 = max(r2 or 1, max(self._pending))
+            return m.group(1) + _format_range(c1 or 1, r1 or 1, c2 or 1, r2) + m.group(3)
+        return _DIMENSION_RE.sub(_sub, head, count=1)
+
+    def _write_zip(self, out_path: Path, replacements: Dict[str, bytes]) -> None:
+        with zipfile.ZipFile(self.path, "r") as zin, zipfile.ZipFile(out_path, "w") as zout:
+            for info in zin.infolist():
+                data = replacements.get(info.filename)
+                zout.writestr(info, data if data is not None else zin.read(info))
+
+    @property
+    def pending_rows(self) -> int:
+        return len(self._pending_src)
+
+    def save(self) -> None:
+        if not self._pending:
+            return
+        if self._file_stat() != self._stat:
+            raise RuntimeError(f"엑셀 파일이 외부에서 변경되어 XML 추가 쓰기를 중단합니다: {self.path}")
+
+        xml = self._sheet_xml
+        start = xml.find("<sheetData")
+        open_end = xml.find(">", start) + 1
+        if xml[open_end - 2] == "/":
+            # <sheetData/> (행이 하나도 없는 시트)
+            head, data, tail = xml[:start] + "<sheetData>", "", "</sheetData>" + xml[open_end:]
+        else:
+            end = xml.find("</sheetData>", open_end)
+            head, data, tail = xml[:open_end], xml[open_end:end], xml[end:]
+
+        new_xml = self._update_dimension(head) + self._merge_rows(data) + self._extend_validations(tail)
+        replacements = {self._sheet_part: new_xml.encode("utf-8")}
+        if self._styles_xml is not None:
+            replacements[self._styles_part] = self._styles_xml.encode("utf-8")
+
+        _save_atomically(self.path, lambda tmp: self._write_zip(tmp, replacements))
+
+        self._sheet_xml = new_xml
+        self._row_nums = sorted(self._row_set.union(self._pending))
+        self._row_set = set(self._row_nums)
+        self._row_cache.clear()
+        self._pending.clear()
+        self._pending_src.clear()
+        self._pending_abc.clear()
+        self._styles_xml = None
+        self._stat = self._file_stat()
+
+    def close(self) -> None:
+        """열린 핸들이 없으므로 정리할 것은 없다 (save 되지 않은 행은 버려짐 → 세션 저널이 보존)."""
+        self._pending.clear()
+        self._pending_src.clear()
+        self._pending_abc.clear()
@@ -23,7 +23,7 @@ from pathlib import Path
 from PyQt6.QtGui import QKeySequence, QShortcut
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QPushButton, QLabel, QTextEdit, QHBoxLayout, QSpinBox,
-    QDialog, QListWidget, QListWidgetItem, QLineEdit,
+    QDialog, QListWidget, QListWidgetItem, QLineEdit, QTreeWidget, QTreeWidgetItem,
 )
 from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 
@@ -59,12 +59,14 @@ from google.oauth2.service_account import Credentials
 from .core.category_matcher import CategoryMatcher, match_category_auto
 from .core.rules_loader import COUPANG_DIR, load_coupang_rules
 from .core.rules_loader import upsert_strong_name_rule
+from .core.category_trie import CategoryTrie
 
 # category_ai – 키워드 추출 모듈
 from .category_ai.category_llm import _extract_keywords
 
 # 🔹 카테고리 마스터(엑셀 C~J 열 메타 포함) 조회용
 from .category_ai.category_loader import get_category_row_by_id
+from .category_ai.llm_warmup import LLMProbe, start_llm_warmup
 
 # 시트/쿠팡 API: 분리된 모듈
 from .sheets_client import SheetsClient, extract_paid_price_from_item
@@ -117,16 +119,16 @@ from .config import (
 #========================================================================
 
 # category_ai – 카테고리 매칭 모듈
-from .category_ai.category_worker import CategoryBuildWorker
+from .category_ai.category_worker import CategoryBuildWorker, UploadIndexBuildWorker
 
 # sellertool_excel – 쿠팡 업로드 엑셀 생성 모듈 : 
 # coupang_upload_form 내 엑셀파일 로 부터 검색 시간 줄이기 위한 json 파일 생성 까지 완료 - ui 버튼 내 기능 연결 전
-from build_coupang_upload_index import build_coupang_upload_index
 
 
 from cellon.sellertool_excel import (
     prepare_sellertool_workbook_copy,       # ✅ 작업용 엑셀 복사본 준비
     prepare_and_fill_sellertool,            # ✅ 셀러툴 엑셀 채우기
+    SellertoolWriterSession,                # ✅ 엑셀을 열어 둔 채 행을 모아 저장 (건수/시간/종료 시)
     find_template_for_category_path,        # ✅ 템플릿 리졸버(1번 방식): best_key 선택 → 최종 xlsm 경로 확정
 )
 
@@ -560,6 +562,7 @@ class CategorySelectDialog(QDialog):
 # =========================
 class ChromeCrawler(QWidget):
     clickDetected = pyqtSignal(int, int)
+    llmWarmupDone = pyqtSignal(object)  # LLMProbe (워밍업 스레드 → UI 스레드)
 
     # 테스트용 플래그: True로 두면 무조건 "다운로드 건너뛰고 캡처" 경로로 테스트
     FORCE_CAPTURE_TEST = False  # 테스트 미진행. 다운로드 우선순위 진행
@@ -586,6 +589,7 @@ class ChromeCrawler(QWidget):
         # ✅ 코스트코 셀러툴 작업 엑셀 캐시 (하루 1번 생성 후 재사용)
         self._sellertool_work_xlsm_path: Path | None = None
         self._sellertool_work_xlsm_date: str | None = None
+        self._sellertool_session = SellertoolWriterSession()
         
         # 크롤 결과
         self.crawled_title = ""
@@ -737,12 +741,19 @@ class ChromeCrawler(QWidget):
 
         # 전역 클릭 시그널
         self.clickDetected.connect(self._handle_click_on_main)
+        self.llmWarmupDone.connect(self._on_llm_warmup_done)
 
         # 자동 초기화
         QTimer.singleShot(300, self._startup_sequence)
+
+        # 셀러툴 엑셀: 시간 기준 저장 확인 (크롤링이 멈춰 있어도 쌓인 행이 저장되도록)
+        self._sellertool_flush_timer = QTimer(self)
+        self._sellertool_flush_timer.timeout.connect(self._flush_sellertool_if_due)
+        self._sellertool_flush_timer.start(10_000)
         
         # 카테고리 마스터 관련 상태
         self.category_worker: CategoryBuildWorker | None = None
+        self.upload_index_worker: UploadIndexBuildWorker | None = None
         self.category_master_df = None  # 필요하면 나중에 다른 곳에서 참조
 
     # --------------------------
@@ -813,6 +824,30 @@ class ChromeCrawler(QWidget):
             else:
                 self._log("ℹ️ 기존 창 연결 실패 → '크롬(디버그) 실행' 수행")
                 self.launch_debug_chrome()
+
+        # 로컬 LLM 모델 미리 올리기 + 속도 측정 (백그라운드, 실패해도 무시)
+        self._log("🤖 로컬 LLM 워밍업 시작 (백그라운드)")
+        start_llm_warmup(on_done=self.llmWarmupDone.emit)
+
+    def _on_llm_warmup_done(self, probe: LLMProbe):
+        if probe.ok:
+            self._log(f"🤖 로컬 LLM 워밍업 완료: {probe.summary()}")
+        else:
+            self._log(f"⚠️ 로컬 LLM 워밍업 실패 (카테고리 추천 첫 호출이 느릴 수 있음): {probe.error}")
+
+    def _flush_sellertool_if_due(self):
+        try:
+            self._sellertool_session.flush_if_due()
+        except Exception as e:
+            self._log(f"⚠️ 셀러툴 엑셀 저장 실패 (다음 저장/재실행 때 저널에서 복구): {e}")
+
+    def closeEvent(self, event):
+        # 종료 전 셀러툴 엑셀에 쌓인 행 저장
+        try:
+            self._sellertool_session.close()
+        except Exception as e:
+            print(f"[WARN] 종료 중 셀러툴 엑셀 저장 실패: {e}")
+        super().closeEvent(event)
  
         # === 카테고리 마스터 생성 시작 ===
     
@@ -862,14 +897,24 @@ class ChromeCrawler(QWidget):
 
         self._log(f"✅ 카테고리 마스터 생성 완료 (총 {n}개 카테고리)")
 
-        # 🔹 coupang_upload_form 템플릿 인덱스 생성 (딱 1회)
-        try:
-            build_coupang_upload_index()
-            self._log(
-                "ℹ️ coupang_upload_form 내의 쿠팡 셀러툴 템플릿 구조를 분석했습니다."
-            )
-        except Exception as e:
-            self._log(f"⚠️ 쿠팡 셀러툴 템플릿 인덱스 생성 실패: {e}")
+        # 🔹 coupang_upload_form 템플릿 인덱스 생성 (딱 1회, 템플릿 메타 스캔이 있어서 워커에서)
+        if self.upload_index_worker is not None and self.upload_index_worker.isRunning():
+            self._log("ℹ️ 쿠팡 셀러툴 템플릿 인덱스 생성이 이미 진행 중입니다.")
+            return
+        self.upload_index_worker = UploadIndexBuildWorker(parent=self)
+        self.upload_index_worker.finished.connect(self._on_upload_index_finished)
+        self.upload_index_worker.error.connect(self._on_upload_index_error)
+        self.upload_index_worker.start()
+
+    def _on_upload_index_finished(self, index_path):
+        self.upload_index_worker = None
+        self._log(
+            "ℹ️ coupang_upload_form 내의 쿠팡 셀러툴 템플릿 구조를 분석했습니다."
+        )
+
+    def _on_upload_index_error(self, msg: str):
+        self.upload_index_worker = None
+        self._log(f"⚠️ 쿠팡 셀러툴 템플릿 인덱스 생성 실패: {msg}")
 
 
     def _on_category_error(self, msg: str):
@@ -1886,6 +1931,7 @@ class ChromeCrawler(QWidget):
                     coupang_category_path=self.coupang_category_path,  # ✅ 꼭 필요
                     price=self.crawled_price,
                     search_keywords=None,
+                    session=self._sellertool_session,
                 )
                 
                 if work_xlsm_path:
@@ -1907,6 +1953,7 @@ class ChromeCrawler(QWidget):
                     coupang_category_path=self.coupang_category_path,
                     price=self.crawled_price,
                     search_keywords=None,
+                    session=self._sellertool_session,
                 )
                 
                 # ✅ 핵심: 실제로 기록된 파일(dest_path) 기준으로 이후 prefix/캡처도 동기화
@@ -3164,9 +3211,36 @@ class ChromeCrawler(QWidget):
 
         layout.addLayout(search_row)
 
-        # ---------- 리스트 ----------
+        # ---------- 트리(대분류>중분류>...) + 리스트 ----------
+        #    트리에서 노드를 고르면 리스트가 그 하위 카테고리만 보이도록 범위를 좁힌다.
+        #    (CategoryMatcher 와 같은 CategoryTrie 구조: 노드 = 후보 행 구간)
+        body_row = QHBoxLayout()
+
+        tree = QTreeWidget()
+        tree.setHeaderHidden(True)
+        tree.setFixedWidth(260)
+        body_row.addWidget(tree)
+
         lst = QListWidget()
-        layout.addWidget(lst)
+        body_row.addWidget(lst, 1)
+        layout.addLayout(body_row)
+
+        view_trie = CategoryTrie(view_df["category_path"].tolist())
+        scope = {"rows": None}   # None = 전체, 아니면 보여줄 리스트 row 집합
+
+        root_item = QTreeWidgetItem([f"전체 ({len(view_trie)})"])
+        root_item.setData(0, Qt.ItemDataRole.UserRole, view_trie.root)
+        tree.addTopLevelItem(root_item)
+
+        def _add_tree_children(parent_item: QTreeWidgetItem, node) -> None:
+            for child in node.children:
+                child_item = QTreeWidgetItem([f"{child.label or '(빈 이름)'} ({child.size})"])
+                child_item.setData(0, Qt.ItemDataRole.UserRole, child)
+                parent_item.addChild(child_item)
+                _add_tree_children(child_item, child)
+
+        _add_tree_children(root_item, view_trie.root)
+        root_item.setExpanded(True)
 
         # ✅ (중요) 원본 아이템을 "객체로 캐시"하지 않습니다.
         #    QListWidgetItem은 lst.clear() 같은 동작에서 C++ 레벨로 삭제될 수 있어
@@ -3207,10 +3281,11 @@ class ChromeCrawler(QWidget):
                     if item is None:
                         continue
 
+                    in_scope = scope["rows"] is None or i in scope["rows"]
                     if not keyword:
-                        item.setHidden(False)
+                        item.setHidden(not in_scope)
                     else:
-                        item.setHidden(keyword not in item.text().lower())
+                        item.setHidden((not in_scope) or keyword not in item.text().lower())
 
                 # 검색 후 보이는 첫 항목에 커서
                 row0 = _first_visible_row()
@@ -3222,6 +3297,17 @@ class ChromeCrawler(QWidget):
 
         search.textChanged.connect(apply_filter)
 
+        def on_tree_selected():
+            it = tree.currentItem()
+            node = it.data(0, Qt.ItemDataRole.UserRole) if it is not None else None
+            if node is None or node is view_trie.root:
+                scope["rows"] = None
+            else:
+                scope["rows"] = set(view_trie.subtree_positions(node).tolist())
+            apply_filter()
+
+        tree.currentItemChanged.connect(lambda *_: on_tree_selected())
+
         # ---------- 이전 / 다음 ----------
         def _move_to_visible(delta: int):
             """